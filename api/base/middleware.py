@@ -9,6 +9,7 @@ import types
 import functools
 
 from django.conf import settings
+from django.http import HttpResponseServerError
 from raven.contrib.django.raven_compat.models import sentry_exception_handler
 import corsheaders.middleware
 
@@ -30,6 +31,15 @@ from framework.transactions.handlers import (
     transaction_after_request,
     transaction_teardown_request
 )
+from framework.mongo.unit_of_work import (
+    unit_of_work_before_request,
+    unit_of_work_after_request,
+    unit_of_work_teardown_request
+)
+from framework.auth.permission_cache import (
+    permission_cache_before_request,
+    permission_cache_teardown_request
+)
 from .api_globals import api_globals
 from api.base import settings as api_settings
 
@@ -102,6 +112,46 @@ class DjangoGlobalMiddleware(object):
         api_globals.request = None
         return response
 
+class PermissionCacheMiddleware(object):
+    """Request-scoped memoization of node permission checks."""
+
+    def process_request(self, request):
+        permission_cache_before_request()
+
+    def process_exception(self, request, exception):
+        permission_cache_teardown_request(error=True)
+        return None
+
+    def process_response(self, request, response):
+        permission_cache_teardown_request()
+        return response
+
+
+class UnitOfWorkMiddleware(object):
+    """Run the side effects of the request's node saves once per node."""
+
+    def process_request(self, request):
+        unit_of_work_before_request()
+
+    def process_exception(self, request, exception):
+        unit_of_work_teardown_request(error=True)
+        return None
+
+    def process_response(self, request, response):
+        """Flush the unit of work before the transaction is committed,
+        discarding it if the status code is 400 or above. If a side effect
+        fails, respond with a 500 so the middlewares that run after this one
+        roll back the transaction rather than commit half the request.
+        """
+        try:
+            unit_of_work_after_request(response, base_status_code_error=400)
+        except Exception:
+            sentry_exception_handler(request=request)
+            unit_of_work_teardown_request(error=True)
+            return HttpResponseServerError()
+        return response
+
+
 class CorsMiddleware(corsheaders.middleware.CorsMiddleware):
     """
     Augment CORS origin white list with the Institution model's domains.
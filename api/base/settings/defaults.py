@@ -128,6 +128,10 @@ MIDDLEWARE_CLASSES = (
     'api.base.middleware.CeleryTaskMiddleware',
     'api.base.middleware.TokuTransactionMiddleware',
     'api.base.middleware.PostcommitTaskMiddleware',
+    'api.base.middleware.PermissionCacheMiddleware',
+    # Must go after the transaction and postcommit middlewares, so that its
+    # process_response runs before theirs
+    'api.base.middleware.UnitOfWorkMiddleware',
 
     # A profiling middleware. ONLY FOR DEV USE
     # Uncomment and add "prof" to url params to recieve a profile for that url
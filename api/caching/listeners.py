@@ -1,8 +1,8 @@
-from api.caching.tasks import ban_url
+from api.caching.tasks import ban_url, ban_url_async
 from framework.postcommit_tasks.handlers import enqueue_postcommit_task
 from modularodm import signals
 
 @signals.save.connect
 def ban_object_from_cache(sender, instance, fields_changed, cached_data):
     if hasattr(instance, 'absolute_api_v2_url'):
-        enqueue_postcommit_task(ban_url, (instance, ), {}, celery=False, once_per_request=True)
+        enqueue_postcommit_task(ban_url, (instance, ), {}, celery=False, once_per_request=True, overflow=ban_url_async)
@@ -2,6 +2,7 @@ import urlparse
 
 import requests
 import logging
+from framework.celery_tasks import app
 from website.project.model import Comment
 
 from website import settings
@@ -57,29 +58,47 @@ def get_bannable_urls(instance):
     return bannable_urls, parsed_absolute_url.hostname
 
 
-def ban_url(instance):
-    # TODO: Refactor; Pull url generation into postcommit_task handling so we only ban urls once per request
+def send_bans(bannable_urls, hostname):
     timeout = 0.3  # 300ms timeout for bans
-    if settings.ENABLE_VARNISH:
-        bannable_urls, hostname = get_bannable_urls(instance)
-
-        for url_to_ban in set(bannable_urls):
-            try:
-                response = requests.request('BAN', url_to_ban, timeout=timeout, headers=dict(
-                    Host=hostname
-                ))
-            except Exception as ex:
+    for url_to_ban in set(bannable_urls):
+        try:
+            response = requests.request('BAN', url_to_ban, timeout=timeout, headers=dict(
+                Host=hostname
+            ))
+        except Exception as ex:
+            logger.error('Banning {} failed: {}'.format(
+                url_to_ban,
+                ex.message
+            ))
+        else:
+            if not response.ok:
                 logger.error('Banning {} failed: {}'.format(
                     url_to_ban,
-                    ex.message
+                    response.text
                 ))
             else:
-                if not response.ok:
-                    logger.error('Banning {} failed: {}'.format(
-                        url_to_ban,
-                        response.text
-                    ))
-                else:
-                    logger.info('Banning {} succeeded'.format(
-                        url_to_ban
-                    ))
+                logger.info('Banning {} succeeded'.format(
+                    url_to_ban
+                ))
+
+
+@app.task(ignore_result=True)
+def send_bans_async(bannable_urls, hostname):
+    send_bans(bannable_urls, hostname)
+
+
+def ban_url(instance):
+    # TODO: Refactor; Pull url generation into postcommit_task handling so we only ban urls once per request
+    if settings.ENABLE_VARNISH:
+        bannable_urls, hostname = get_bannable_urls(instance)
+        send_bans(bannable_urls, hostname)
+
+
+def ban_url_async(instance):
+    """Return a signature sending ``instance``'s bans from a Celery worker, for
+    when the postcommit pool is saturated, or None if there is nothing to ban.
+    """
+    if not settings.ENABLE_VARNISH:
+        return None
+    bannable_urls, hostname = get_bannable_urls(instance)
+    return send_bans_async.si(list(set(bannable_urls)), hostname)
@@ -1,3 +1,5 @@
+import collections
+
 from django.core.urlresolvers import resolve, reverse
 import furl
 from rest_framework import serializers as ser
@@ -9,6 +11,7 @@ from framework.auth.core import Auth, User
 from website import settings
 
 from website.files.models import FileNode
+from website.files.models.base import get_download_counts
 from website.project.model import Comment
 from website.util import api_v2_url
 
@@ -17,6 +20,7 @@ from api.base.serializers import (
     format_relationship_links,
     IDField,
     JSONAPIListField,
+    JSONAPIListSerializer,
     JSONAPISerializer,
     Link,
     LinksField,
@@ -103,6 +107,19 @@ class FileTagField(ser.Field):
         return data
 
 
+class FileListSerializer(JSONAPIListSerializer):
+
+    def to_representation(self, data):
+        if not isinstance(data, collections.Mapping):
+            # Count the downloads of every osfstorage file on the page with one query
+            data = list(data)
+            self.context['download_counts'] = get_download_counts(
+                item for item in data
+                if item.provider == 'osfstorage' and item.is_file
+            )
+        return super(FileListSerializer, self).to_representation(data)
+
+
 class FileSerializer(JSONAPISerializer):
     filterable_fields = frozenset([
         'id',
@@ -167,6 +184,12 @@ class FileSerializer(JSONAPISerializer):
     class Meta:
         type_ = 'files'
 
+    # overrides JSONAPISerializer
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        kwargs['child'] = cls()
+        return FileListSerializer(*args, **kwargs)
+
     def get_size(self, obj):
         if obj.versions:
             return obj.versions[-1].size
@@ -208,8 +231,16 @@ class FileSerializer(JSONAPISerializer):
             'md5': metadata.get('md5', None),
             'sha256': metadata.get('sha256', None),
         }
+        if obj.provider == 'osfstorage' and obj.is_file:
+            extras['downloads'] = self.get_download_count(obj)
         return extras
 
+    def get_download_count(self, obj):
+        download_counts = self.context.get('download_counts', {})
+        if obj._id in download_counts:
+            return download_counts[obj._id]
+        return obj.get_download_count()
+
     def get_current_user_can_comment(self, obj):
         user = self.context['request'].user
         auth = Auth(user if not user.is_anonymous() else None)
@@ -219,7 +250,11 @@ class FileSerializer(JSONAPISerializer):
         user = self.context['request'].user
         if user.is_anonymous():
             return 0
-        return Comment.find_n_unread(user=user, node=obj.node, page='files', root_id=obj.get_guid()._id)
+        # Count every file's unread comments on the node at once, for the rest of the page
+        unread_counts = self.context.setdefault('unread_comment_counts', {})
+        if obj.node._id not in unread_counts:
+            unread_counts[obj.node._id] = Comment.find_unread_counts(user=user, node=obj.node)
+        return unread_counts[obj.node._id].get(obj.get_guid()._id, 0)
 
     def user_id(self, obj):
         # NOTE: obj is the user here, the meta field for
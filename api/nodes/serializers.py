@@ -102,6 +102,9 @@ class NodeSerializer(JSONAPISerializer):
     collection = ser.BooleanField(read_only=True, source='is_collection')
     tags = JSONAPIListField(child=NodeTagField(), required=False)
     node_license = NodeLicenseSerializer(read_only=True, required=False)
+    logs_copy_progress = ser.DictField(read_only=True, help_text='Number of logs copied so far and in total while the '
+                                                                  'logs of a large fork or registration are copied in '
+                                                                  'the background, otherwise null')
     template_from = ser.CharField(required=False, allow_blank=False, allow_null=False,
                                   help_text='Specify a node id for a node you would like to use as a template for the '
                                             'new node. Templating is like forking, except that you do not copy the '
@@ -1,3 +1,4 @@
+from django.http import StreamingHttpResponse
 from modularodm import Q
 from rest_framework import generics, permissions as drf_permissions
 from rest_framework.exceptions import PermissionDenied, ValidationError, NotFound, MethodNotAllowed
@@ -66,6 +67,7 @@ from website.exceptions import NodeStateError
 from website.util.permissions import ADMIN
 from website.models import Node, Pointer, Comment, NodeLog, Institution, DraftRegistration
 from website.files.models import FileNode
+from website.files.export import iter_ndjson
 from framework.auth.core import User
 from api.base.utils import default_node_list_query, default_node_permission_query
 
@@ -2235,6 +2237,49 @@ class NodeProviderDetail(JSONAPIBaseView, generics.RetrieveAPIView, NodeMixin):
         return NodeProvider(self.kwargs['provider'], Node.load(self.kwargs['node_id']))
 
 
+class NodeFilesExport(JSONAPIBaseView, NodeMixin):
+    """Every file and folder stored on a node for a provider, streamed as newline-delimited JSON. *Read-only*.
+
+    Walks the whole file tree in one request instead of one request per folder. Only providers whose file tree is
+    stored by the OSF (currently "osfstorage") can be exported; other providers return 404.
+
+    Each line is a JSON object for one file or folder, with every folder appearing before its contents:
+
+        id        string   OSF id of the file or folder
+        kind      string   "file" or "folder"
+        name      string   name of the file or folder
+        path      string   materialized path, e.g. "/data/results.csv"
+        parent    string   id of the containing folder
+        guid      string   GUID of the file or folder, or null if none has been assigned
+        size      integer  size in bytes of the latest version (files only)
+        version   string   identifier of the latest version (files only)
+        modified  iso8601  when the latest version was created (files only)
+        hashes    object   "md5" and "sha256" of the latest version (files only)
+
+    #This Request/Response
+
+    """
+    permission_classes = (
+        drf_permissions.IsAuthenticatedOrReadOnly,
+        ContributorOrPublic,
+        ExcludeWithdrawals,
+        base_permissions.TokenHasScope,
+    )
+
+    required_read_scopes = [CoreScopes.NODE_FILE_READ]
+    required_write_scopes = [CoreScopes.NODE_FILE_WRITE]
+
+    view_category = 'nodes'
+    view_name = 'node-files-export'
+
+    def get(self, request, *args, **kwargs):
+        node = self.get_node()
+        node_settings = node.get_addon(self.kwargs['provider'])
+        if not node_settings or not hasattr(node_settings, 'get_root'):
+            raise NotFound('The file tree of this provider is not stored by the OSF.')
+        return StreamingHttpResponse(iter_ndjson(node_settings.get_root()), content_type='application/x-ndjson')
+
+
 class NodeAlternativeCitationsList(JSONAPIBaseView, generics.ListCreateAPIView, NodeMixin):
     """List of alternative citations for a project.
 
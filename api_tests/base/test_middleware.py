@@ -9,7 +9,8 @@ from rest_framework.test import APIRequestFactory
 
 from website.util import api_v2_url
 from api.base import settings
-from api.base.middleware import TokuTransactionMiddleware, CorsMiddleware
+from api.base.middleware import TokuTransactionMiddleware, CorsMiddleware, UnitOfWorkMiddleware
+from framework.mongo import unit_of_work
 from tests.base import ApiTestCase
 from tests import factories
 
@@ -41,6 +42,44 @@ class TestMiddlewareRollback(MiddlewareTestCase):
 
         assert_true(mock_commands.commit.called)
 
+class TestUnitOfWorkMiddleware(MiddlewareTestCase):
+    MIDDLEWARE = UnitOfWorkMiddleware
+
+    def tearDown(self):
+        unit_of_work.discard()
+        super(TestUnitOfWorkMiddleware, self).tearDown()
+
+    def defer(self, callback):
+        self.middleware.process_request(mock.Mock())
+        unit_of_work.defer(mock.Mock(_name='node', _primary_key='abc12'), callback)
+
+    def test_200_OK_flushes_unit_of_work(self):
+        callback = mock.Mock()
+        self.defer(callback)
+        self.mock_response.status_code = 200
+        response = self.middleware.process_response(mock.Mock(), self.mock_response)
+        assert_is(response, self.mock_response)
+        assert_true(callback.called)
+
+    @mock.patch('api.base.middleware.sentry_exception_handler')
+    def test_failing_side_effect_returns_500(self, mock_sentry):
+        self.defer(mock.Mock(side_effect=ValueError))
+        self.mock_response.status_code = 200
+        response = self.middleware.process_response(mock.Mock(), self.mock_response)
+        assert_equal(response.status_code, 500)
+        assert_true(mock_sentry.called)
+        assert_is_none(unit_of_work.current())
+
+    @mock.patch('api.base.middleware.sentry_exception_handler')
+    @mock.patch('framework.transactions.handlers.commands')
+    def test_failing_side_effect_causes_rollback(self, mock_commands, mock_sentry):
+        self.defer(mock.Mock(side_effect=ValueError))
+        self.mock_response.status_code = 200
+        response = self.middleware.process_response(mock.Mock(), self.mock_response)
+        TokuTransactionMiddleware().process_response(mock.Mock(), response)
+        assert_true(mock_commands.rollback.called)
+        assert_false(mock_commands.commit.called)
+
 class TestCorsMiddleware(MiddlewareTestCase):
     MIDDLEWARE = CorsMiddleware
 
@@ -77,6 +77,17 @@ class TestFileView(ApiTestCase):
         assert_equal(attributes['extra']['hashes']['sha256'], None)
         assert_equal(attributes['tags'], [])
 
+    def test_get_file_download_count(self):
+        self.db['pagecounters'].update(
+            {'_id': 'download:{}:{}'.format(self.node._id, self.file._id)},
+            {'$inc': {'total': 7, 'unique': 3}}, True, False
+        )
+        res = self.app.get(self.file_url, auth=self.user.auth)
+        assert_equal(res.json['data']['attributes']['extra']['downloads'], 7)
+
+        res = self.app.get('/{}nodes/{}/files/osfstorage/'.format(API_BASE, self.node._id), auth=self.user.auth)
+        assert_equal(res.json['data'][0]['attributes']['extra']['downloads'], 7)
+
     def test_file_has_rel_link_to_owning_project(self):
         res = self.app.get(self.file_url, auth=self.user.auth)
         assert_equal(res.status_code, 200)
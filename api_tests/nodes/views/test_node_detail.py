@@ -172,6 +172,13 @@ class TestNodeDetail(ApiTestCase):
         assert_equal(res.json['data']['attributes']['registration'], False)
         assert_equal(res.json['data']['attributes']['collection'], False)
         assert_equal(res.json['data']['attributes']['tags'], [])
+        assert_is_none(res.json['data']['attributes']['logs_copy_progress'])
+
+    def test_node_logs_copy_progress(self):
+        self.public_project.logs_copy_progress = {'copied': 1000, 'total': 6000}
+        self.public_project.save()
+        res = self.app.get(self.public_url)
+        assert_equal(res.json['data']['attributes']['logs_copy_progress'], {'copied': 1000, 'total': 6000})
 
     def test_requesting_folder_returns_error(self):
         folder = NodeFactory(is_collection=True, creator=self.user)
@@ -0,0 +1,74 @@
+import json
+
+from nose.tools import *  # flake8: noqa
+
+from website.addons.osfstorage import settings as osfstorage_settings
+from website.util import permissions
+from api.base.settings.defaults import API_BASE
+from tests.base import ApiTestCase
+from tests.factories import (
+    ProjectFactory,
+    AuthUserFactory
+)
+
+
+def parse_ndjson(body):
+    return [json.loads(line) for line in body.splitlines()]
+
+
+class TestNodeFilesExport(ApiTestCase):
+
+    def setUp(self):
+        super(TestNodeFilesExport, self).setUp()
+        self.user = AuthUserFactory()
+        self.project = ProjectFactory(creator=self.user)
+        self.url = '/{}nodes/{}/files/providers/osfstorage/export/'.format(API_BASE, self.project._id)
+
+        root = self.project.get_addon('osfstorage').get_root()
+        self.folder = root.append_folder('data')
+        self.file = self.folder.append_file('results.csv')
+        self.file.create_version(self.user, {
+            'object': '06d80e',
+            'service': 'cloud',
+            osfstorage_settings.WATERBUTLER_RESOURCE: 'osf',
+        }, {
+            'size': 1337,
+            'contentType': 'text/csv',
+            'sha256': 'abc123',
+        }).save()
+        self.readme = root.append_file('README')
+
+    def test_exports_tree(self):
+        res = self.app.get(self.url, auth=self.user.auth)
+        assert_equal(res.status_code, 200)
+        assert_equal(res.content_type, 'application/x-ndjson')
+
+        records = parse_ndjson(res.body)
+        assert_equal([record['path'] for record in records], ['/README', '/data/', '/data/results.csv'])
+        folder, data_file = records[1], records[2]
+        assert_equal(folder['kind'], 'folder')
+        assert_equal(data_file['parent'], folder['id'])
+        assert_equal(data_file['size'], 1337)
+        assert_equal(data_file['version'], self.file.versions[0].identifier)
+        assert_equal(data_file['hashes'], {'md5': None, 'sha256': 'abc123'})
+        assert_is_none(data_file['guid'])
+
+    def test_exports_guids(self):
+        guid = self.file.get_guid(create=True)
+        records = parse_ndjson(self.app.get(self.url, auth=self.user.auth).body)
+        assert_equal(records[2]['guid'], guid._id)
+
+    def test_private_node_requires_contributor(self):
+        res = self.app.get(self.url, auth=AuthUserFactory().auth, expect_errors=True)
+        assert_equal(res.status_code, 403)
+
+    def test_read_contributor_can_export(self):
+        contributor = AuthUserFactory()
+        self.project.add_contributor(contributor, permissions=[permissions.READ], save=True)
+        res = self.app.get(self.url, auth=contributor.auth)
+        assert_equal(len(parse_ndjson(res.body)), 3)
+
+    def test_provider_without_stored_tree(self):
+        url = '/{}nodes/{}/files/providers/github/export/'.format(API_BASE, self.project._id)
+        res = self.app.get(url, auth=self.user.auth, expect_errors=True)
+        assert_equal(res.status_code, 404)
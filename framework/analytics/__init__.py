@@ -157,3 +157,33 @@ def get_basic_counters(page, db=None):
         return unique, total
     else:
         return None, None
+
+
+def get_basic_counters_bulk(pages, db=None):
+    """Fetch the counters of many pages with one query.
+
+    :param pages: Page keys, as passed to `get_basic_counters`
+    :param db: MongoDB database or `None`
+    :return: Dict mapping each page to its `(unique, total)` counts, or
+        `(None, None)` if the page has no counters
+    """
+    db = db or database
+    collection = db['pagecounters']
+    cleaned = {page: clean_page(page) for page in pages}
+    if not cleaned:
+        return {}
+    results = {
+        result['_id']: result
+        for result in collection.find(
+            {'_id': {'$in': list(set(cleaned.values()))}},
+            {'total': 1, 'unique': 1}
+        )
+    }
+    counters = {}
+    for page, key in cleaned.items():
+        result = results.get(key)
+        if result:
+            counters[page] = (result.get('unique', 0), result.get('total', 0))
+        else:
+            counters[page] = (None, None)
+    return counters
@@ -399,6 +399,8 @@ class User(GuidStoredObject, AddonModelMixin):
 
     # when comments were last viewed
     comments_viewed_timestamp = fields.DictionaryField()
+    # When comments on a target the user has never viewed were last viewed
+    DEFAULT_COMMENTS_VIEWED_TIMESTAMP = dt.datetime(1970, 1, 1, 12, 0, 0)
     # Format: {
     #   'Comment.root_target._id': 'timestamp',
     #   ...
@@ -1183,6 +1185,8 @@ class User(GuidStoredObject, AddonModelMixin):
         from framework.analytics import tasks as piwik_tasks
         self.username = self.username.lower().strip() if self.username else None
         ret = super(User, self).save(*args, **kwargs)
+        if 'date_disabled' in ret and self.is_disabled:
+            signals.user_disabled.send(self)
         if self.SEARCH_UPDATE_FIELDS.intersection(ret) and self.is_confirmed:
             self.update_search()
             self.update_search_nodes_contributors()
@@ -1503,8 +1507,7 @@ class User(GuidStoredObject, AddonModelMixin):
     def get_node_comment_timestamps(self, target_id):
         """ Returns the timestamp for when comments were last viewed on a node, file or wiki.
         """
-        default_timestamp = dt.datetime(1970, 1, 1, 12, 0, 0)
-        return self.comments_viewed_timestamp.get(target_id, default_timestamp)
+        return self.comments_viewed_timestamp.get(target_id, self.DEFAULT_COMMENTS_VIEWED_TIMESTAMP)
 
 
 def _merge_into_reversed(*iterables):
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Request-scoped memoization of authorization decisions.
+
+Permission checks such as ``Node.can_view`` and ``Node.has_permission`` walk
+up the ``parent_node`` chain and are evaluated many times for the same
+(node, user) while rendering a single page. Within a Flask or Django request
+their results are memoized here; outside of a request context (scripts,
+celery tasks, unit tests) every check is computed directly.
+
+The cache is cleared whenever a node's permissions or private links are
+saved, so a request that modifies contributors sees its own writes.
+"""
+import collections
+import logging
+import threading
+
+
+_local = threading.local()
+logger = logging.getLogger(__name__)
+
+
+def _cache():
+    return getattr(_local, 'cache', None)
+
+
+def counts():
+    """Return the permission-check counters for the current request. Checks
+    made outside of a request are not counted.
+    """
+    if not hasattr(_local, 'counts'):
+        _local.counts = collections.Counter()
+    return _local.counts
+
+
+def memoize(key, compute):
+    """Return the cached decision for ``key``, calling ``compute`` on a miss.
+
+    :param tuple key: Hashable key identifying the decision, e.g.
+        ``('can_view', node_id, user_id, private_key)``
+    :param compute: Zero-argument callable computing the decision
+    """
+    cache = _cache()
+    if cache is None:
+        return compute()
+    counter = counts()
+    counter['checks'] += 1
+    try:
+        value = cache[key]
+    except KeyError:
+        counter['misses'] += 1
+        value = cache[key] = compute()
+    else:
+        counter['hits'] += 1
+    return value
+
+
+def invalidate():
+    """Forget all cached decisions for the current request."""
+    cache = _cache()
+    if cache:
+        counts()['invalidations'] += 1
+        cache.clear()
+
+
+def permission_cache_before_request():
+    _local.cache = {}
+    _local.counts = collections.Counter()
+
+
+def permission_cache_teardown_request(error=None):
+    counter = counts()
+    if counter['checks']:
+        logger.debug(
+            'Permission checks: {checks} ({hits} cached, {misses} computed, {invalidations} invalidations)'.format(
+                **{key: counter[key] for key in ('checks', 'hits', 'misses', 'invalidations')}
+            )
+        )
+    _local.cache = None
+    _local.counts = collections.Counter()
+
+
+handlers = {
+    'before_request': permission_cache_before_request,
+    'teardown_request': permission_cache_teardown_request,
+}
@@ -7,5 +7,6 @@ user_registered = signals.signal('user-registered')
 user_confirmed = signals.signal('user-confirmed')
 user_email_removed = signals.signal('user-email-removed')
 user_merged = signals.signal('user-merged')
+user_disabled = signals.signal('user-disabled')
 
 unconfirmed_user_created = signals.signal('unconfirmed-user-created')
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""In-process caches shared by the threads (or greenlets) of a worker."""
+import collections
+import threading
+import time
+
+
+_MISSING = object()
+
+
+class LRUCache(object):
+    """Thread-safe, size-bounded cache evicting the least recently used entry,
+    with an optional time-to-live per entry.
+
+    :param int maxsize: Maximum number of entries kept
+    :param float ttl: Default seconds an entry stays valid; ``None`` for no expiry
+    """
+
+    def __init__(self, maxsize, ttl=None, clock=time.time):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = collections.OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires, value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires is not None and expires <= self._clock():
+                self.misses += 1
+                return default
+            # Re-insert to mark as most recently used
+            self._data[key] = (expires, value)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=_MISSING):
+        ttl = self.ttl if ttl is _MISSING else ttl
+        expires = self._clock() + ttl if ttl is not None else None
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (expires, value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
@@ -1,11 +1,12 @@
 # -*- coding: utf-8 -*-
 """Asynchronous task queue module."""
-from celery import Celery
+from celery import Celery, signals
 from celery.utils.log import get_task_logger
 
 from raven import Client
 from raven.contrib.celery import register_signal
 
+from framework.celery_tasks import metrics
 from website import settings
 
 app = Celery()
@@ -18,6 +19,12 @@ if settings.SENTRY_DSN:
     register_signal(client)
 
 
+@signals.before_task_publish.connect
+def stamp_publish_time(body=None, **kwargs):
+    """Record when each task is published, for the workers' wait time metrics."""
+    metrics.stamp(body)
+
+
 @app.task
 def error_handler(task_id, task_name):
     """logs detailed message about tasks that raise exceptions
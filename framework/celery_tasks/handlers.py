@@ -1,51 +1,126 @@
 # -*- coding: utf-8 -*-
+import binascii
 import logging
+import os
 import threading
 import functools
+from collections import OrderedDict
 
-from celery import group
 from flask import _app_ctx_stack as context_stack
 
 from api.base.api_globals import api_globals
+from framework.celery_tasks import app
 from website import settings
 
 
 _local = threading.local()
 logger = logging.getLogger(__name__)
 
+# Task name => names of the kwargs identifying signatures that coalesce
+_coalesce_rules = {}
+
+
+def coalesce_on(task, *kwarg_names):
+    """Collapse signatures of ``task`` queued in the same request that share
+    the values of ``kwarg_names`` into one, keeping the latest signature in
+    the place of the first. E.g. ``coalesce_on(update_node_async, 'node_id')``
+    indexes each node once per request however many times it is saved.
+    """
+    _coalesce_rules[task.name] = kwarg_names
+
+
+def signature_key(signature):
+    rule = _coalesce_rules.get(signature.task)
+    if rule is not None:
+        return (signature.task, ) + tuple(repr(signature.kwargs.get(name)) for name in rule)
+    return (signature.task, repr(signature.args), repr(sorted(signature.kwargs.items())))
+
+
+class TaskBuffer(object):
+    """Ordered buffer of the task signatures queued during a request, with
+    constant-time dedupe of identical or coalescing signatures.
+    """
+
+    def __init__(self):
+        self._signatures = OrderedDict()
+        # Signatures queued, and those collapsed into an already queued one
+        self.enqueued = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def __iter__(self):
+        return iter(self._signatures.values())
+
+    def __contains__(self, signature):
+        return signature_key(signature) in self._signatures
+
+    def add(self, signature, unique=False):
+        """Queue ``signature``, replacing a queued signature with the same key.
+
+        :param bool unique: Queue even if an identical signature is queued
+        """
+        key = signature_key(signature)
+        if unique:
+            key += (binascii.hexlify(os.urandom(8)), )
+        self.enqueued += 1
+        if key in self._signatures:
+            self.coalesced += 1
+        self._signatures[key] = signature
+
+    def clear(self):
+        self._signatures.clear()
+
+    def publish(self):
+        """Send the queued tasks to the broker over one connection, or run
+        them in order if Celery is disabled.
+        """
+        if settings.USE_CELERY:
+            with app.producer_or_acquire() as producer:
+                for signature in self:
+                    signature.apply_async(producer=producer)
+        else:
+            for signature in self:
+                signature.apply()
+
 
 def queue():
     if not hasattr(_local, 'queue'):
-        _local.queue = []
+        _local.queue = TaskBuffer()
     return _local.queue
 
 
 def celery_before_request():
-    _local.queue = []
+    _local.queue = TaskBuffer()
 
 
 def celery_after_request(response, base_status_code_error=500):
     if response.status_code >= base_status_code_error:
-        _local.queue = []
+        queue().clear()
     return response
 
 
 def celery_teardown_request(error=None):
     if error is not None:
-        _local.queue = []
+        queue().clear()
         return
-    if queue():
-        if settings.USE_CELERY:
-            group(queue()).apply_async()
-        else:
-            for task in queue():
-                task.apply()
-
-
-def enqueue_task(signature):
+    buffer = queue()
+    if buffer:
+        logger.debug('Publishing {} tasks ({} queued, {} coalesced)'.format(
+            len(buffer), buffer.enqueued, buffer.coalesced
+        ))
+        try:
+            buffer.publish()
+        finally:
+            buffer.clear()
+
+
+def enqueue_task(signature, unique=False):
     """If working in a request context, push task signature to thread-local
     queue to run after request is complete; else run signature immediately.
     :param signature: Celery task signature
+    :param bool unique: Queue even if an identical signature is already queued
     """
     if (
         context_stack.top is None and
@@ -53,8 +128,7 @@ def enqueue_task(signature):
     ):  # Not in a request context
         signature()
     else:
-        if signature not in queue():
-            queue().append(signature)
+        queue().add(signature, unique=unique)
 
 
 def queued_task(task):
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""Latency metrics for Celery tasks, collected from Celery's signals.
+
+Publishers stamp each task message with the time it was published. Workers
+record, per task name and queue, the wait from publishing to starting, the
+runtime, retries, failures and the approximate size of the result, and log
+a summary every ``settings.TASK_METRICS_LOG_INTERVAL`` seconds. Wait times
+compare clocks of different hosts, so they are only as accurate as the
+hosts' clock sync.
+"""
+import collections
+import logging
+import threading
+import time
+
+from framework.celery_tasks.routers import match_by_module
+
+
+logger = logging.getLogger(__name__)
+
+# Key of the publish time in task messages
+PUBLISHED_AT = 'osf_published_at'
+
+
+class TaskStats(object):
+
+    def __init__(self):
+        self.count = 0
+        self.failures = 0
+        self.retries = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.runtime_total = 0.0
+        self.runtime_max = 0.0
+        self.result_bytes = 0
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'failures': self.failures,
+            'retries': self.retries,
+            'wait_mean': self.wait_total / self.waits if self.waits else None,
+            'wait_max': self.wait_max if self.waits else None,
+            'runtime_mean': self.runtime_total / self.count if self.count else None,
+            'runtime_max': self.runtime_max,
+            'result_bytes_mean': self.result_bytes / self.count if self.count else None,
+        }
+
+
+class TaskMetrics(object):
+    """Thread-safe per-process collector of task metrics, keyed by
+    (task name, queue).
+    """
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stats = collections.defaultdict(TaskStats)
+        # Task ID => (key, start time, wait) of running tasks
+        self._running = {}
+        self._last_logged = clock()
+
+    def started(self, task_id, name, queue, published_at=None):
+        now = self._clock()
+        wait = max(now - published_at, 0.0) if published_at else None
+        with self._lock:
+            self._running[task_id] = ((name, queue), now, wait)
+
+    def finished(self, task_id, result=None):
+        now = self._clock()
+        with self._lock:
+            try:
+                key, start, wait = self._running.pop(task_id)
+            except KeyError:
+                return
+            stats = self._stats[key]
+            stats.count += 1
+            runtime = now - start
+            stats.runtime_total += runtime
+            stats.runtime_max = max(stats.runtime_max, runtime)
+            if wait is not None:
+                stats.waits += 1
+                stats.wait_total += wait
+                stats.wait_max = max(stats.wait_max, wait)
+            if result is not None:
+                stats.result_bytes += len(repr(result))
+
+    def failed(self, task_id):
+        with self._lock:
+            running = self._running.get(task_id)
+            if running is not None:
+                self._stats[running[0]].failures += 1
+
+    def retried(self, name, queue):
+        with self._lock:
+            self._stats[(name, queue)].retries += 1
+
+    def summary(self):
+        """Return a dict of {(task name, queue): stats dict}."""
+        with self._lock:
+            return {key: stats.to_dict() for key, stats in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._running.clear()
+
+    def log_summary(self, interval):
+        """Log the summary if ``interval`` seconds passed since it was last
+        logged; an ``interval`` of 0 disables logging.
+        """
+        now = self._clock()
+        with self._lock:
+            if not interval or now - self._last_logged < interval:
+                return
+            self._last_logged = now
+        for (name, queue), stats in sorted(self.summary().items()):
+            logger.info(format_stats(name, queue, stats))
+
+
+def format_stats(name, queue, stats):
+    def ms(seconds):
+        return '-' if seconds is None else '{:.1f}ms'.format(seconds * 1000)
+    return (
+        '{name} [{queue}]: {count} run, {failures} failed, {retries} retried; '
+        'wait mean {wait_mean} max {wait_max}; runtime mean {runtime_mean} max {runtime_max}; '
+        'result {result_bytes} bytes'.format(
+            name=name,
+            queue=queue,
+            count=stats['count'],
+            failures=stats['failures'],
+            retries=stats['retries'],
+            wait_mean=ms(stats['wait_mean']),
+            wait_max=ms(stats['wait_max']),
+            runtime_mean=ms(stats['runtime_mean']),
+            runtime_max=ms(stats['runtime_max']),
+            result_bytes='-' if stats['result_bytes_mean'] is None else int(stats['result_bytes_mean']),
+        )
+    )
+
+
+def task_queue(task):
+    """Return the queue ``task``'s current message was delivered from."""
+    delivery_info = getattr(task.request, 'delivery_info', None) or {}
+    return delivery_info.get('routing_key') or match_by_module(task.name)
+
+
+def stamp(body):
+    """Record the publish time in a task message's body."""
+    if body is not None:
+        body[PUBLISHED_AT] = time.time()
+
+
+metrics = TaskMetrics()
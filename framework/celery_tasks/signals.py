@@ -6,9 +6,10 @@ imported by Celery and is not used elsewhere in the application.
 from celery import signals
 from modularodm import storage
 
+from framework.celery_tasks.metrics import metrics, task_queue, PUBLISHED_AT
 from framework.mongo import set_up_storage, StoredObject
 
-from website import models
+from website import models, settings
 
 
 @signals.task_prerun.connect
@@ -24,3 +25,24 @@ def attach_models(*args, **kwargs):
     """Attach models to database collections on worker initialization.
     """
     set_up_storage(models.MODELS, storage.MongoStorage)
+
+
+@signals.task_prerun.connect
+def record_task_start(task_id=None, task=None, **kwargs):
+    metrics.started(task_id, task.name, task_queue(task), getattr(task.request, PUBLISHED_AT, None))
+
+
+@signals.task_postrun.connect
+def record_task_end(task_id=None, retval=None, **kwargs):
+    metrics.finished(task_id, retval)
+    metrics.log_summary(settings.TASK_METRICS_LOG_INTERVAL)
+
+
+@signals.task_failure.connect
+def record_task_failure(task_id=None, **kwargs):
+    metrics.failed(task_id)
+
+
+@signals.task_retry.connect
+def record_task_retry(sender=None, **kwargs):
+    metrics.retried(sender.name, task_queue(sender))
@@ -11,7 +11,7 @@ logger = logging.getLogger(__name__)
 
 @app.task
 def send_email(from_addr, to_addr, subject, message, mimetype='html', ttls=True, login=True,
-                username=None, password=None, categories=None):
+                username=None, password=None, categories=None, connection=None):
     """Send email to specified destination.
     Email is sent from the email specified in FROM_EMAIL settings in the
     settings module.
@@ -27,8 +27,12 @@ def send_email(from_addr, to_addr, subject, message, mimetype='html', ttls=True,
         See https://sendgrid.com/docs/User_Guide/Statistics/categories.html
         This parameter is only respected if using the Sendgrid API.
         ``settings.SENDGRID_API_KEY`` must be set.
+    :param connection: Connection from :func:`open_connection` to send
+        through, instead of opening one for this email only. Only usable
+        when calling the task directly.
 
-    :return: True if successful
+    :return: True if successful, False if sending failed, None if email is
+        disabled
     """
     if not settings.USE_EMAIL:
         return
@@ -39,7 +43,8 @@ def send_email(from_addr, to_addr, subject, message, mimetype='html', ttls=True,
             subject=subject,
             message=message,
             mimetype=mimetype,
-            categories=categories
+            categories=categories,
+            client=connection,
         )
     else:
         return _send_with_smtp(
@@ -51,21 +56,42 @@ def send_email(from_addr, to_addr, subject, message, mimetype='html', ttls=True,
             ttls=ttls,
             login=login,
             username=username,
-            password=password
+            password=password,
+            connection=connection,
         )
 
-def _send_with_smtp(from_addr, to_addr, subject, message, mimetype='html', ttls=True, login=True, username=None, password=None):
+
+def open_connection(ttls=True, login=True, username=None, password=None):
+    """Open a connection for sending many emails with :func:`send_email`: a
+    SendGrid client if ``settings.SENDGRID_API_KEY`` is set, otherwise a
+    logged-in SMTP session. Close it with :func:`close_connection`.
+
+    :return: The connection, or None if email is disabled or the SMTP
+        credentials are not set
+    """
+    if not settings.USE_EMAIL:
+        return None
+    if settings.SENDGRID_API_KEY:
+        return sendgrid.SendGridClient(settings.SENDGRID_API_KEY)
+    return _smtp_connect(ttls=ttls, login=login, username=username, password=password)
+
+
+def close_connection(connection):
+    if isinstance(connection, smtplib.SMTP):
+        try:
+            connection.quit()
+        except smtplib.SMTPException:
+            # The server already closed the session
+            pass
+
+
+def _smtp_connect(ttls=True, login=True, username=None, password=None):
     username = username or settings.MAIL_USERNAME
     password = password or settings.MAIL_PASSWORD
 
     if login and (username is None or password is None):
         logger.error('Mail username and password not set; skipping send.')
-        return
-
-    msg = MIMEText(message, mimetype, _charset='utf-8')
-    msg['Subject'] = subject
-    msg['From'] = from_addr
-    msg['To'] = to_addr
+        return None
 
     s = smtplib.SMTP(settings.MAIL_SERVER)
     s.ehlo()
@@ -74,12 +100,25 @@ def _send_with_smtp(from_addr, to_addr, subject, message, mimetype='html', ttls=
         s.ehlo()
     if login:
         s.login(username, password)
+    return s
+
+def _send_with_smtp(from_addr, to_addr, subject, message, mimetype='html', ttls=True, login=True, username=None, password=None, connection=None):
+    s = connection or _smtp_connect(ttls=ttls, login=login, username=username, password=password)
+    if s is None:
+        return False
+
+    msg = MIMEText(message, mimetype, _charset='utf-8')
+    msg['Subject'] = subject
+    msg['From'] = from_addr
+    msg['To'] = to_addr
+
     s.sendmail(
         from_addr=from_addr,
         to_addrs=[to_addr],
         msg=msg.as_string()
     )
-    s.quit()
+    if connection is None:
+        s.quit()
     return True
 
 def _send_with_sendgrid(from_addr, to_addr, subject, message, mimetype='html', categories=None, client=None):
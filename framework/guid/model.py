@@ -2,7 +2,7 @@
 import random
 
 import pymongo
-from modularodm import fields
+from modularodm import fields, Q
 
 from framework.mongo import StoredObject
 
@@ -46,6 +46,51 @@ class Guid(StoredObject):
             guid.save()
         return guid
 
+    @classmethod
+    def allocate(cls, referent_name, count, min_length=5):
+        """Create ``count`` Guids for new records of ``referent_name`` that
+        will use the Guids' ids as their primary keys, IE records that are
+        bulk inserted rather than saved one by one.
+
+        Candidates are checked against the blacklist and existing Guids with
+        one query each per round and inserted with one bulk write.
+
+        :param str referent_name: The ``_name`` of the referent's schema
+        :return: List of the new Guid ids
+        """
+        guid_ids = []
+        while len(guid_ids) < count:
+            candidates = set()
+            while len(candidates) < count - len(guid_ids):
+                candidates.add(''.join(random.sample(ALPHABET, min_length)))
+            candidates -= set(guid_ids)
+            taken = {
+                guid._id for guid in BlacklistGuid.find(Q('_id', 'in', list(candidates)))
+            } | {
+                guid._id for guid in cls.find(Q('_id', 'in', list(candidates)))
+            }
+            guid_ids.extend(candidates - taken)
+
+        if not guid_ids:
+            return guid_ids
+        docs = {
+            guid_id: cls(_id=guid_id, referent=(guid_id, referent_name)).to_storage()
+            for guid_id in guid_ids
+        }
+        store = cls._storage[0].store
+        try:
+            store.insert(docs.values(), continue_on_error=True)
+        except pymongo.errors.DuplicateKeyError:
+            # Another process took some of the ids since they were checked;
+            # keep the ones that were inserted and generate the rest
+            for doc in store.find({'_id': {'$in': guid_ids}}):
+                if doc.get('referent') != docs[doc['_id']].get('referent'):
+                    guid = cls.generate(min_length=min_length)
+                    guid.referent = (guid._id, referent_name)
+                    guid.save()
+                    guid_ids[guid_ids.index(doc['_id'])] = guid._id
+        return guid_ids
+
     def __repr__(self):
         return '<id:{0}, referent:({1}, {2})>'.format(self._id, self.referent._primary_key, self.referent._name)
 
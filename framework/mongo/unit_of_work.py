@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""Request-scoped batching of the side effects of saving models.
+
+Saving a node runs side effects for the fields that changed: signals, search
+updates and analytics. Flows such as forking or registering save the same
+node many times, running them again for every save. Within a unit of work,
+models that support it record each save with ``defer`` instead, and the side
+effects run once per object, for the merged changes of all its saves, when
+the unit of work is flushed.
+
+The writes themselves still happen on save, so that queries in the same unit
+of work see them; modular-odm only writes the fields that changed.
+
+Each Flask or Django request is a unit of work, flushed before the request's
+transaction is committed and its postcommit tasks run. ``unit_of_work()``
+opens one elsewhere, e.g. in scripts; outside of a unit of work, side effects
+run on every save.
+"""
+import contextlib
+import logging
+import threading
+from collections import OrderedDict
+
+
+_local = threading.local()
+logger = logging.getLogger(__name__)
+
+
+class UnitOfWork(object):
+    """Ordered record of the saves deferred in a unit of work, keyed by
+    (model name, primary key).
+    """
+
+    def __init__(self):
+        # Key => [latest instance, callback, list of save details]
+        self._pending = OrderedDict()
+        # Saves recorded, and objects whose side effects are pending
+        self.saves = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def record(self, obj, callback, **details):
+        """Record a save of ``obj``; ``callback`` is called with the list of
+        the details of each save when the unit of work is flushed.
+        """
+        key = (obj._name, obj._primary_key)
+        self.saves += 1
+        entry = self._pending.get(key)
+        if entry is None:
+            self._pending[key] = [obj, callback, [details]]
+        else:
+            entry[0], entry[1] = obj, callback
+            entry[2].append(details)
+
+    def flush(self):
+        """Run the side effects of the recorded saves, once per object."""
+        logger.debug('Flushing unit of work: {} saves of {} objects'.format(self.saves, len(self)))
+        while self._pending:
+            _, (obj, callback, saves) = self._pending.popitem(last=False)
+            callback(saves)
+
+    def clear(self):
+        self._pending.clear()
+
+
+def current():
+    """Return the active unit of work, or None."""
+    return getattr(_local, 'unit', None)
+
+
+def defer(obj, callback, **details):
+    """Record a save of ``obj`` in the active unit of work and return True,
+    or return False if there is none and ``callback`` should be called now.
+    """
+    unit = current()
+    if unit is None:
+        return False
+    unit.record(obj, callback, **details)
+    return True
+
+
+def begin():
+    _local.unit = UnitOfWork()
+
+
+def flush():
+    """Close the active unit of work, running its side effects. Saves made by
+    the side effects run their own immediately.
+    """
+    unit = current()
+    _local.unit = None
+    if unit:
+        unit.flush()
+
+
+def discard():
+    unit = current()
+    _local.unit = None
+    if unit is not None:
+        unit.clear()
+
+
+@contextlib.contextmanager
+def unit_of_work():
+    """Defer the side effects of saves made in the block until it exits.
+    Nested blocks join the outer unit of work.
+    """
+    if current() is not None:
+        yield current()
+        return
+    begin()
+    try:
+        yield current()
+    except Exception:
+        discard()
+        raise
+    flush()
+
+
+def unit_of_work_before_request():
+    begin()
+
+
+def unit_of_work_after_request(response, base_status_code_error=500):
+    if response.status_code >= base_status_code_error:
+        discard()
+    else:
+        flush()
+    return response
+
+
+def unit_of_work_teardown_request(error=None):
+    discard()
+
+
+handlers = {
+    'before_request': unit_of_work_before_request,
+    'after_request': unit_of_work_after_request,
+    'teardown_request': unit_of_work_teardown_request,
+}
@@ -1,70 +1,172 @@
 # -*- coding: utf-8 -*-
+import collections
 import functools
 import hashlib
 import logging
 import threading
+import time
 
 import binascii
 from collections import OrderedDict
 import os
 
-from celery import chain
-from framework.celery_tasks import app
+import gevent
 from celery.local import PromiseProxy
+from gevent import monkey
 from gevent.pool import Pool
 
+from framework.celery_tasks.handlers import enqueue_task
 from website import settings
 
 _local = threading.local()
 logger = logging.getLogger(__name__)
 
+PostcommitTask = collections.namedtuple('PostcommitTask', ['func', 'timeout', 'overflow'])
+
+
+class Histogram(object):
+    """Thread-safe histogram of durations, in seconds.
+
+    :param tuple bounds: Ascending upper bounds of the buckets; larger values
+        are counted in a final, unbounded bucket
+    """
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def observe(self, value):
+        index = 0
+        while index < len(self.bounds) and value > self.bounds[index]:
+            index += 1
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self):
+        """Return a dict of the count, sum and cumulative bucket counts."""
+        with self._lock:
+            cumulative, buckets = 0, []
+            for bound, count in zip(self.bounds + (float('inf'), ), self.counts):
+                cumulative += count
+                buckets.append((bound, cumulative))
+            return {'count': self.count, 'sum': self.sum, 'buckets': buckets}
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * (len(self.bounds) + 1)
+            self.count = 0
+            self.sum = 0.0
+            self._last_logged = time.time()
+
+    def log_summary(self, name, interval):
+        """Log the histogram if ``interval`` seconds passed since it was last
+        logged; an ``interval`` of 0 disables logging.
+        """
+        now = time.time()
+        with self._lock:
+            if not interval or now - self._last_logged < interval:
+                return
+            self._last_logged = now
+        snapshot = self.snapshot()
+        logger.info('{}: {} observed, {:.3f}s total; {}'.format(
+            name, snapshot['count'], snapshot['sum'],
+            ', '.join('<={}s: {}'.format(bound, count) for bound, count in snapshot['buckets'])
+        ))
+
+# Time spent on postcommit tasks per request
+postcommit_durations = Histogram(settings.POSTCOMMIT_HISTOGRAM_BUCKETS)
+
+_pool = None
+
+def is_monkeypatched():
+    """Whether threading is monkeypatched by gevent, so that every request
+    runs in a greenlet of the same hub.
+    """
+    if hasattr(monkey, 'is_module_patched'):
+        return monkey.is_module_patched('threading')
+    return 'threading' in getattr(monkey, 'saved', {})
+
+def get_pool():
+    """Return the pool postcommit tasks run in: shared by the process when
+    requests are greenlets, otherwise a new one for the calling request, as
+    gevent pools cannot be shared between OS threads.
+    """
+    global _pool
+    if not is_monkeypatched():
+        return Pool(settings.POSTCOMMIT_POOL_SIZE)
+    if _pool is None:
+        _pool = Pool(settings.POSTCOMMIT_POOL_SIZE)
+    return _pool
+
 def postcommit_queue():
     if not hasattr(_local, 'postcommit_queue'):
         _local.postcommit_queue = OrderedDict()
     return _local.postcommit_queue
 
-def postcommit_celery_queue():
-    if not hasattr(_local, 'postcommit_celery_queue'):
-        _local.postcommit_celery_queue = OrderedDict()
-    return _local.postcommit_celery_queue
-
 def postcommit_before_request():
     _local.postcommit_queue = OrderedDict()
-    _local.postcommit_celery_queue = OrderedDict()
 
-@app.task(max_retries=5, default_retry_delay=60)
-def postcommit_celery_task_wrapper(queue):
-    # chain.apply calls the tasks synchronously without re-enqueuing each one
-    # http://stackoverflow.com/questions/34177131/how-to-solve-python-celery-error-when-using-chain-encodeerrorruntimeerrormaxi?answertab=votes#tab-top
-    chain(*queue.values()).apply()
+def run_task(task):
+    """Run a postcommit task within its time budget, logging rather than
+    raising its failures, so they cannot affect the request or other tasks.
+    """
+    name = getattr(task.func.func, '__name__', task.func.func)
+    try:
+        with gevent.Timeout(task.timeout):
+            task.func()
+    except gevent.Timeout:
+        logger.error('Postcommit task {} exceeded its budget of {}s'.format(name, task.timeout))
+    except Exception:
+        logger.exception('Postcommit task {} failed'.format(name))
 
 def postcommit_after_request(response, base_status_error_code=500):
     if response.status_code >= base_status_error_code:
         _local.postcommit_queue = OrderedDict()
-        _local.postcommit_celery_queue = OrderedDict()
         return response
     try:
         if postcommit_queue():
-            number_of_threads = 30  # one db connection per greenlet, let's share
-            pool = Pool(number_of_threads)
-            for func in postcommit_queue().values():
-                pool.spawn(func)
-            pool.join(timeout=5.0, raise_error=True)  # 5 second timeout and reraise exceptions
-
-        if postcommit_celery_queue():
-            if settings.USE_CELERY:
-                # delay pushes the wrapper task into celery
-                postcommit_celery_task_wrapper.delay(postcommit_celery_queue())
-            else:
-                for task in postcommit_celery_queue().values():
-                    task()
+            start = time.time()
+            pool = get_pool()
+            greenlets = []
+            for task in postcommit_queue().values():
+                if task.overflow is not None and pool.full():
+                    signature = task.overflow()
+                    if signature is not None:
+                        enqueue_task(signature)
+                    continue
+                # Waits for a free greenlet if the pool is full
+                greenlets.append(pool.spawn(run_task, task))
+            # Tasks still running after the wait carry on in the background,
+            # until they finish or run out of budget. Without monkeypatching
+            # nothing would run them once the request returns, so the request
+            # waits for them, each still bounded by its budget
+            timeout = settings.POSTCOMMIT_WAIT_TIMEOUT if is_monkeypatched() else None
+            gevent.joinall(greenlets, timeout=timeout)
+            postcommit_durations.observe(time.time() - start)
+            postcommit_durations.log_summary('Postcommit time per request', settings.TASK_METRICS_LOG_INTERVAL)
 
     except AttributeError as ex:
         if not settings.DEBUG_MODE:
             logger.error('Post commit task queue not initialized: {}'.format(ex))
     return response
 
-def enqueue_postcommit_task(fn, args, kwargs, celery=False, once_per_request=True):
+def enqueue_postcommit_task(fn, args, kwargs, celery=False, once_per_request=True, timeout=None, overflow=None):
+    """
+    :param float timeout: Seconds the task may run; defaults to
+        ``settings.POSTCOMMIT_TASK_TIMEOUT``
+    :param overflow: Function taking the same arguments as ``fn`` and returning
+        a Celery signature doing the same work (or None if there is nothing to
+        do), run instead of ``fn`` when the postcommit pool is full
+    """
+    if celery and isinstance(fn, PromiseProxy):
+        # Celery tasks share the request's task buffer, which publishes them
+        # once the request is torn down, after the transaction is committed
+        enqueue_task(fn.si(*args, **kwargs), unique=not once_per_request)
+        return
+
     # make a hash of the pertinent data
     raw = [fn.__name__, fn.__module__, args, kwargs]
     m = hashlib.md5()
@@ -75,21 +177,23 @@ def enqueue_postcommit_task(fn, args, kwargs, celery=False, once_per_request=Tru
         # we want to run it once for every occurrence, add a random string
         key = '{}:{}'.format(key, binascii.hexlify(os.urandom(8)))
 
-    if celery and isinstance(fn, PromiseProxy):
-        postcommit_celery_queue().update({key: fn.si(*args, **kwargs)})
-    else:
-        postcommit_queue().update({key: functools.partial(fn, *args, **kwargs)})
+    postcommit_queue().update({key: PostcommitTask(
+        func=functools.partial(fn, *args, **kwargs),
+        timeout=timeout or settings.POSTCOMMIT_TASK_TIMEOUT,
+        overflow=functools.partial(overflow, *args, **kwargs) if overflow else None,
+    )})
 
 handlers = {
     'before_request': postcommit_before_request,
     'after_request': postcommit_after_request,
 }
 
-def run_postcommit(once_per_request=True, celery=False):
+def run_postcommit(once_per_request=True, celery=False, timeout=None):
     '''
     Delays function execution until after the request's transaction has been committed.
     If you set the celery kwarg to True args and kwargs must be JSON serializable
     Tasks will only be run if the response's status code is < 500.
+    Other tasks are stopped after ``timeout`` seconds (``settings.POSTCOMMIT_TASK_TIMEOUT`` by default).
     :return:
     '''
     def wrapper(func):
@@ -98,6 +202,6 @@ def run_postcommit(once_per_request=True, celery=False):
             return func
         @functools.wraps(func)
         def wrapped(*args, **kwargs):
-            enqueue_postcommit_task(func, args, kwargs, celery=celery, once_per_request=once_per_request)
+            enqueue_postcommit_task(func, args, kwargs, celery=celery, once_per_request=once_per_request, timeout=timeout)
         return wrapped
     return wrapper
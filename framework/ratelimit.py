@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""Rate limiting of outgoing requests shared by the threads of a worker."""
+import threading
+import time
+
+
+class TokenBucket(object):
+    """Thread-safe token bucket allowing ``rate`` acquisitions per second with
+    bursts of up to ``capacity``.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.time, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Take one token, blocking until one is available."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self._sleep(wait)
@@ -6,6 +6,7 @@ import httplib as http
 import json
 import logging
 import os
+import time
 
 from flask import request, make_response
 import lxml.html
@@ -26,6 +27,9 @@ logger = logging.getLogger(__name__)
 
 TEMPLATE_DIR = settings.TEMPLATES_PATH
 
+def _module_directory(name):
+    return os.path.join(settings.MAKO_MODULE_DIR, settings.VERSION, name)
+
 _TPL_LOOKUP = TemplateLookup(
     default_filters=[
         'unicode',  # default filter; must set explicitly when overriding
@@ -34,7 +38,8 @@ _TPL_LOOKUP = TemplateLookup(
         TEMPLATE_DIR,
         os.path.join(settings.BASE_PATH, 'addons/'),
     ],
-    module_directory='/tmp/mako_modules'
+    module_directory=_module_directory('default'),
+    filesystem_checks=not settings.MAKO_PRECOMPILED,
 )
 
 _TPL_LOOKUP_SAFE = TemplateLookup(
@@ -50,9 +55,42 @@ _TPL_LOOKUP_SAFE = TemplateLookup(
         TEMPLATE_DIR,
         os.path.join(settings.BASE_PATH, 'addons/'),
     ],
-    module_directory='/tmp/mako_modules',
+    module_directory=_module_directory('safe'),
+    filesystem_checks=not settings.MAKO_PRECOMPILED,
 )
 
+TEMPLATE_LOOKUPS = {
+    'default': _TPL_LOOKUP,
+    'safe': _TPL_LOOKUP_SAFE,
+}
+
+
+def precompile_templates(lookups=None):
+    """Compile every ``.mako`` template found in the lookups' directories into
+    their module directories, so that workers never compile on first request.
+
+    :param dict lookups: Mapping of names to ``TemplateLookup`` objects;
+        defaults to ``TEMPLATE_LOOKUPS``
+    :return: List of ``(lookup name, uri, seconds, error)`` tuples, slowest first
+    """
+    report = []
+    for name, lookup in (lookups or TEMPLATE_LOOKUPS).items():
+        for directory in lookup.directories:
+            for dirpath, _, filenames in os.walk(directory):
+                for filename in filenames:
+                    if not filename.endswith('.mako'):
+                        continue
+                    uri = '/' + os.path.relpath(os.path.join(dirpath, filename), directory)
+                    start = time.time()
+                    error = None
+                    try:
+                        lookup.get_template(uri)
+                    except Exception as e:
+                        error = e
+                    report.append((name, uri, time.time() - start, error))
+    report.sort(key=lambda entry: entry[2], reverse=True)
+    return report
+
 REDIRECT_CODES = [
     http.MOVED_PERMANENTLY,
     http.FOUND,
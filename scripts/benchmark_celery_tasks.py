@@ -0,0 +1,131 @@
+"""
+Benchmark representative Celery tasks through an in-memory broker: each run
+is published, received and executed the way a worker would, and the task
+metrics collected by the workers' signal handlers are printed at the end.
+
+Tasks run against a scratch database, which is dropped afterwards. Search,
+WaterButler and email are mocked out, so the numbers cover Celery overhead
+and the tasks' own database and rendering work.
+
+    python -m scripts.benchmark_celery_tasks [--runs 20] [--files 200]
+"""
+import argparse
+
+import mock
+from celery.worker.job import Request
+
+from framework.celery_tasks import app as celery_app
+from framework.celery_tasks.metrics import format_stats, metrics
+from framework.celery_tasks.routers import match_by_module
+from framework.mongo import client
+
+from website import settings
+from website.app import init_app
+
+
+DB_NAME = 'osf_celery_benchmark'
+
+
+def make_file_tree(files, per_folder=50):
+    folders = []
+    for index in range(0, files, per_folder):
+        path = '/folder{}'.format(index // per_folder)
+        folders.append({
+            'path': path + '/',
+            'name': 'folder {}'.format(index // per_folder),
+            'kind': 'folder',
+            'children': [
+                {
+                    'path': '{}/file{}'.format(path, each),
+                    'name': 'file {}.csv'.format(each),
+                    'kind': 'file',
+                    'size': 1024,
+                }
+                for each in range(index, min(index + per_folder, files))
+            ],
+        })
+    return {'path': '/', 'name': '', 'kind': 'folder', 'children': folders}
+
+
+def run_through_broker(signature):
+    """Publish ``signature`` to the in-memory broker, then receive and
+    execute it as a worker would.
+    """
+    queue = celery_app.amqp.queues[match_by_module(signature.task)]
+    with celery_app.connection() as connection:
+        signature.apply_async(connection=connection, queue=queue.name)
+        with connection.SimpleQueue(queue, no_ack=True) as simple_queue:
+            message = simple_queue.get(timeout=1)
+    Request(message.payload, app=celery_app, message=message).execute()
+
+
+def make_cases(files):
+    # Imported here, since the factories need the app's storage backends
+    from tests import factories
+    from website.archiver import utils as archiver_utils
+    from website.archiver.tasks import stat_addon
+    from website.notifications.tasks import send_users_email
+    from website.search.elastic_search import update_node_async
+
+    user = factories.UserFactory()
+    project = factories.ProjectFactory(creator=user, is_public=True)
+    registration = factories.RegistrationFactory(user=user, project=project, send_signals=False)
+    archiver_utils.before_archive(registration, user)
+    job_id = registration.archive_job._id
+
+    def digest():
+        for _ in range(5):
+            factories.NotificationDigestFactory(
+                user_id=user._id,
+                send_type='email_transactional',
+                message='Benchmark comment',
+                node_lineage=[project._id],
+            )
+        return send_users_email.si('email_transactional')
+
+    return [
+        ('search update', lambda: update_node_async.si(node_id=project._id)),
+        ('archiver stat', lambda: stat_addon.si('osfstorage', job_id)),
+        ('digest send', digest),
+    ], make_file_tree(files)
+
+
+def benchmark(runs, files):
+    cases, file_tree = make_cases(files)
+    metrics.reset()
+    with mock.patch('website.search.elastic_search.es'), \
+            mock.patch('website.addons.base.StorageAddonBase._get_file_tree', return_value=file_tree), \
+            mock.patch.object(settings, 'USE_EMAIL', False):
+        for _, make_signature in cases:
+            for _ in range(runs):
+                run_through_broker(make_signature())
+
+    print('{0} runs per task, {1} files per archive'.format(runs, files))
+    for (name, queue), stats in sorted(metrics.summary().items()):
+        print(format_stats(name, queue, stats))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--files', type=int, default=200)
+    args = parser.parse_args()
+
+    settings.DB_NAME = DB_NAME
+    celery_app.conf.update(
+        BROKER_URL='memory://',
+        CELERY_RESULT_BACKEND='cache',
+        CELERY_CACHE_BACKEND='memory',
+        CELERY_ALWAYS_EAGER=False,
+    )
+    init_app(routes=False, set_backends=True)
+    # Connect the workers' signal handlers, which collect the metrics
+    import framework.celery_tasks.signals  # noqa
+    try:
+        benchmark(args.runs, args.files)
+    finally:
+        client.drop_database(DB_NAME)
+
+
+if __name__ == '__main__':
+    main()
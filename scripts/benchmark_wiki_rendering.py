@@ -0,0 +1,80 @@
+"""
+Benchmark rendering of large, code-heavy wiki pages, cold and from the
+wiki render cache.
+
+    python -m scripts.benchmark_wiki_rendering [--pages 20] [--blocks 50] [--views 5]
+"""
+import argparse
+import collections
+import time
+
+from website.app import init_app
+from website.addons.wiki import model
+
+
+BenchmarkNode = collections.namedtuple('BenchmarkNode', ['_id'])
+
+CODE_BLOCK = '''```python
+def fibonacci_{index}(n):
+    """Return the first n Fibonacci numbers."""
+    a, b = 0, 1
+    numbers = []
+    for _ in range(n):
+        numbers.append(a)
+        a, b = b, a + b
+    return numbers
+```
+'''
+
+
+def make_content(blocks):
+    sections = []
+    for index in range(blocks):
+        sections.append(
+            '## Section {index}\n\n'
+            'See [[page {index}]] and http://example.com/{index} for *details*.\n\n'
+            '{code}'.format(index=index, code=CODE_BLOCK.format(index=index))
+        )
+    return '\n'.join(sections)
+
+
+def benchmark(pages, blocks, views):
+    node = BenchmarkNode('bench')
+    content = make_content(blocks)
+    wiki_pages = [
+        model.NodeWikiPage(_id='benchmark{}'.format(index), page_name='page {}'.format(index), content=content)
+        for index in range(pages)
+    ]
+    model.render_cache.clear()
+
+    start = time.time()
+    for page in wiki_pages:
+        page.html(node)
+    cold = time.time() - start
+
+    start = time.time()
+    for _ in range(views):
+        for page in wiki_pages:
+            page.html(node)
+            page.raw_text(node)
+    warm = time.time() - start
+
+    print('{0} pages of {1} code blocks ({2} KB each)'.format(pages, blocks, len(content) / 1024))
+    print('Cold render:   {0:8.1f}ms total, {1:6.2f}ms per page'.format(cold * 1000, cold * 1000 / pages))
+    print('Cached views:  {0:8.1f}ms total, {1:6.2f}ms per page view'.format(
+        warm * 1000, warm * 1000 / (pages * views)
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--blocks', type=int, default=50)
+    parser.add_argument('--views', type=int, default=5)
+    args = parser.parse_args()
+    init_app(routes=False, set_backends=True)
+    benchmark(args.pages, args.blocks, args.views)
+
+
+if __name__ == '__main__':
+    main()
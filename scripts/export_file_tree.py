@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Export every file and folder a node stores for a provider as
+newline-delimited JSON, one record per line (see website.files.export).
+
+    python -m scripts.export_file_tree abc12 [--provider osfstorage] [--output tree.ndjson]
+"""
+import argparse
+import logging
+import sys
+
+from website.app import init_app
+from website.files.export import iter_ndjson
+from website.models import Node
+
+
+logger = logging.getLogger(__name__)
+
+
+def export_file_tree(node, provider, out):
+    """Write the NDJSON export of ``node``'s ``provider`` file tree to ``out``.
+
+    :raises: ValueError if the node has no stored file tree for the provider
+    :return: Number of records written
+    """
+    node_settings = node.get_addon(provider)
+    if not node_settings or not hasattr(node_settings, 'get_root'):
+        raise ValueError('Node {0} has no stored file tree for {1}'.format(node._id, provider))
+    count = 0
+    for line in iter_ndjson(node_settings.get_root()):
+        out.write(line)
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('node_id')
+    parser.add_argument('--provider', default='osfstorage')
+    parser.add_argument('--output', help='File to write to, standard output by default')
+    args = parser.parse_args()
+    init_app(routes=False, set_backends=True)
+
+    node = Node.load(args.node_id)
+    if node is None:
+        parser.error('No node with id {0}'.format(args.node_id))
+    if args.output:
+        with open(args.output, 'w') as out:
+            count = export_file_tree(node, args.provider, out)
+    else:
+        count = export_file_tree(node, args.provider, sys.stdout)
+    logger.info('Exported {0} files and folders of {1}'.format(count, node._id))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""Load tests for API v2, the legacy Flask app and WaterButler's auth callback.
+
+1. Seed a database with users and public project trees, writing a manifest
+   of what was created, which the load tests read::
+
+    python -m scripts.loadtest.seed --users 10 --projects 5 --out loadtest_seed.json
+
+2. Run one or more profiles against running API and Flask servers, saving
+   locust's statistics as CSV::
+
+    LOADTEST_SEED_FILE=loadtest_seed.json locust -f scripts/loadtest/locustfile.py \\
+        --no-web -c 50 -r 5 -n 5000 --csv=results/run ApiUser WebsiteUser
+
+3. Build a report of the percentiles and throughput of each request, and
+   diff it against the report of another commit::
+
+    python -m scripts.loadtest.report build results/run --out results/report.json
+    python -m scripts.loadtest.report diff results/base.json results/report.json
+
+See ``config`` for the environment variables the load tests read.
+"""
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""Settings of the load tests, read from the environment."""
+import json
+import os
+
+
+# Hosts of the legacy Flask app and of API v2
+HOST = os.environ.get('LOADTEST_HOST', 'http://localhost:5000')
+API_HOST = os.environ.get('LOADTEST_API_HOST', 'http://localhost:8000')
+VERIFY = os.environ.get('LOADTEST_VERIFY', '').lower() in ('1', 'true', 'yes')
+
+# Manifest written by ``scripts.loadtest.seed``
+SEED_FILE = os.environ.get('LOADTEST_SEED_FILE', 'loadtest_seed.json')
+
+# Seconds simulated users wait between tasks
+MIN_WAIT = float(os.environ.get('LOADTEST_MIN_WAIT', 1)) * 1000
+MAX_WAIT = float(os.environ.get('LOADTEST_MAX_WAIT', 5)) * 1000
+
+_seed = None
+
+
+def load_seed(path=None):
+    """Return the seed manifest, read once per process."""
+    global _seed
+    if _seed is None or path is not None:
+        with open(path or SEED_FILE) as fp:
+            _seed = json.load(fp)
+    return _seed
@@ -1,113 +1,51 @@
 #!/usr/bin/env python
 # encoding: utf-8
-"""Load testing for file upload, listing, and download with OSF Storage.
-"""
-
-import json
-import random
-import string
-from cStringIO import StringIO
-
-from locust import HttpLocust, TaskSet, task
-
-
-HOST = 'http://localhost:5000/'
-USERNAME = 'calici@cat.com'
-PASSWORD = 'asdfasdf'
-VERIFY = False
-
-PROJECT_TITLE = 'load-test'
-FILE_NAME = 'the-miracle.mp3'
-FILE_SIZE = 1024
-CONTENT_TYPE = 'text/plain'
-
-
-def random_string(nchars):
-    return ''.join([
-        random.choice(string.lowercase)
-        for _ in range(nchars)
-    ])
+"""Load test profiles for API v2, the legacy Flask app and WaterButler's auth
+callback. Run them all, weighted, or pick profiles by class name::
 
+    locust -f scripts/loadtest/locustfile.py ApiUser WaterButlerUser
 
-def make_file_name(nchars):
-    return random_string(nchars)
-
-
-def make_file_like(nchars):
-    sio = StringIO(random_string(nchars))
-    return sio
-
-
-class UserBehavior(TaskSet):
-
-    def __init__(self, *args, **kwargs):
-        super(UserBehavior, self).__init__(*args, **kwargs)
-        self.node_id = None
-
-    def login(self):
-        self.client.post(
-            'login/',
-            {'username': USERNAME, 'password': PASSWORD},
-            verify=VERIFY,
-        )
+Seed the database and set the hosts first; see ``scripts.loadtest``.
+"""
+import os
+import sys
 
-    def create_project(self):
-        resp = self.client.post(
-            'api/v1/project/new/',
-            data=json.dumps({'title': PROJECT_TITLE}),
-            headers={'Content-Type': 'application/json'},
-            verify=VERIFY,
-        )
-        node_url = resp.json()['projectUrl']
-        self.node_id = node_url.strip('/').split('/')[-1]
+from locust import HttpLocust
 
-    def on_start(self):
-        self.login()
-        self.create_project()
-        self.upload_file(name=FILE_NAME)
+# locust imports this file by path; make the repository importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir)))
 
-    @task
-    def upload_file(self, name=None):
-        request_url = 'api/v1/project/{0}/osfstorage/files/'.format(self.node_id)
-        resp = self.client.post(
-            request_url,
-            data=json.dumps({
-                'name': name or make_file_name(16),
-                'size': FILE_SIZE,
-                'type': CONTENT_TYPE,
-            }),
-            headers={'Content-Type': 'application/json'},
-            name='/api/v1/project/[nodeId]/osfstorage/files/',
-        )
-        upload_url = resp.json()
-        self.client.put(
-            upload_url,
-            data=make_file_like(FILE_SIZE),
-            headers={'Content-Type': CONTENT_TYPE},
-            name='/files/',
-        )
+from scripts.loadtest import config  # noqa
+from scripts.loadtest import scenarios  # noqa
 
-    @task
-    def list_files(self):
-        self.client.get(
-            'api/v1/{0}/osfstorage/files/'.format(self.node_id),
-            verify=VERIFY,
-            name='/api/v1/project/[nodeId]/osfstorage/files/',
-        )
 
-    @task
-    def download_file(self):
-        self.client.get(
-            'project/{0}/osfstorage/files/{1}/download/'.format(
-                self.node_id, FILE_NAME,
-            ),
-            verify=VERIFY,
-            name='/project/[nodeId]/osfstorage/files/[fileName]/download/',
-        )
+class ApiUser(HttpLocust):
+    host = config.API_HOST
+    task_set = scenarios.ApiNodes
+    weight = 5
+    min_wait = config.MIN_WAIT
+    max_wait = config.MAX_WAIT
 
 
 class WebsiteUser(HttpLocust):
-    host = HOST
-    task_set = UserBehavior
-    min_wait = 5000
-    max_wait = 10000
+    host = config.HOST
+    task_set = scenarios.WebsitePages
+    weight = 3
+    min_wait = config.MIN_WAIT
+    max_wait = config.MAX_WAIT
+
+
+class WaterButlerUser(HttpLocust):
+    host = config.HOST
+    task_set = scenarios.WaterButlerAuth
+    weight = 3
+    min_wait = config.MIN_WAIT
+    max_wait = config.MAX_WAIT
+
+
+class StorageUser(HttpLocust):
+    host = config.HOST
+    task_set = scenarios.OsfStorage
+    weight = 1
+    min_wait = config.MIN_WAIT
+    max_wait = config.MAX_WAIT
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""Build and compare reports of load test runs.
+
+``build`` reads the statistics locust writes with ``--csv=<prefix>``
+(``<prefix>_requests.csv`` and ``<prefix>_distribution.csv``) and writes a
+JSON report of the p50, p95 and p99 response times, throughput and failures
+of each request, tagged with the commit the run tested. Reports are written
+with sorted keys, so they can also be compared with ``diff``.
+
+``diff`` prints the changes between two reports, and exits with status 1 if
+a request's p95 grew by more than ``--threshold`` percent.
+
+    python -m scripts.loadtest.report build results/run [--commit <sha>] [--out report.json]
+    python -m scripts.loadtest.report diff base.json report.json [--threshold 10]
+"""
+from __future__ import print_function
+
+import argparse
+import csv
+import datetime
+import json
+import subprocess
+import sys
+
+
+TOTAL = 'Total'
+PERCENTILES = ('50%', '95%', '99%')
+METRICS = ('p50', 'p95', 'p99', 'rps')
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _read_csv(path):
+    with open(path) as fp:
+        return list(csv.DictReader(fp))
+
+
+def _request_key(method, name):
+    if name == TOTAL or method in (None, '', 'None'):
+        return TOTAL
+    return '{} {}'.format(method, name)
+
+
+def parse_stats(requests_rows, distribution_rows):
+    """Return a dict of {request: stats} from the rows of locust's CSV files.
+
+    Requests are keyed by method and name, e.g. ``GET /v2/nodes/[id]/``, and
+    the aggregate of all requests by ``Total``.
+    """
+    stats = {}
+    for row in requests_rows:
+        key = _request_key(row.get('Method'), row.get('Name'))
+        stats[key] = {
+            'requests': int(_number(row.get('# requests')) or 0),
+            'failures': int(_number(row.get('# failures')) or 0),
+            'mean': _number(row.get('Average response time')),
+            'max': _number(row.get('Max response time')),
+            'rps': _number(row.get('Requests/s')),
+        }
+    for row in distribution_rows:
+        # Distribution rows name requests by method and name in one column
+        name = row.get('Name', '')
+        key = TOTAL if name.endswith(TOTAL) and name.split(' ', 1)[0] in ('None', TOTAL) else name
+        entry = stats.setdefault(key, {})
+        for percentile in PERCENTILES:
+            entry['p' + percentile.rstrip('%')] = _number(row.get(percentile))
+    return stats
+
+
+def current_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD']).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(prefix, commit=None):
+    """Return the report of the run whose statistics locust wrote to
+    ``<prefix>_requests.csv`` and ``<prefix>_distribution.csv``.
+    """
+    return {
+        'commit': commit or current_commit(),
+        'created': datetime.datetime.utcnow().isoformat(),
+        'requests': parse_stats(
+            _read_csv('{}_requests.csv'.format(prefix)),
+            _read_csv('{}_distribution.csv'.format(prefix)),
+        ),
+    }
+
+
+def _change(old, new):
+    if old is None or new is None:
+        return None
+    if not old:
+        return 0.0 if not new else float('inf')
+    return (new - old) * 100.0 / old
+
+
+def diff_reports(old, new):
+    """Return a list of (request, {metric: (old, new, percent change)}),
+    for the requests in either report, ordered by name with the total last.
+    """
+    names = set(old['requests']) | set(new['requests'])
+    rows = []
+    for name in sorted(names - {TOTAL}) + ([TOTAL] if TOTAL in names else []):
+        before = old['requests'].get(name, {})
+        after = new['requests'].get(name, {})
+        rows.append((name, {
+            metric: (before.get(metric), after.get(metric), _change(before.get(metric), after.get(metric)))
+            for metric in METRICS
+        }))
+    return rows
+
+
+def regressions(rows, threshold):
+    """Return the names of the requests whose p95 grew by more than
+    ``threshold`` percent.
+    """
+    return [
+        name for name, metrics in rows
+        if metrics['p95'][2] is not None and metrics['p95'][2] > threshold
+    ]
+
+
+def format_diff(old, new, rows):
+    def value(number):
+        return '-' if number is None else '{:.1f}'.format(number)
+
+    def change(percent):
+        return '' if percent is None else ' ({:+.1f}%)'.format(percent)
+
+    lines = ['{} -> {}'.format(old.get('commit'), new.get('commit'))]
+    for name, metrics in rows:
+        parts = []
+        for metric in METRICS:
+            before, after, percent = metrics[metric]
+            parts.append('{} {} -> {}{}'.format(metric, value(before), value(after), change(percent)))
+        lines.append(name)
+        lines.append('    ' + '; '.join(parts))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command')
+    build = subparsers.add_parser('build', help='Build a report from locust CSV files')
+    build.add_argument('prefix', help='Prefix passed to locust --csv')
+    build.add_argument('--commit', default=None, help='Commit tested; defaults to the checked out commit')
+    build.add_argument('--out', default=None, help='File to write; defaults to standard output')
+    diff = subparsers.add_parser('diff', help='Compare two reports')
+    diff.add_argument('old')
+    diff.add_argument('new')
+    diff.add_argument('--threshold', type=float, default=10.0, help='Percent p95 growth counted as a regression')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        output = json.dumps(build_report(args.prefix, commit=args.commit), indent=2, sort_keys=True)
+        if args.out:
+            with open(args.out, 'w') as fp:
+                fp.write(output + '\n')
+        else:
+            print(output)
+        return
+
+    with open(args.old) as fp:
+        old = json.load(fp)
+    with open(args.new) as fp:
+        new = json.load(fp)
+    rows = diff_reports(old, new)
+    print(format_diff(old, new, rows))
+    regressed = regressions(rows, args.threshold)
+    if regressed:
+        print('p95 regressed by more than {}%: {}'.format(args.threshold, ', '.join(regressed)))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""Task sets simulating the traffic of each load test profile.
+
+Requests are named after their route, with IDs replaced by placeholders, so
+that locust aggregates the statistics of all requests to the same route.
+"""
+import datetime
+import json
+import random
+import string
+from cStringIO import StringIO
+
+import jwe
+import jwt
+from locust import TaskSet, task
+
+from scripts.loadtest import config
+from website import settings
+
+
+WATERBUTLER_JWE_KEY = jwe.kdf(settings.WATERBUTLER_JWE_SECRET.encode('utf-8'), settings.WATERBUTLER_JWE_SALT.encode('utf-8'))
+
+# Query strings of node listings, by request name
+NODE_LIST_QUERIES = {
+    'default': lambda node: {},
+    'filter[category]': lambda node: {'filter[category]': 'project'},
+    'filter[tags]': lambda node: {'filter[tags]': random.choice(node['tags'] or ['none'])},
+    'filter[title]': lambda node: {'filter[title]': 'the'},
+    'filter[root]': lambda node: {'filter[root]': node['root']},
+    'embed=contributors': lambda node: {'embed': 'contributors'},
+    'filter[public]&embed=parent': lambda node: {'filter[public]': 'true', 'embed': 'parent'},
+}
+
+FILE_SIZE = 1024
+CONTENT_TYPE = 'text/plain'
+
+
+def random_string(nchars):
+    return ''.join(random.choice(string.lowercase) for _ in range(nchars))
+
+
+def make_waterbutler_payload(node_id, action, provider='osfstorage'):
+    """Return the encrypted payload WaterButler sends to the auth callback."""
+    return jwe.encrypt(jwt.encode({
+        'exp': datetime.datetime.utcnow() + datetime.timedelta(seconds=settings.WATERBUTLER_JWT_EXPIRATION),
+        'data': {
+            'nid': node_id,
+            'provider': provider,
+            'action': action,
+        },
+    }, settings.WATERBUTLER_JWT_SECRET, algorithm=settings.WATERBUTLER_JWT_ALGORITHM), WATERBUTLER_JWE_KEY)
+
+
+class SeededTaskSet(TaskSet):
+    """Task set acting as a random seeded user, authenticated with Basic auth
+    if ``authenticated`` is set.
+    """
+
+    authenticated = True
+
+    def on_start(self):
+        seed = config.load_seed()
+        self.user = random.choice(seed['users'])
+        self.nodes = seed['nodes']
+        self.own_nodes = [node for node in self.nodes if self.user['id'] in node['contributors']] or self.nodes
+        self.client.verify = config.VERIFY
+        if self.authenticated:
+            self.client.auth = (self.user['username'], seed['password'])
+
+    def random_node(self, own=False):
+        return random.choice(self.own_nodes if own else self.nodes)
+
+
+class ApiNodes(SeededTaskSet):
+    """Node listings, details, logs and contributors in API v2."""
+
+    @task(4)
+    def list_nodes(self):
+        name, query = random.choice(NODE_LIST_QUERIES.items())
+        self.client.get(
+            '/v2/nodes/',
+            params=query(self.random_node()),
+            name='/v2/nodes/?{}'.format(name),
+        )
+
+    @task(3)
+    def node_detail(self):
+        self.client.get(
+            '/v2/nodes/{}/'.format(self.random_node()['id']),
+            name='/v2/nodes/[id]/',
+        )
+
+    @task(2)
+    def node_children(self):
+        self.client.get(
+            '/v2/nodes/{}/children/'.format(self.random_node()['id']),
+            name='/v2/nodes/[id]/children/',
+        )
+
+    @task(2)
+    def node_logs(self):
+        self.client.get(
+            '/v2/nodes/{}/logs/'.format(self.random_node()['id']),
+            name='/v2/nodes/[id]/logs/',
+        )
+
+    @task(2)
+    def node_contributors(self):
+        self.client.get(
+            '/v2/nodes/{}/contributors/'.format(self.random_node()['id']),
+            params={'embed': 'users'},
+            name='/v2/nodes/[id]/contributors/?embed=users',
+        )
+
+    @task(1)
+    def user_nodes(self):
+        self.client.get(
+            '/v2/users/{}/nodes/'.format(self.user['id']),
+            name='/v2/users/[id]/nodes/',
+        )
+
+
+class WebsitePages(SeededTaskSet):
+    """Project pages, wiki pages and search in the legacy Flask app, browsed
+    anonymously.
+    """
+
+    authenticated = False
+
+    @task(3)
+    def project_page(self):
+        self.client.get(
+            '/project/{}/'.format(self.random_node()['id']),
+            name='/project/[pid]/',
+        )
+
+    @task(3)
+    def wiki_page(self):
+        node = self.random_node()
+        self.client.get(
+            '/project/{}/wiki/{}/'.format(node['id'], random.choice(node['wikis'] or ['home'])),
+            name='/project/[pid]/wiki/[wname]/',
+        )
+
+    @task(2)
+    def search(self):
+        self.client.get(
+            '/api/v1/search/',
+            params={'q': random.choice(self.random_node()['tags'] or ['the'])},
+            name='/api/v1/search/?q',
+        )
+
+    @task(1)
+    def project_summary(self):
+        self.client.get(
+            '/api/v1/project/{}/get_summary/'.format(self.random_node()['id']),
+            name='/api/v1/project/[pid]/get_summary/',
+        )
+
+
+class WaterButlerAuth(SeededTaskSet):
+    """WaterButler's auth callback, for downloads from any public node and
+    uploads to the user's own nodes.
+    """
+
+    @task(3)
+    def download_auth(self):
+        self.client.get(
+            '/api/v1/files/auth/',
+            params={'payload': make_waterbutler_payload(self.random_node()['id'], 'download')},
+            name='/api/v1/files/auth/?action=download',
+        )
+
+    @task(1)
+    def upload_auth(self):
+        self.client.get(
+            '/api/v1/files/auth/',
+            params={'payload': make_waterbutler_payload(self.random_node(own=True)['id'], 'upload')},
+            name='/api/v1/files/auth/?action=upload',
+        )
+
+
+class OsfStorage(SeededTaskSet):
+    """Upload, listing and download of files in OSF Storage through the legacy
+    Flask app.
+    """
+
+    def on_start(self):
+        super(OsfStorage, self).on_start()
+        self.node_id = self.random_node(own=True)['id']
+        self.file_name = random_string(16)
+        self.upload_file(name=self.file_name)
+
+    @task
+    def upload_file(self, name=None):
+        resp = self.client.post(
+            '/api/v1/project/{0}/osfstorage/files/'.format(self.node_id),
+            data=json.dumps({
+                'name': name or random_string(16),
+                'size': FILE_SIZE,
+                'type': CONTENT_TYPE,
+            }),
+            headers={'Content-Type': 'application/json'},
+            name='/api/v1/project/[pid]/osfstorage/files/',
+        )
+        self.client.put(
+            resp.json(),
+            data=StringIO(random_string(FILE_SIZE)),
+            headers={'Content-Type': CONTENT_TYPE},
+            name='/files/',
+        )
+
+    @task
+    def list_files(self):
+        self.client.get(
+            '/api/v1/project/{0}/osfstorage/files/'.format(self.node_id),
+            name='/api/v1/project/[pid]/osfstorage/files/',
+        )
+
+    @task
+    def download_file(self):
+        self.client.get(
+            '/project/{0}/osfstorage/files/{1}/download/'.format(self.node_id, self.file_name),
+            name='/project/[pid]/osfstorage/files/[name]/download/',
+        )
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""Seed a database with data for the load tests.
+
+Creates users and, for each, public project trees with contributors drawn
+from the other users, tags and versioned wiki pages, which also give every
+node a history of logs. Writes a manifest of what was created, which the
+load tests read. Runs against the configured database, so point it at a
+scratch one.
+
+    python -m scripts.loadtest.seed [--users 10] [--projects 5] [--components 3]
+        [--depth 2] [--contributors 3] [--tags 5] [--wiki-versions 3]
+        [--out loadtest_seed.json]
+"""
+from __future__ import print_function
+
+import argparse
+import json
+import logging
+import random
+
+from framework.auth import Auth
+from framework.mongo.unit_of_work import unit_of_work
+from scripts import utils as script_utils
+from tests.base import fake
+from tests.factories import NodeFactory, ProjectFactory, UserFactory
+from website.app import init_app
+
+
+logger = logging.getLogger(__name__)
+
+PASSWORD = 'loadtest'
+
+
+def create_user(index):
+    user = UserFactory(
+        username='loadtest{}@example.com'.format(index),
+        fullname=fake.name(),
+    )
+    user.set_password(PASSWORD, notify=False)
+    user.save()
+    return user
+
+
+def populate_node(node, auth, contributors, tags, wiki_versions):
+    for contributor in contributors:
+        node.add_contributor(contributor, auth=auth)
+    for _ in range(tags):
+        node.add_tag(fake.word(), auth=auth)
+    for _ in range(wiki_versions):
+        node.update_node_wiki('home', fake.paragraph(), auth)
+    node.save()
+
+
+def create_tree(creator, users, components, depth, contributors, tags, wiki_versions):
+    """Create a public project with ``components`` children per node, down to
+    ``depth`` levels below the project, and return its nodes.
+    """
+    auth = Auth(user=creator)
+    others = [user for user in users if user != creator]
+
+    def populate(node):
+        chosen = random.sample(others, min(contributors, len(others)))
+        populate_node(node, auth, chosen, tags, wiki_versions)
+
+    project = ProjectFactory(
+        creator=creator,
+        title=fake.sentence(),
+        description=fake.paragraph(),
+        is_public=True,
+    )
+    populate(project)
+    nodes, level = [project], [project]
+    for _ in range(depth):
+        children = []
+        for parent in level:
+            for _ in range(components):
+                child = NodeFactory(
+                    parent=parent,
+                    creator=creator,
+                    title=fake.sentence(),
+                    description=fake.paragraph(),
+                    is_public=True,
+                )
+                populate(child)
+                children.append(child)
+        nodes.extend(children)
+        level = children
+    return nodes
+
+
+def serialize_node(node):
+    return {
+        'id': node._id,
+        'root': node.root._id,
+        'creator': node.creator._id,
+        'contributors': node.contributors._to_primary_keys(),
+        'tags': node.tags._to_primary_keys(),
+        'wikis': node.wiki_pages_current.keys(),
+    }
+
+
+def seed(users, projects, components, depth, contributors, tags, wiki_versions):
+    """Create the seed data and return its manifest."""
+    created_users = [create_user(index) for index in range(users)]
+    nodes = []
+    for user in created_users:
+        for _ in range(projects):
+            # Side effects of the many saves of each node run once per node
+            with unit_of_work():
+                tree = create_tree(user, created_users, components, depth, contributors, tags, wiki_versions)
+            nodes.extend(tree)
+            logger.info('Created project {} with {} nodes'.format(tree[0]._id, len(tree)))
+    return {
+        'password': PASSWORD,
+        'users': [{'id': user._id, 'username': user.username} for user in created_users],
+        'nodes': [serialize_node(node) for node in nodes],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--projects', type=int, default=5, help='Projects per user')
+    parser.add_argument('--components', type=int, default=3, help='Components per node')
+    parser.add_argument('--depth', type=int, default=2, help='Levels of components')
+    parser.add_argument('--contributors', type=int, default=3, help='Contributors added per node')
+    parser.add_argument('--tags', type=int, default=5, help='Tags per node')
+    parser.add_argument('--wiki-versions', type=int, default=3, help='Versions of each wiki page')
+    parser.add_argument('--random-seed', type=int, default=None)
+    parser.add_argument('--out', default='loadtest_seed.json')
+    args = parser.parse_args()
+
+    script_utils.add_file_logger(logger, __file__)
+    random.seed(args.random_seed)
+    fake.seed(args.random_seed)
+    init_app(set_backends=True, routes=False)
+    manifest = seed(
+        args.users, args.projects, args.components, args.depth,
+        args.contributors, args.tags, args.wiki_versions,
+    )
+    with open(args.out, 'w') as fp:
+        json.dump(manifest, fp, indent=2, sort_keys=True)
+    print('Seeded {} users and {} nodes; manifest written to {}'.format(
+        len(manifest['users']), len(manifest['nodes']), args.out
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -18,6 +18,9 @@ from website.settings import POPULAR_LINKS_NODE, NEW_AND_NOTEWORTHY_LINKS_NODE,
 
 logger = logging.getLogger(__name__)
 
+# Number of top scoring nodes considered before filtering
+NEW_AND_NOTEWORTHY_CANDIDATES = 25
+
 def popular_activity_json():
     """ Return popular_public_projects node_ids """
 
@@ -28,14 +31,6 @@ def popular_activity_json():
         popular_ids['popular_node_ids'].append(project._id)
     return popular_ids
 
-def unique_contributors(nodes, node):
-    """ Projects in New and Noteworthy should not have common contributors """
-
-    for added_node in nodes:
-        if set(added_node['contributors']).intersection(node['contributors']) != set():
-            return False
-    return True
-
 def acceptable_title(node):
     """ Omit projects that have certain words in the title """
 
@@ -45,12 +40,31 @@ def acceptable_title(node):
     return True
 
 def filter_nodes(node_list):
+    """ Projects in New and Noteworthy should not have common contributors,
+    so skip nodes sharing a contributor with any node already chosen """
     final_node_list = []
+    chosen_contributors = set()
     for node in node_list:
-        if unique_contributors(final_node_list, node) and acceptable_title(node):
+        if chosen_contributors.isdisjoint(node['contributors']) and acceptable_title(node):
             final_node_list.append(node)
+            chosen_contributors.update(node['contributors'])
     return final_node_list
 
+def score_nodes(node_ids, since, limit=NEW_AND_NOTEWORTHY_CANDIDATES):
+    """ Rank nodes by the number of distinct log actions since a date, with
+    one aggregation over the nodelog collection
+
+    :return: list of (node_id, unique_actions), highest scoring first
+    """
+    result = db.nodelog.aggregate([
+        {'$match': {'node': {'$in': list(node_ids)}, 'date': {'$gt': since}}},
+        {'$group': {'_id': {'node': '$node', 'action': '$action'}}},
+        {'$group': {'_id': '$_id.node', 'unique_actions': {'$sum': 1}}},
+        {'$sort': {'unique_actions': -1, '_id': 1}},
+        {'$limit': limit},
+    ])['result']
+    return [(each['_id'], each['unique_actions']) for each in result]
+
 def get_new_and_noteworthy_nodes():
     """ Fetches new and noteworthy nodes
 
@@ -59,15 +73,20 @@ def get_new_and_noteworthy_nodes():
     """
     today = datetime.datetime.now()
     last_month = (today - dateutil.relativedelta.relativedelta(months=1))
-    data = db.node.find({'date_created': {'$gt': last_month}, 'is_public': True, 'is_registration': False, 'parent_node': None,
-                         'is_deleted': False, 'is_collection': False})
-    nodes = []
-    for node in data:
-        unique_actions = len(db.nodelog.find({'node': node['_id']}).distinct('action'))
-        node['unique_actions'] = unique_actions
-        nodes.append(node)
-
-    noteworthy_nodes = sorted(nodes, key=lambda node: node.get('unique_actions'), reverse=True)[:25]
+    node_ids = [
+        node['_id'] for node in
+        db.node.find({'date_created': {'$gt': last_month}, 'is_public': True, 'is_registration': False, 'parent_node': None,
+                      'is_deleted': False, 'is_collection': False}, {'_id': True})
+    ]
+    if not node_ids:
+        return []
+
+    scores = score_nodes(node_ids, last_month)
+    nodes = {
+        node['_id']: node
+        for node in db.node.find({'_id': {'$in': [node_id for node_id, _ in scores]}}, {'title': True, 'contributors': True})
+    }
+    noteworthy_nodes = [nodes[node_id] for node_id, _ in scores if node_id in nodes]
     filtered_new_and_noteworthy = filter_nodes(noteworthy_nodes)
 
     return [each['_id'] for each in filtered_new_and_noteworthy]
@@ -0,0 +1,37 @@
+"""
+Rebuild the conference submissions shown on the meetings pages, for every
+conference or the given endpoints. Submissions are kept up to date as nodes
+change; run this after importing data or to repair the collection.
+
+    python -m scripts.rebuild_conference_submissions [spsp2014 ...] [--dry]
+"""
+import logging
+import sys
+
+from modularodm import Q
+
+from framework.transactions.context import TokuTransaction
+
+from website.app import init_app
+from website.conferences.model import Conference, ConferenceSubmission
+from scripts import utils as script_utils
+
+logger = logging.getLogger(__name__)
+
+
+def main(endpoints=None):
+    conferences = Conference.find(Q('endpoint', 'in', endpoints)) if endpoints else Conference.find()
+    for conference in conferences:
+        ConferenceSubmission.rebuild(conference)
+        logger.info('Rebuilt {0} submissions of {1}'.format(conference.num_submissions, conference.endpoint))
+
+
+if __name__ == '__main__':
+    dry = '--dry' in sys.argv
+    if not dry:
+        script_utils.add_file_logger(logger, __file__)
+    init_app(routes=False, set_backends=True)
+    with TokuTransaction():
+        main([arg for arg in sys.argv[1:] if not arg.startswith('--')])
+        if dry:
+            raise Exception('Dry Run -- Aborting Transaction')
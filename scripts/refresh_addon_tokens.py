@@ -1,29 +1,52 @@
 #!/usr/bin/env python
 # encoding: utf-8
+"""Refresh the OAuth tokens of addon accounts whose access tokens are about
+to expire.
 
+Each provider's accounts are refreshed by a pool of worker threads sharing
+the provider's token bucket, so its rate limit, configured in
+``settings.ADDON_TOKEN_REFRESH_RATE_LIMITS``, holds however many workers run,
+and providers are refreshed concurrently. Workers only talk to the
+provider; the calling thread writes each account's new tokens as soon as its
+refresh returns, since providers such as Box rotate the refresh token and
+the old one stops working.
+"""
+
+import collections
 import logging
 import datetime
+import threading
 import time
+from multiprocessing.pool import ThreadPool
 
+import requests
 from modularodm import Q
 from oauthlib.oauth2 import OAuth2Error
 from dateutil.relativedelta import relativedelta
 
 from framework.celery_tasks import app as celery_app
+from framework.ratelimit import TokenBucket
 
 from scripts import utils as scripts_utils
 
+from website import settings
 from website.app import init_app
 from website.addons.box.model import Box
 from website.addons.googledrive.model import GoogleDriveProvider
 from website.addons.mendeley.model import Mendeley
 from website.oauth.models import ExternalAccount
+from website.oauth.signals import oauth_key_refreshed
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 PROVIDER_CLASSES = (Box, GoogleDriveProvider, Mendeley, )
 
+RefreshSummary = collections.namedtuple('RefreshSummary', ['found', 'refreshed', 'failed', 'skipped', 'seconds'])
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
 
 def look_up_provider(addon_short_name):
     for Provider in PROVIDER_CLASSES:
@@ -39,14 +62,76 @@ def get_targets(delta, addon_short_name):
         Q('provider', 'eq', addon_short_name)
     )
 
-def main(delta, Provider, rate_limit, dry_run):
-    allowance = rate_limit[0]
-    last_call = time.time()
+def get_rate_limiter(addon_short_name, rate_limit=None):
+    """Return the shared :class:`TokenBucket` for ``addon_short_name``.
+
+    :param tuple rate_limit: of form (<requests>, <seconds>). Defaults to the
+        provider's limit in settings
+    """
+    rate_limit = tuple(rate_limit or settings.ADDON_TOKEN_REFRESH_RATE_LIMITS.get(
+        addon_short_name, settings.ADDON_TOKEN_REFRESH_RATE_LIMIT
+    ))
+    key = (addon_short_name, rate_limit)
+    with _buckets_lock:
+        if key not in _buckets:
+            _buckets[key] = TokenBucket(rate_limit[0] / float(rate_limit[1]), capacity=rate_limit[0])
+        return _buckets[key]
+
+def refresh_record(Provider, record, limiter):
+    """Refresh the tokens of ``record`` without saving them.
+
+    :return: Whether the refresh succeeded
+    """
+    limiter.acquire()
+    try:
+        success = Provider(record).refresh_oauth_key(force=True, save=False)
+    except (OAuth2Error, requests.RequestException) as e:
+        logger.error('Unable to refresh tokens on record {}: {}'.format(record.__repr__(), e))
+        return False
+    logger.info(
+        'Status of record {}: {}'.format(
+            record.__repr__(),
+            'SUCCESS' if success else 'FAILURE')
+    )
+    return bool(success)
+
+def save_tokens(records, Provider=None):
+    """Write the refreshed tokens of ``records``, setting only the token fields
+    rather than saving each whole account.
+
+    :param Provider: Provider of ``records``; if given, signals that their
+        tokens were refreshed
+    """
+    collection = ExternalAccount._storage[0].store
+    for record in records:
+        collection.update(
+            {'_id': record._id},
+            {'$set': {
+                'oauth_key': record.oauth_key,
+                'refresh_token': record.refresh_token,
+                'expires_at': record.expires_at,
+            }}
+        )
+        if Provider is not None:
+            oauth_key_refreshed.send(Provider(record), account=record)
+
+def main(delta, Provider, rate_limit=None, dry_run=True, workers=None):
+    """Refresh the tokens of ``Provider``'s accounts expiring before now minus ``delta``.
+
+    :param tuple rate_limit: of form (<requests>, <seconds>). Defaults to the
+        provider's limit in settings
+    :return: RefreshSummary
+    """
+    workers = workers or settings.ADDON_TOKEN_REFRESH_WORKERS
+    start = time.time()
+    targets = []
+    skipped = 0
     for record in get_targets(delta, Provider.short_name):
         if Provider(record).has_expired_credentials:
             logger.info(
                 'Found expired record {}, skipping'.format(record.__repr__())
             )
+            skipped += 1
             continue
 
         logger.info(
@@ -55,38 +140,54 @@ def main(delta, Provider, rate_limit, dry_run):
                 record.expires_at.strftime('%c')
             )
         )
-        if not dry_run:
-            if allowance < 1:
-                try: 
-                    time.sleep(rate_limit[1] - (time.time() - last_call))
-                except (ValueError, IOError):
-                    pass  # Value/IOError indicates negative sleep time in Py 3.5/2.7, respectively
-                allowance = rate_limit[0]
-
-            allowance -= 1
-            last_call = time.time()
-            success = False
-            try:
-                success = Provider(record).refresh_oauth_key(force=True)
-            except OAuth2Error as e:
-                logger.error(e)
-            else:
-                logger.info(
-                    'Status of record {}: {}'.format(
-                        record.__repr__(),
-                        'SUCCESS' if success else 'FAILURE')
-                )
+        targets.append(record)
+
+    refreshed = failed = 0
+    if not dry_run and targets:
+        limiter = get_rate_limiter(Provider.short_name, rate_limit)
+        pool = ThreadPool(min(workers, len(targets)))
+        try:
+            results = pool.imap_unordered(
+                lambda record: (record, refresh_record(Provider, record, limiter)),
+                targets
+            )
+            for record, success in results:
+                if not success:
+                    failed += 1
+                    continue
+                refreshed += 1
+                save_tokens([record], Provider)
+        finally:
+            pool.terminate()
+
+    summary = RefreshSummary(
+        found=len(targets) + skipped,
+        refreshed=refreshed,
+        failed=failed,
+        skipped=skipped,
+        seconds=time.time() - start,
+    )
+    logger.info(
+        '{0}: found {1.found}, refreshed {1.refreshed}, failed {1.failed}, '
+        'skipped {1.skipped} in {1.seconds:.1f}s{2}'.format(
+            Provider.short_name, summary, ' (dry run)' if dry_run else ''
+        )
+    )
+    return summary
 
 
 @celery_app.task(name='scripts.refresh_addon_tokens')
-def run_main(addons=None, rate_limit=(5, 1), dry_run=True):
+def run_main(addons=None, rate_limit=None, dry_run=True):
     """
     :param dict addons: of form {'<addon_short_name>': int(<refresh_token validity duration in days>)}
-    :param tuple rate_limit: of form (<requests>, <seconds>). Default is five per second
+    :param tuple rate_limit: of form (<requests>, <seconds>), applied to each
+        provider. Defaults to each provider's limit in settings
+    :return: dict of addon short names to their RefreshSummary
     """
     init_app(set_backends=True, routes=False)
     if not dry_run:
         scripts_utils.add_file_logger(logger, __file__)
+    jobs = []
     for addon in addons:
         try:
             days = int(addons[addon]) - 3 # refresh tokens that expire this in the next three days
@@ -95,6 +196,21 @@ def run_main(addons=None, rate_limit=(5, 1), dry_run=True):
         delta = relativedelta(days=days)
         Provider = look_up_provider(addon)
         if not Provider:
-            logger.error('Unable to find Provider class for addon {}'.format(addon_short_name))
+            logger.error('Unable to find Provider class for addon {}'.format(addon))
         else:
-            main(delta, Provider, rate_limit, dry_run=dry_run)
+            jobs.append((delta, Provider))
+    if not jobs:
+        return {}
+
+    pool = ThreadPool(len(jobs))
+    try:
+        summaries = pool.map(
+            lambda job: main(job[0], job[1], rate_limit, dry_run=dry_run),
+            jobs
+        )
+    finally:
+        pool.terminate()
+    return {
+        Provider.short_name: summary
+        for (_, Provider), summary in zip(jobs, summaries)
+    }
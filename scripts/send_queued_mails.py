@@ -1,11 +1,23 @@
+"""Send the queued mails that are due, at most one per user per
+``settings.WAIT_BETWEEN_MAILS``.
+
+The mail to send for each user is picked by one aggregation over the queue.
+Presends and rendering run in this thread, since they query the database;
+rendered mails are then sent by ``settings.QUEUED_MAIL_WORKERS`` threads,
+each reusing one SMTP session (or SendGrid client) for all of its mails.
+Sent mails are marked with one update per ``settings.QUEUED_MAIL_BATCH_SIZE``.
+"""
 import logging
+import threading
+from multiprocessing.pool import ThreadPool
 
 from datetime import datetime
 
 from modularodm import Q
 
 from framework.celery_tasks import app as celery_app
-from framework.transactions.context import TokuTransaction
+from framework.email.tasks import close_connection, open_connection, send_email
+from framework.mongo import database
 
 from website.app import init_app
 from website import mails, settings
@@ -17,51 +29,113 @@ logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 
-def main(dry_run=True):
-    # find all emails to be sent, pops the top one for each user(to obey the once
-    # a week requirement), checks to see if one has been sent this week, and if
-    # not send the email, otherwise leave it in the queue
-
-    user_queue = {}
-    for email in find_queued_mails_ready_to_be_sent():
-        user_queue.setdefault(email.user._id, []).append(email)
-
-    emails_to_be_sent = pop_and_verify_mails_for_each_user(user_queue)
+def main(dry_run=True, workers=None, batch_size=None):
+    # find the oldest email ready to be sent for each user who has not been
+    # sent one this week (to obey the once a week requirement), and send it;
+    # other emails are left in the queue
+    workers = workers or settings.QUEUED_MAIL_WORKERS
+    batch_size = batch_size or settings.QUEUED_MAIL_BATCH_SIZE
+    emails_to_be_sent = list(find_mails_to_send())
 
     logger.info('Emails being sent at {0}'.format(datetime.utcnow().isoformat()))
 
-    for mail in emails_to_be_sent:
-        if not dry_run:
-            with TokuTransaction():
-                try:
-                    sent_ = mail.send_mail()
-                    message = 'Email of type {0} sent to {1}'.format(mail.email_type, mail.to_addr) if sent_ else \
-                        'Email of type {0} failed to be sent to {1}'.format(mail.email_type, mail.to_addr)
-                    logger.info(message)
-                except Exception as error:
-                    logger.error('Email of type {0} to be sent to {1} caused an ERROR'.format(mail.email_type, mail.to_addr))
-                    logger.exception(error)
-                    pass
-        else:
+    if dry_run:
+        for mail in emails_to_be_sent:
             logger.info('Email of type {} will be sent to {}'.format(mail.email_type, mail.to_addr))
+        return
 
-
-def find_queued_mails_ready_to_be_sent():
-    return mails.QueuedMail.find(
-        Q('send_at', 'lt', datetime.utcnow()) &
-        Q('sent_at', 'eq', None)
-    )
-
-
-def pop_and_verify_mails_for_each_user(user_queue):
-    for user_emails in user_queue.values():
-        mail = user_emails[0]
-        mails_past_week = mails.QueuedMail.find(
-            Q('user', 'eq', mail.user) &
-            Q('sent_at', 'gt', datetime.utcnow() - settings.WAIT_BETWEEN_MAILS)
-        )
-        if not mails_past_week.count():
-            yield mail
+    messages, unwanted = [], []
+    for mail in emails_to_be_sent:
+        try:
+            if mail.should_send():
+                messages.append((mail, mail.render()))
+            else:
+                unwanted.append(mail._id)
+        except Exception as error:
+            logger.error('Email of type {0} to be sent to {1} caused an ERROR'.format(mail.email_type, mail.to_addr))
+            logger.exception(error)
+    if unwanted:
+        mails.QueuedMail.remove(Q('_id', 'in', unwanted))
+
+    if messages:
+        send_messages(messages, workers, batch_size)
+
+
+def find_mails_to_send():
+    """Find the oldest mail ready to be sent for each user who has not been
+    sent a mail within ``settings.WAIT_BETWEEN_MAILS``.
+    """
+    now = datetime.utcnow()
+    result = database['queuedmail'].aggregate([
+        {'$match': {'$or': [
+            {'send_at': {'$lt': now}, 'sent_at': None},
+            {'sent_at': {'$gt': now - settings.WAIT_BETWEEN_MAILS}},
+        ]}},
+        # Unsent mails sort first, so each user's first mail is their oldest
+        # ready one unless they have none
+        {'$sort': {'sent_at': 1, 'send_at': 1}},
+        {'$group': {
+            '_id': '$user',
+            'mail': {'$first': '$_id'},
+            'last_sent': {'$max': '$sent_at'},
+        }},
+        {'$match': {'last_sent': None}},
+    ])['result']
+    return mails.QueuedMail.find(Q('_id', 'in', [each['mail'] for each in result]))
+
+
+def mark_sent(mail_ids):
+    if mail_ids:
+        mails.QueuedMail.update(Q('_id', 'in', mail_ids), data={'sent_at': datetime.utcnow()})
+
+
+def send_messages(messages, workers, batch_size):
+    """Send rendered mails concurrently, each worker thread through its own
+    persistent connection.
+
+    :param list messages: (QueuedMail, send_email kwargs) pairs
+    """
+    local = threading.local()
+    connections = []
+
+    def send(message):
+        mail, kwargs = message
+        connection = getattr(local, 'connection', None)
+        try:
+            if connection is None:
+                connection = local.connection = open_connection(
+                    ttls=kwargs['ttls'], login=kwargs['login'],
+                    username=kwargs['username'], password=kwargs['password'],
+                )
+                connections.append(connection)
+            # None means email is disabled, in which case mails are marked
+            # sent as QueuedMail.send_mail does
+            return mail, send_email(connection=connection, **kwargs) is not False
+        except Exception as error:
+            logger.error('Email of type {0} to be sent to {1} caused an ERROR'.format(mail.email_type, mail.to_addr))
+            logger.exception(error)
+            # The connection may be broken, so the next mail opens a new one
+            local.connection = None
+            close_connection(connection)
+            return mail, False
+
+    pool = ThreadPool(min(workers, len(messages)))
+    sent = []
+    try:
+        for mail, success in pool.imap_unordered(send, messages):
+            message = 'Email of type {0} sent to {1}'.format(mail.email_type, mail.to_addr) if success else \
+                'Email of type {0} failed to be sent to {1}'.format(mail.email_type, mail.to_addr)
+            logger.info(message)
+            if success:
+                sent.append(mail._id)
+            if len(sent) >= batch_size:
+                mark_sent(sent)
+                sent = []
+    finally:
+        mark_sent(sent)
+        pool.terminate()
+        for connection in connections:
+            close_connection(connection)
 
 
 @celery_app.task(name='scripts.send_queued_mails')
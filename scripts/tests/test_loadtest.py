@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from nose.tools import *  # noqa
+
+from tests.base import OsfTestCase
+
+from framework.auth import User
+from website.models import Node
+
+from scripts.loadtest import report
+from scripts.loadtest.seed import seed
+
+
+REQUESTS_ROWS = [
+    {'Method': 'GET', 'Name': '/v2/nodes/[id]/', '# requests': '100', '# failures': '2',
+     'Average response time': '120.5', 'Max response time': '900', 'Requests/s': '10.5'},
+    {'Method': 'None', 'Name': 'Total', '# requests': '100', '# failures': '2',
+     'Average response time': '120.5', 'Max response time': '900', 'Requests/s': '10.5'},
+]
+
+DISTRIBUTION_ROWS = [
+    {'Name': 'GET /v2/nodes/[id]/', '# requests': '100', '50%': '100', '95%': '300', '99%': '800'},
+    {'Name': 'None Total', '# requests': '100', '50%': '100', '95%': '300', '99%': '800'},
+]
+
+
+class TestReport(unittest.TestCase):
+
+    def test_parse_stats(self):
+        stats = report.parse_stats(REQUESTS_ROWS, DISTRIBUTION_ROWS)
+        assert_equal(set(stats), {'GET /v2/nodes/[id]/', report.TOTAL})
+        node_stats = stats['GET /v2/nodes/[id]/']
+        assert_equal(node_stats['requests'], 100)
+        assert_equal(node_stats['failures'], 2)
+        assert_equal(node_stats['rps'], 10.5)
+        assert_equal((node_stats['p50'], node_stats['p95'], node_stats['p99']), (100, 300, 800))
+
+    def test_diff_flags_p95_regressions(self):
+        old = {'commit': 'abc', 'requests': report.parse_stats(REQUESTS_ROWS, DISTRIBUTION_ROWS)}
+        new = {'commit': 'def', 'requests': report.parse_stats(REQUESTS_ROWS, DISTRIBUTION_ROWS)}
+        new['requests']['GET /v2/nodes/[id]/']['p95'] = 360
+        new['requests']['GET /v2/logs/[id]/'] = {'p95': 50}
+        rows = report.diff_reports(old, new)
+        assert_equal([name for name, _ in rows], ['GET /v2/logs/[id]/', 'GET /v2/nodes/[id]/', report.TOTAL])
+        assert_equal(rows[1][1]['p95'], (300, 360, 20.0))
+        assert_equal(rows[0][1]['p95'], (None, 50, None))
+        assert_equal(report.regressions(rows, threshold=10), ['GET /v2/nodes/[id]/'])
+        assert_equal(report.regressions(rows, threshold=25), [])
+
+
+class TestSeed(OsfTestCase):
+
+    def test_seed_builds_project_trees(self):
+        manifest = seed(users=2, projects=1, components=2, depth=2, contributors=1, tags=2, wiki_versions=2)
+        assert_equal(len(manifest['users']), 2)
+        # One project, two components and four subcomponents per user
+        assert_equal(len(manifest['nodes']), 14)
+        for entry in manifest['nodes']:
+            node = Node.load(entry['id'])
+            assert_true(node.is_public)
+            assert_equal(len(entry['contributors']), 2)
+            assert_equal(entry['wikis'], ['home'])
+            assert_equal(node.get_wiki_page('home').version, 2)
+        user = User.load(manifest['users'][0]['id'])
+        assert_true(user.check_password(manifest['password']))
@@ -45,6 +45,27 @@ class TestPopulateNewAndNoteworthy(OsfTestCase):
         new_noteworthy = script.get_new_and_noteworthy_nodes()
         assert_equal(set(new_noteworthy), {self.nn1._id, self.nn2._id, self.nn3._id, self.nn4._id, self.nn5._id})
 
+    def test_score_nodes_counts_distinct_actions(self):
+        auth = Auth(self.nn2.creator)
+        self.nn2.add_tag('one', auth=auth)
+        self.nn2.add_tag('two', auth=auth)
+        self.nn2.set_title('Renamed', auth=auth, save=True)
+        self.nn3.add_tag('one', auth=auth)
+
+        scores = script.score_nodes([self.nn1._id, self.nn2._id, self.nn3._id], datetime.datetime.now() - datetime.timedelta(days=1))
+        assert_equal(scores[0], (self.nn2._id, len(set(log.action for log in self.nn2.logs))))
+        assert_equal(scores[1][0], self.nn3._id)
+        assert_equal(len(scores), 3)
+
+    def test_filter_nodes_skips_shared_contributors(self):
+        nodes = [
+            {'_id': 'a', 'title': 'First', 'contributors': ['u1', 'u2']},
+            {'_id': 'b', 'title': 'Second', 'contributors': ['u2']},
+            {'_id': 'c', 'title': 'Third', 'contributors': ['u3']},
+            {'_id': 'd', 'title': 'Test project', 'contributors': ['u4']},
+        ]
+        assert_equal([node['_id'] for node in script.filter_nodes(nodes)], ['a', 'c'])
+
     def test_populate_new_and_noteworthy(self):
         self.popular_links_node = ProjectFactory(creator=self.user)
         self.popular_links_node._id = POPULAR_LINKS_NODE
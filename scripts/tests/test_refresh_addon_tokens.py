@@ -12,12 +12,15 @@ from website.addons.mendeley.tests.factories import MendeleyAccountFactory
 import datetime
 
 from dateutil.relativedelta import relativedelta
+from oauthlib.oauth2 import OAuth2Error
 
 from website.oauth.models import ExternalAccount
 
 from scripts.refresh_addon_tokens import (
-    get_targets, main, look_up_provider, PROVIDER_CLASSES
+    get_targets, main, look_up_provider, save_tokens, get_rate_limiter, PROVIDER_CLASSES
 )
+from website import settings
+from website.addons.box.model import Box
 
 
 class TestRefreshTokens(OsfTestCase):
@@ -70,3 +73,90 @@ class TestRefreshTokens(OsfTestCase):
         assert_equal(1, mock_box_refresh.call_count)
         assert_equal(1, mock_drive_refresh.call_count)
         assert_equal(1, mock_mendeley_refresh.call_count)
+
+    @mock.patch('scripts.refresh_addon_tokens.Box.refresh_oauth_key')
+    def test_refresh_does_not_save_accounts_itself(self, mock_refresh):
+        BoxAccountFactory(expires_at=datetime.datetime.utcnow())
+        main(delta=relativedelta(days=-3), Provider=Box, dry_run=False)
+        mock_refresh.assert_called_once_with(force=True, save=False)
+
+    @mock.patch('scripts.refresh_addon_tokens.Box.refresh_oauth_key')
+    def test_summary(self, mock_refresh):
+        now = datetime.datetime.utcnow()
+        BoxAccountFactory(expires_at=now)
+        BoxAccountFactory(expires_at=now)
+        BoxAccountFactory(expires_at=now)
+        # Expired refresh tokens cannot be refreshed
+        BoxAccountFactory(expires_at=now - datetime.timedelta(days=365))
+
+        def refresh(force, save):
+            if mock_refresh.call_count == 3:
+                raise OAuth2Error()
+            return True
+        mock_refresh.side_effect = refresh
+
+        summary = main(delta=relativedelta(days=-3), Provider=Box, dry_run=False, workers=1)
+        assert_equal(summary.found, 4)
+        assert_equal(summary.refreshed, 2)
+        assert_equal(summary.failed, 1)
+        assert_equal(summary.skipped, 1)
+        assert_equal(mock_refresh.call_count, 3)
+
+    @mock.patch('scripts.refresh_addon_tokens.Box.refresh_oauth_key')
+    def test_tokens_saved_as_each_refresh_returns(self, mock_refresh):
+        now = datetime.datetime.utcnow()
+        first = BoxAccountFactory(expires_at=now)
+        second = BoxAccountFactory(expires_at=now)
+        collection = ExternalAccount._storage[0].store
+
+        def refresh(force, save):
+            if mock_refresh.call_count == 2:
+                # The first account's rotated tokens are already stored
+                stored = collection.find_one({'_id': first._id})
+                assert_equal(stored['oauth_key'], 'rotated-key')
+                raise OAuth2Error()
+            first.oauth_key = 'rotated-key'
+            return True
+        mock_refresh.side_effect = refresh
+
+        with mock.patch('scripts.refresh_addon_tokens.get_targets', return_value=[first, second]):
+            summary = main(delta=relativedelta(days=-3), Provider=Box, dry_run=False, workers=1)
+        assert_equal(summary.refreshed, 1)
+        assert_equal(summary.failed, 1)
+
+    @mock.patch('scripts.refresh_addon_tokens.Box.refresh_oauth_key')
+    def test_dry_run(self, mock_refresh):
+        BoxAccountFactory(expires_at=datetime.datetime.utcnow())
+        summary = main(delta=relativedelta(days=-3), Provider=Box, dry_run=True)
+        assert_false(mock_refresh.called)
+        assert_equal(summary.found, 1)
+        assert_equal(summary.refreshed, 0)
+
+    @mock.patch.dict(settings.ADDON_TOKEN_REFRESH_RATE_LIMITS, {'box': (10, 2), 'mendeley': (3, 1)})
+    def test_rate_limiter_per_provider(self):
+        box = get_rate_limiter('box')
+        assert_is(get_rate_limiter('box'), box)
+        assert_equal(box.rate, 5)
+        assert_equal(box.capacity, 10)
+        mendeley = get_rate_limiter('mendeley')
+        assert_is_not(mendeley, box)
+        assert_equal(mendeley.rate, 3)
+        assert_equal(get_rate_limiter('box', rate_limit=(1, 1)).rate, 1)
+
+    def test_save_tokens(self):
+        account = BoxAccountFactory(expires_at=datetime.datetime.utcnow())
+        other = BoxAccountFactory(expires_at=datetime.datetime.utcnow())
+        expires_at = datetime.datetime(2030, 1, 1)
+        account.oauth_key = 'new-key'
+        account.refresh_token = 'new-refresh-token'
+        account.expires_at = expires_at
+        save_tokens([account])
+
+        stored = ExternalAccount._storage[0].store.find_one({'_id': account._id})
+        assert_equal(stored['oauth_key'], 'new-key')
+        assert_equal(stored['refresh_token'], 'new-refresh-token')
+        assert_equal(stored['expires_at'], expires_at)
+        assert_not_equal(
+            ExternalAccount._storage[0].store.find_one({'_id': other._id})['oauth_key'],
+            'new-key'
+        )
@@ -5,7 +5,7 @@ from nose.tools import *
 from tests.base import OsfTestCase
 from tests.factories import UserFactory
 
-from scripts.send_queued_mails import main, pop_and_verify_mails_for_each_user, find_queued_mails_ready_to_be_sent
+from scripts.send_queued_mails import main, find_mails_to_send
 from website import mails, settings
 
 class TestSendQueuedMails(OsfTestCase):
@@ -27,13 +27,13 @@ class TestSendQueuedMails(OsfTestCase):
             fullname=user.fullname if user else self.user.fullname,
         )
 
-    @mock.patch('website.mails.queued_mails.send_mail')
+    @mock.patch('scripts.send_queued_mails.send_email')
     def test_queue_addon_mail(self, mock_send):
         self.queue_mail()
         main(dry_run=False)
         assert_true(mock_send.called)
 
-    @mock.patch('website.mails.queued_mails.send_mail')
+    @mock.patch('scripts.send_queued_mails.send_email')
     def test_no_two_emails_to_same_person(self, mock_send):
         user = UserFactory()
         user.osf_mailing_lists[settings.OSF_HELP_LIST] = True
@@ -43,33 +43,89 @@ class TestSendQueuedMails(OsfTestCase):
         main(dry_run=False)
         assert_equal(mock_send.call_count, 1)
 
-    def test_pop_and_verify_mails_for_each_user(self):
+    def test_find_mails_to_send(self):
         user_with_email_sent = UserFactory()
         user_with_multiple_emails = UserFactory()
         user_with_no_emails_sent = UserFactory()
+        user_with_future_email = UserFactory()
         mail_sent = mails.QueuedMail(user=user_with_email_sent,
+                                     send_at=datetime.utcnow() - timedelta(days=2),
                                      sent_at=datetime.utcnow() - timedelta(days=1),
+                                     email_type=mails.NO_ADDON_TYPE,
                                      to_addr=user_with_email_sent.username)
         mail_sent.save()
-        mail1 = self.queue_mail(user=user_with_email_sent)
-        mail2 = self.queue_mail(user=user_with_multiple_emails)
-        mail3 = self.queue_mail(user=user_with_multiple_emails)
-        mail4 = self.queue_mail(user=user_with_no_emails_sent)
-        user_queue = {
-            user_with_email_sent._id: [mail1],
-            user_with_multiple_emails._id: [mail2, mail3],
-            user_with_no_emails_sent._id: [mail4]
-        }
-        mails_ = list(pop_and_verify_mails_for_each_user(user_queue))
+        self.queue_mail(user=user_with_email_sent)
+        oldest = self.queue_mail(user=user_with_multiple_emails, send_at=datetime.utcnow() - timedelta(days=1))
+        self.queue_mail(user=user_with_multiple_emails)
+        mail = self.queue_mail(user=user_with_no_emails_sent)
+        self.queue_mail(user=user_with_future_email, send_at=datetime.utcnow() + timedelta(days=1))
+        mails_ = list(find_mails_to_send())
         assert_equal(len(mails_), 2)
-        user_mails = [mail.user for mail in mails_]
-        assert_false(user_with_email_sent in user_mails)
-        assert_true(user_with_multiple_emails in user_mails)
-        assert_true(user_with_no_emails_sent in user_mails)
+        assert_equal({each._id for each in mails_}, {oldest._id, mail._id})
 
-    def test_find_queued_mails_ready_to_be_sent(self):
-        mail1 = self.queue_mail()
-        mail2 = self.queue_mail(send_at=datetime.utcnow()+timedelta(days=1))
-        mail3 = self.queue_mail(send_at=datetime.utcnow())
-        mails = find_queued_mails_ready_to_be_sent()
-        assert_equal(len(mails), 2)
+    def test_find_mails_to_send_after_wait(self):
+        mail_sent = mails.QueuedMail(user=self.user,
+                                     send_at=datetime.utcnow() - timedelta(days=10),
+                                     sent_at=datetime.utcnow() - settings.WAIT_BETWEEN_MAILS - timedelta(days=1),
+                                     email_type=mails.NO_ADDON_TYPE,
+                                     to_addr=self.user.username)
+        mail_sent.save()
+        mail = self.queue_mail()
+        assert_equal([each._id for each in find_mails_to_send()], [mail._id])
+
+    @mock.patch('scripts.send_queued_mails.send_email')
+    def test_marks_sent_mails(self, mock_send):
+        mail = self.queue_mail()
+        main(dry_run=False)
+        stored = mails.QueuedMail._storage[0].store.find_one({'_id': mail._id})
+        assert_is_not_none(stored['sent_at'])
+
+    @mock.patch('scripts.send_queued_mails.send_email')
+    def test_failed_mails_stay_queued(self, mock_send):
+        mock_send.return_value = False
+        mail = self.queue_mail()
+        main(dry_run=False)
+        stored = mails.QueuedMail._storage[0].store.find_one({'_id': mail._id})
+        assert_is_none(stored['sent_at'])
+
+    @mock.patch('framework.email.tasks.smtplib.SMTP')
+    def test_mails_stay_queued_without_smtp_credentials(self, mock_smtp):
+        mail = self.queue_mail()
+        with mock.patch.multiple(settings, USE_EMAIL=True, DEBUG_MODE=False, SENDGRID_API_KEY=None, MAIL_USERNAME=None, MAIL_PASSWORD=None):
+            main(dry_run=False)
+        assert_false(mock_smtp.called)
+        stored = mails.QueuedMail._storage[0].store.find_one({'_id': mail._id})
+        assert_is_none(stored['sent_at'])
+
+    @mock.patch('scripts.send_queued_mails.send_email')
+    def test_removes_mails_failing_presend(self, mock_send):
+        self.user.osf_mailing_lists[settings.OSF_HELP_LIST] = False
+        self.user.save()
+        mail = self.queue_mail()
+        main(dry_run=False)
+        assert_false(mock_send.called)
+        assert_is_none(mails.QueuedMail._storage[0].store.find_one({'_id': mail._id}))
+
+    @mock.patch('scripts.send_queued_mails.close_connection')
+    @mock.patch('scripts.send_queued_mails.open_connection')
+    @mock.patch('scripts.send_queued_mails.send_email')
+    def test_reuses_connection(self, mock_send, mock_open, mock_close):
+        for _ in range(3):
+            user = UserFactory()
+            user.osf_mailing_lists[settings.OSF_HELP_LIST] = True
+            user.save()
+            self.queue_mail(user=user)
+        main(dry_run=False, workers=1)
+        assert_equal(mock_send.call_count, 3)
+        assert_equal(mock_open.call_count, 1)
+        for call in mock_send.call_args_list:
+            assert_equal(call[1]['connection'], mock_open.return_value)
+        mock_close.assert_called_once_with(mock_open.return_value)
+
+    @mock.patch('scripts.send_queued_mails.send_email')
+    def test_dry_run(self, mock_send):
+        mail = self.queue_mail()
+        main(dry_run=True)
+        assert_false(mock_send.called)
+        stored = mails.QueuedMail._storage[0].store.find_one({'_id': mail._id})
+        assert_is_none(stored['sent_at'])
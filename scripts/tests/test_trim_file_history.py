@@ -0,0 +1,43 @@
+from nose.tools import *  # noqa PEP8 asserts
+
+from website.files.models import StoredFileNode
+from website.files.models.github import GithubFile
+from scripts.trim_file_history import trim_file_histories
+
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory
+
+
+class TestTrimFileHistory(OsfTestCase):
+
+    def setUp(self):
+        super(TestTrimFileHistory, self).setUp()
+        self.project = ProjectFactory()
+        self.collection = StoredFileNode._storage[0].store
+
+    def make_file(self, name, num_entries):
+        file_node = GithubFile.create(
+            is_file=True,
+            node=self.project,
+            path='/' + name,
+            name=name,
+            materialized_path='/' + name,
+        )
+        file_node.history = [{'etag': str(i), 'modified': i} for i in range(num_entries)]
+        file_node.save()
+        return file_node
+
+    def test_trims_oversized_histories(self):
+        big = self.make_file('big', 10)
+        small = self.make_file('small', 3)
+
+        assert_equal(trim_file_histories(self.collection, 4), 1)
+
+        big_history = self.collection.find_one({'_id': big._id})['history']
+        assert_equal([entry['etag'] for entry in big_history], ['0', '7', '8', '9'])
+        small_history = self.collection.find_one({'_id': small._id})['history']
+        assert_equal(len(small_history), 3)
+
+    def test_ignores_histories_at_limit(self):
+        self.make_file('exact', 4)
+        assert_equal(trim_file_histories(self.collection, 4), 0)
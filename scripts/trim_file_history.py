@@ -0,0 +1,54 @@
+"""
+Trim the metadata history of files that have more than
+settings.FILE_HISTORY_MAX_ENTRIES entries, as File.update now does on write.
+The oldest entry and the most recent ones are kept.
+
+    python -m scripts.trim_file_history [--dry]
+"""
+import logging
+import sys
+
+from framework.transactions.context import TokuTransaction
+
+from website import settings
+from website.app import init_app
+from website.files import utils
+from website.files.models import StoredFileNode, TrashedFileNode
+from scripts import utils as script_utils
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    for model in (StoredFileNode, TrashedFileNode):
+        trim_file_histories(model._storage[0].store, settings.FILE_HISTORY_MAX_ENTRIES)
+
+
+def trim_file_histories(collection, max_entries):
+    """Trim the history of every document in collection with more than
+    max_entries entries.
+    :returns: The number of documents trimmed
+    """
+    # Only documents with an entry at index max_entries are oversized
+    query = {'history.{}'.format(max_entries): {'$exists': True}}
+    count = 0
+    for doc in collection.find(query, {'history': True}):
+        history = utils.trim_history(doc['history'], max_entries)
+        collection.update({'_id': doc['_id']}, {'$set': {'history': history}})
+        logger.info('Trimmed history of {0} {1} from {2} to {3} entries'.format(
+            collection.name, doc['_id'], len(doc['history']), len(history)
+        ))
+        count += 1
+    logger.info('Trimmed {0} documents in {1}'.format(count, collection.name))
+    return count
+
+
+if __name__ == '__main__':
+    dry = '--dry' in sys.argv
+    if not dry:
+        script_utils.add_file_logger(logger, __file__)
+    init_app(routes=False, set_backends=True)
+    with TokuTransaction():
+        main()
+        if dry:
+            raise Exception('Dry Run -- Aborting Transaction')
@@ -934,6 +934,24 @@ def webpack(ctx, clean=False, watch=False, dev=False, colors=False):
     ctx.run(command, echo=True)
 
 
+@task
+def precompile_templates(ctx, top=20):
+    """Compile all Mako templates into the versioned module directory
+    (settings.MAKO_MODULE_DIR) and report compile time per template.
+    """
+    from framework.routing import precompile_templates as _precompile_templates
+    print('Precompiling templates into {0}...'.format(os.path.join(settings.MAKO_MODULE_DIR, settings.VERSION)))
+    report = _precompile_templates()
+    failed = [entry for entry in report if entry[3] is not None]
+    for name, uri, elapsed, error in report[:int(top)]:
+        print('{0:>8.1f}ms  [{1}] {2}'.format(elapsed * 1000, name, uri))
+    for name, uri, elapsed, error in failed:
+        print('FAILED [{0}] {1}: {2}'.format(name, uri, error))
+    print('...Done. Compiled {0} templates in {1:.1f}s ({2} failed).'.format(
+        len(report) - len(failed), sum(entry[2] for entry in report), len(failed)
+    ))
+
+
 @task()
 def build_js_config_files(ctx):
     from website import settings
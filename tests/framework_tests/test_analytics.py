@@ -116,6 +116,22 @@ class TestUpdateCounters(UpdateCountersTestCase):
         count = analytics.get_basic_counters(page, db=self.db)
         assert_equal(count, (3, 5))
 
+    def test_get_basic_counters_bulk(self):
+        collection = self.db['pagecounters']
+        collection.update({'_id': 'download:abc:foo_txt'}, {'$inc': {'total': 5, 'unique': 3}}, True, False)
+        collection.update({'_id': 'download:abc:bar'}, {'$inc': {'total': 2}}, True, False)
+
+        counts = analytics.get_basic_counters_bulk(
+            ['download:abc:foo.txt', 'download:abc:bar', 'download:abc:baz'],
+            db=self.db
+        )
+        assert_equal(counts, {
+            'download:abc:foo.txt': (3, 5),
+            'download:abc:bar': (0, 2),
+            'download:abc:baz': (None, None),
+        })
+        assert_equal(analytics.get_basic_counters_bulk([], db=self.db), {})
+
     @unittest.skip('Reverted the fix for #2281. Unskip this once we use GUIDs for keys in the download counts collection')
     def test_update_counters_different_files(self):
         # Regression test for https://github.com/CenterForOpenScience/osf.io/issues/2281
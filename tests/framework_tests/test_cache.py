@@ -0,0 +1,51 @@
+import unittest
+from nose.tools import *  # noqa PEP8 asserts
+
+from framework.cache import LRUCache
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = LRUCache(2, ttl=10, clock=self.clock)
+
+    def test_get_and_set(self):
+        self.cache.set('a', 1)
+        assert_equal(self.cache.get('a'), 1)
+        assert_is_none(self.cache.get('b'))
+        assert_equal((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_evicts_least_recently_used(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.get('a')
+        self.cache.set('c', 3)
+        assert_in('a', self.cache)
+        assert_not_in('b', self.cache)
+        assert_in('c', self.cache)
+        assert_equal(len(self.cache), 2)
+
+    def test_entries_expire(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2, ttl=None)
+        self.clock.now = 10
+        assert_is_none(self.cache.get('a'))
+        assert_equal(self.cache.get('b'), 2)
+
+    def test_delete_and_clear(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.delete('a')
+        assert_not_in('a', self.cache)
+        self.cache.clear()
+        assert_equal(len(self.cache), 0)
@@ -6,7 +6,7 @@ import mock
 from nose.tools import *  # flake8: noqa (PEP8 asserts)
 import sendgrid
 
-from framework.email.tasks import send_email, _send_with_sendgrid
+from framework.email.tasks import send_email, _send_with_sendgrid, _send_with_smtp
 from website import settings
 from tests.base import fake
 
@@ -75,6 +75,34 @@ class TestEmail(unittest.TestCase):
         )
         assert_false(ret)
 
+    @mock.patch.multiple(settings, MAIL_USERNAME=None, MAIL_PASSWORD=None)
+    @mock.patch('framework.email.tasks.smtplib.SMTP')
+    def test_send_with_smtp_without_credentials_returns_false(self, mock_smtp):
+        ret = _send_with_smtp(
+            from_addr=fake.email(),
+            to_addr=fake.email(),
+            subject=fake.bs(),
+            message=fake.text(),
+        )
+        assert_false(ret)
+        assert_is_not_none(ret)
+        assert_false(mock_smtp.called)
+
+    @mock.patch('framework.email.tasks.smtplib.SMTP')
+    def test_send_with_smtp_reuses_connection(self, mock_smtp):
+        connection = mock.MagicMock()
+        ret = _send_with_smtp(
+            from_addr=fake.email(),
+            to_addr=fake.email(),
+            subject=fake.bs(),
+            message=fake.text(),
+            connection=connection,
+        )
+        assert_true(ret)
+        assert_equal(connection.sendmail.call_count, 1)
+        assert_false(connection.quit.called)
+        assert_false(mock_smtp.called)
+
 
 if __name__ == '__main__':
     unittest.main()
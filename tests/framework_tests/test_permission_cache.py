@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for request-scoped permission memoization in framework/auth/permission_cache.py
+"""
+import mock
+
+from nose.tools import *  # flake8: noqa  (PEP8 asserts)
+
+from framework.auth import Auth, permission_cache
+
+from tests.base import OsfTestCase
+from tests.factories import AuthUserFactory, NodeFactory, PrivateLinkFactory, ProjectFactory
+
+
+class TestPermissionCache(OsfTestCase):
+
+    def setUp(self):
+        super(TestPermissionCache, self).setUp()
+        permission_cache.permission_cache_before_request()
+
+    def tearDown(self):
+        permission_cache.permission_cache_teardown_request()
+        super(TestPermissionCache, self).tearDown()
+
+    def test_memoize_computes_once(self):
+        compute = mock.Mock(return_value=True)
+        assert_true(permission_cache.memoize(('key', ), compute))
+        assert_true(permission_cache.memoize(('key', ), compute))
+        assert_equal(compute.call_count, 1)
+        assert_equal(permission_cache.counts()['checks'], 2)
+        assert_equal(permission_cache.counts()['hits'], 1)
+
+    def test_memoize_outside_request_does_not_cache(self):
+        permission_cache.permission_cache_teardown_request()
+        compute = mock.Mock(return_value=True)
+        permission_cache.memoize(('key', ), compute)
+        permission_cache.memoize(('key', ), compute)
+        assert_equal(compute.call_count, 2)
+        assert_equal(permission_cache.counts()['checks'], 0)
+
+    def test_can_view_is_memoized(self):
+        user = AuthUserFactory()
+        project = ProjectFactory(creator=user)
+        auth = Auth(user=user)
+        assert_true(project.can_view(auth))
+        with mock.patch.object(type(project), 'has_permission') as mock_has_permission:
+            assert_true(project.can_view(auth))
+        assert_false(mock_has_permission.called)
+
+    def test_admin_ancestor_ids(self):
+        user = AuthUserFactory()
+        project = ProjectFactory(creator=user)
+        component = NodeFactory(parent=project)
+        subcomponent = NodeFactory(parent=component)
+        assert_in(user._id, subcomponent.admin_ancestor_ids)
+        assert_true(subcomponent.is_admin_parent(user))
+
+    def test_permission_change_invalidates(self):
+        user = AuthUserFactory()
+        project = ProjectFactory()
+        assert_false(project.has_permission(user, 'read'))
+        assert_false(project.can_view(Auth(user=user)))
+        project.add_contributor(user, permissions=['read'])
+        assert_true(project.can_view(Auth(user=user)))
+
+    def test_privacy_change_before_save(self):
+        user = AuthUserFactory()
+        project = ProjectFactory()
+        auth = Auth(user=user)
+        assert_false(project.can_view(auth))
+        project.is_public = True
+        assert_true(project.can_view(auth))
+        project.is_public = False
+        assert_false(project.can_view(auth))
+
+    def test_private_link_changes(self):
+        user = AuthUserFactory()
+        project = ProjectFactory()
+        link = PrivateLinkFactory()
+        auth = Auth(user=user, private_key=link.key)
+        assert_false(project.can_view(auth))
+        link.nodes.append(project)
+        link.save()
+        assert_true(project.can_view(auth))
+        link.is_deleted = True
+        link.save()
+        assert_false(project.can_view(auth))
+
+    def test_private_link_save_invalidates(self):
+        link = PrivateLinkFactory()
+        permission_cache.memoize(('key', ), lambda: True)
+        link.save()
+        assert_equal(permission_cache.counts()['invalidations'], 1)
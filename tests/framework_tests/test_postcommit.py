@@ -0,0 +1,95 @@
+import functools
+import unittest
+from nose.tools import *  # noqa PEP8 asserts
+
+import gevent
+import mock
+
+from framework.postcommit_tasks import handlers
+from framework.postcommit_tasks.handlers import Histogram, PostcommitTask, enqueue_postcommit_task, run_task
+
+
+def slow_task(calls):
+    gevent.sleep(1)
+    calls.append('slow')
+
+
+def failing_task(calls):
+    raise ValueError('failed')
+
+
+def ok_task(calls):
+    calls.append('ok')
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_observe(self):
+        histogram = Histogram((0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value)
+        snapshot = histogram.snapshot()
+        assert_equal(snapshot['count'], 4)
+        assert_almost_equal(snapshot['sum'], 3.65)
+        assert_equal(snapshot['buckets'], [(0.1, 2), (1, 3), (float('inf'), 4)])
+
+
+class TestPostcommitTasks(unittest.TestCase):
+
+    def setUp(self):
+        handlers.postcommit_before_request()
+        self.calls = []
+
+    @mock.patch('framework.postcommit_tasks.handlers.logger')
+    def test_run_task_isolates_failures(self, mock_logger):
+        # Does not raise
+        run_task(PostcommitTask(func=functools.partial(failing_task, self.calls), timeout=1, overflow=None))
+        mock_logger.exception.assert_called_once_with('Postcommit task failing_task failed')
+
+    def test_run_task_stops_at_budget(self):
+        task = PostcommitTask(func=functools.partial(slow_task, self.calls), timeout=0.01, overflow=None)
+        run_task(task)
+        assert_equal(self.calls, [])
+
+    def test_dedupes_tasks(self):
+        enqueue_postcommit_task(ok_task, (self.calls, ), {})
+        enqueue_postcommit_task(ok_task, (self.calls, ), {})
+        assert_equal(len(handlers.postcommit_queue()), 1)
+
+    def test_after_request_runs_tasks_despite_failures(self):
+        enqueue_postcommit_task(failing_task, (self.calls, ), {})
+        enqueue_postcommit_task(ok_task, (self.calls, ), {})
+        count = handlers.postcommit_durations.snapshot()['count']
+        handlers.postcommit_after_request(mock.Mock(status_code=200))
+        assert_equal(self.calls, ['ok'])
+        assert_equal(handlers.postcommit_durations.snapshot()['count'], count + 1)
+
+    @mock.patch('framework.postcommit_tasks.handlers.is_monkeypatched')
+    def test_pool_per_request_without_monkeypatching(self, mock_patched):
+        mock_patched.return_value = False
+        assert_is_not(handlers.get_pool(), handlers.get_pool())
+        mock_patched.return_value = True
+        assert_is(handlers.get_pool(), handlers.get_pool())
+
+    @mock.patch('framework.postcommit_tasks.handlers.is_monkeypatched', return_value=False)
+    @mock.patch('framework.postcommit_tasks.handlers.settings.POSTCOMMIT_WAIT_TIMEOUT', 0.01)
+    def test_after_request_waits_for_tasks_without_monkeypatching(self, mock_patched):
+        enqueue_postcommit_task(slow_task, (self.calls, ), {}, timeout=5)
+        handlers.postcommit_after_request(mock.Mock(status_code=200))
+        assert_equal(self.calls, ['slow'])
+
+    def test_after_request_error_response_drops_tasks(self):
+        enqueue_postcommit_task(ok_task, (self.calls, ), {})
+        handlers.postcommit_after_request(mock.Mock(status_code=500))
+        assert_equal(self.calls, [])
+
+    @mock.patch('framework.postcommit_tasks.handlers.enqueue_task')
+    @mock.patch('framework.postcommit_tasks.handlers.get_pool')
+    def test_overflow_to_celery_when_pool_is_full(self, mock_get_pool, mock_enqueue_task):
+        mock_get_pool.return_value.full.return_value = True
+        overflow = mock.Mock()
+        enqueue_postcommit_task(ok_task, (self.calls, ), {}, overflow=overflow)
+        handlers.postcommit_after_request(mock.Mock(status_code=200))
+        overflow.assert_called_once_with(self.calls)
+        mock_enqueue_task.assert_called_once_with(overflow.return_value)
+        assert_false(mock_get_pool.return_value.spawn.called)
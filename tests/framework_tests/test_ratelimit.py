@@ -0,0 +1,33 @@
+import unittest
+from nose.tools import *  # noqa PEP8 asserts
+
+from framework.ratelimit import TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.slept = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+    def test_limits_rate(self):
+        bucket = TokenBucket(2, clock=self.clock, sleep=self.sleep)
+        for _ in range(4):
+            bucket.acquire()
+        # Two tokens available up front, then one every half second
+        assert_equal(sum(self.slept), 1.0)
+
+    def test_capacity_limits_bursts(self):
+        bucket = TokenBucket(0.5, capacity=3, clock=self.clock, sleep=self.sleep)
+        for _ in range(3):
+            bucket.acquire()
+        assert_equal(self.slept, [])
+        bucket.acquire()
+        assert_equal(sum(self.slept), 2.0)
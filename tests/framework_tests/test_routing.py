@@ -1,12 +1,16 @@
 # -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
 import unittest
 
 from nose.tools import *  # noqa (PEP8 asserts)
 from flask import Flask
+from mako.lookup import TemplateLookup
 from webtest_plus import TestApp
 
 from framework.exceptions import HTTPError
-from framework.routing import json_renderer, process_rules, Rule
+from framework.routing import json_renderer, precompile_templates, process_rules, Rule
 
 def error_view():
     raise HTTPError(400)
@@ -40,3 +44,33 @@ class TestJSONRenderer(unittest.TestCase):
         data = res.json
         assert_equal(data['message_short'], 'Invalid')
         assert_equal(data['message_long'], 'Invalid request')
+
+
+class TestPrecompileTemplates(unittest.TestCase):
+
+    def setUp(self):
+        self.template_dir = tempfile.mkdtemp()
+        self.module_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.template_dir, 'nested'))
+        with open(os.path.join(self.template_dir, 'page.mako'), 'w') as fp:
+            fp.write('Hello ${name}')
+        with open(os.path.join(self.template_dir, 'nested', 'broken.mako'), 'w') as fp:
+            fp.write('<%def name="x(">')
+        with open(os.path.join(self.template_dir, 'readme.txt'), 'w') as fp:
+            fp.write('not a template')
+        self.lookup = TemplateLookup(directories=[self.template_dir], module_directory=self.module_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.template_dir)
+        shutil.rmtree(self.module_dir)
+
+    def test_precompile_reports_each_template(self):
+        report = precompile_templates({'test': self.lookup})
+        by_uri = {uri: error for _, uri, _, error in report}
+        assert_equal(set(by_uri), {'/page.mako', '/nested/broken.mako'})
+        assert_is_none(by_uri['/page.mako'])
+        assert_is_not_none(by_uri['/nested/broken.mako'])
+
+    def test_precompile_writes_modules(self):
+        precompile_templates({'test': self.lookup})
+        assert_true(os.path.exists(os.path.join(self.module_dir, 'page.mako.py')))
@@ -0,0 +1,100 @@
+import unittest
+from nose.tools import *  # noqa PEP8 asserts
+
+import mock
+from celery import Signature
+
+from framework.celery_tasks import app
+from framework.celery_tasks import handlers
+from framework.celery_tasks.handlers import TaskBuffer, coalesce_on
+
+
+@app.task
+def fake_task(node_id=None, index=None, bulk=False):
+    pass
+
+
+@app.task
+def fake_coalescing_task(node_id=None, index=None, bulk=False):
+    pass
+
+coalesce_on(fake_coalescing_task, 'node_id', 'index')
+
+
+class TestTaskBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.buffer = TaskBuffer()
+
+    def test_dedupes_identical_signatures(self):
+        self.buffer.add(fake_task.si(node_id='abc12'))
+        self.buffer.add(fake_task.si(node_id='abc12'))
+        self.buffer.add(fake_task.si(node_id='def34'))
+        assert_equal(len(self.buffer), 2)
+        assert_equal(self.buffer.enqueued, 3)
+        assert_equal(self.buffer.coalesced, 1)
+        assert_in(fake_task.si(node_id='abc12'), self.buffer)
+        assert_not_in(fake_task.si(node_id='ghi56'), self.buffer)
+
+    def test_unique_signatures_are_not_deduped(self):
+        self.buffer.add(fake_task.si(node_id='abc12'), unique=True)
+        self.buffer.add(fake_task.si(node_id='abc12'), unique=True)
+        assert_equal(len(self.buffer), 2)
+        assert_equal(self.buffer.coalesced, 0)
+
+    def test_coalesces_keeping_latest_signature_in_first_place(self):
+        self.buffer.add(fake_coalescing_task.si(node_id='abc12', index='osf'))
+        self.buffer.add(fake_task.si(node_id='abc12'))
+        self.buffer.add(fake_coalescing_task.si(node_id='abc12', index='osf', bulk=True))
+        self.buffer.add(fake_coalescing_task.si(node_id='abc12', index='other'))
+        signatures = list(self.buffer)
+        assert_equal(len(signatures), 3)
+        assert_equal(signatures[0].kwargs, {'node_id': 'abc12', 'index': 'osf', 'bulk': True})
+        assert_equal(signatures[1].task, fake_task.name)
+        assert_equal(signatures[2].kwargs['index'], 'other')
+        assert_equal(self.buffer.coalesced, 1)
+
+    @mock.patch.object(Signature, 'apply_async')
+    @mock.patch.object(app, 'producer_or_acquire')
+    def test_publish_uses_one_producer(self, mock_acquire, mock_apply_async):
+        self.buffer.add(fake_task.si(node_id='abc12'))
+        self.buffer.add(fake_task.si(node_id='def34'))
+        producer = mock_acquire.return_value.__enter__.return_value
+        with mock.patch('framework.celery_tasks.handlers.settings.USE_CELERY', True):
+            self.buffer.publish()
+        assert_equal(mock_acquire.call_count, 1)
+        assert_equal(mock_apply_async.call_count, 2)
+        for call in mock_apply_async.call_args_list:
+            assert_equal(call[1]['producer'], producer)
+
+    @mock.patch.object(Signature, 'apply')
+    def test_publish_without_celery_runs_tasks(self, mock_apply):
+        self.buffer.add(fake_task.si(node_id='abc12'))
+        with mock.patch('framework.celery_tasks.handlers.settings.USE_CELERY', False):
+            self.buffer.publish()
+        assert_equal(mock_apply.call_count, 1)
+
+
+class TestTeardown(unittest.TestCase):
+
+    def setUp(self):
+        handlers.celery_before_request()
+
+    @mock.patch.object(TaskBuffer, 'publish')
+    def test_teardown_publishes_and_clears(self, mock_publish):
+        handlers.queue().add(fake_task.si(node_id='abc12'))
+        handlers.celery_teardown_request()
+        assert_equal(mock_publish.call_count, 1)
+        assert_equal(len(handlers.queue()), 0)
+
+    @mock.patch.object(TaskBuffer, 'publish')
+    def test_teardown_with_error_discards_tasks(self, mock_publish):
+        handlers.queue().add(fake_task.si(node_id='abc12'))
+        handlers.celery_teardown_request(error=True)
+        assert_false(mock_publish.called)
+        assert_equal(len(handlers.queue()), 0)
+
+    def test_error_response_discards_tasks(self):
+        handlers.queue().add(fake_task.si(node_id='abc12'))
+        handlers.celery_after_request(mock.Mock(status_code=500))
+        assert_equal(len(handlers.queue()), 0)
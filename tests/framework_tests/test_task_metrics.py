@@ -0,0 +1,86 @@
+import unittest
+from nose.tools import *  # noqa PEP8 asserts
+
+import mock
+
+from framework.celery_tasks.metrics import TaskMetrics, PUBLISHED_AT, stamp, task_queue
+from website import settings
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTaskMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.metrics = TaskMetrics(clock=self.clock)
+
+    def test_records_wait_and_runtime(self):
+        self.metrics.started('1', 'tasks.a', 'low', published_at=98.0)
+        self.clock.now = 101.0
+        self.metrics.finished('1', result={'a': 1})
+        self.metrics.started('2', 'tasks.a', 'low', published_at=100.0)
+        self.clock.now = 104.0
+        self.metrics.finished('2')
+        stats = self.metrics.summary()[('tasks.a', 'low')]
+        assert_equal(stats['count'], 2)
+        assert_equal(stats['wait_mean'], 1.5)
+        assert_equal(stats['wait_max'], 2.0)
+        assert_equal(stats['runtime_mean'], 2.0)
+        assert_equal(stats['runtime_max'], 3.0)
+        assert_equal(stats['result_bytes_mean'], len(repr({'a': 1})) / 2)
+
+    def test_unknown_publish_time(self):
+        self.metrics.started('1', 'tasks.a', 'low')
+        self.metrics.finished('1')
+        stats = self.metrics.summary()[('tasks.a', 'low')]
+        assert_equal(stats['count'], 1)
+        assert_is_none(stats['wait_mean'])
+
+    def test_failures_and_retries(self):
+        self.metrics.started('1', 'tasks.a', 'high')
+        self.metrics.failed('1')
+        self.metrics.finished('1')
+        self.metrics.retried('tasks.a', 'high')
+        stats = self.metrics.summary()[('tasks.a', 'high')]
+        assert_equal((stats['count'], stats['failures'], stats['retries']), (1, 1, 1))
+
+    def test_tasks_keyed_by_queue(self):
+        self.metrics.started('1', 'tasks.a', 'low')
+        self.metrics.finished('1')
+        self.metrics.started('2', 'tasks.a', 'high')
+        self.metrics.finished('2')
+        assert_equal(set(self.metrics.summary()), {('tasks.a', 'low'), ('tasks.a', 'high')})
+
+    @mock.patch('framework.celery_tasks.metrics.logger')
+    def test_log_summary_interval(self, mock_logger):
+        self.metrics.started('1', 'tasks.a', 'low')
+        self.metrics.finished('1')
+        self.metrics.log_summary(60)
+        assert_false(mock_logger.info.called)
+        self.clock.now += 60
+        self.metrics.log_summary(60)
+        assert_equal(mock_logger.info.call_count, 1)
+        self.clock.now += 60
+        self.metrics.log_summary(0)
+        assert_equal(mock_logger.info.call_count, 1)
+
+    def test_stamp(self):
+        body = {'task': 'tasks.a'}
+        stamp(body)
+        assert_in(PUBLISHED_AT, body)
+
+    def test_task_queue(self):
+        task = mock.Mock()
+        task.name = 'website.archiver.tasks.stat_addon'
+        task.request.delivery_info = {'routing_key': 'med'}
+        assert_equal(task_queue(task), 'med')
+        task.request.delivery_info = None
+        assert_equal(task_queue(task), settings.HIGH_QUEUE)
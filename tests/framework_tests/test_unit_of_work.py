@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for deferred save side effects in framework/mongo/unit_of_work.py
+"""
+import unittest
+
+import logging
+
+import mock
+import webtest_plus
+from flask import Flask
+from nose.tools import *  # flake8: noqa  (PEP8 asserts)
+
+from framework.flask import add_handlers
+from framework.mongo import database, unit_of_work
+from framework.mongo import handlers as database_handlers
+from framework.transactions import handlers as transaction_handlers
+from website.project import signals as project_signals
+
+from tests.base import DbTestCase, OsfTestCase
+from tests.factories import ProjectFactory
+
+
+class TestUnitOfWork(unittest.TestCase):
+
+    def tearDown(self):
+        unit_of_work.discard()
+
+    def make_obj(self, pk):
+        return mock.Mock(_name='thing', _primary_key=pk)
+
+    def test_defer_outside_unit_of_work(self):
+        assert_false(unit_of_work.defer(self.make_obj('abc12'), mock.Mock()))
+
+    def test_flush_calls_back_once_per_object(self):
+        callback = mock.Mock()
+        first, second = self.make_obj('abc12'), self.make_obj('def34')
+        with unit_of_work.unit_of_work() as unit:
+            assert_true(unit_of_work.defer(first, callback, fields=['title']))
+            unit_of_work.defer(second, callback, fields=['title'])
+            unit_of_work.defer(first, callback, fields=['description'])
+            assert_equal(unit.saves, 3)
+            assert_equal(len(unit), 2)
+            assert_false(callback.called)
+        assert_equal(callback.call_args_list, [
+            mock.call([{'fields': ['title']}, {'fields': ['description']}]),
+            mock.call([{'fields': ['title']}]),
+        ])
+        assert_is_none(unit_of_work.current())
+
+    def test_nested_blocks_join_outer_unit(self):
+        callback = mock.Mock()
+        with unit_of_work.unit_of_work() as outer:
+            with unit_of_work.unit_of_work() as inner:
+                unit_of_work.defer(self.make_obj('abc12'), callback)
+            assert_is(inner, outer)
+            assert_false(callback.called)
+        assert_equal(callback.call_count, 1)
+
+    def test_error_discards_unit(self):
+        callback = mock.Mock()
+        with assert_raises(ValueError):
+            with unit_of_work.unit_of_work():
+                unit_of_work.defer(self.make_obj('abc12'), callback)
+                raise ValueError
+        assert_false(callback.called)
+        assert_is_none(unit_of_work.current())
+
+    def test_error_response_discards_unit(self):
+        callback = mock.Mock()
+        unit_of_work.unit_of_work_before_request()
+        unit_of_work.defer(self.make_obj('abc12'), callback)
+        unit_of_work.unit_of_work_after_request(mock.Mock(status_code=500))
+        assert_false(callback.called)
+        assert_is_none(unit_of_work.current())
+
+
+class TestNodeSaves(OsfTestCase):
+
+    def setUp(self):
+        super(TestNodeSaves, self).setUp()
+        self.project = ProjectFactory()
+
+    def tearDown(self):
+        unit_of_work.discard()
+        super(TestNodeSaves, self).tearDown()
+
+    def test_saves_are_written_immediately(self):
+        with unit_of_work.unit_of_work():
+            self.project.title = 'Renamed'
+            self.project.save()
+            self.project.reload()
+            assert_equal(self.project.title, 'Renamed')
+
+    @mock.patch('website.project.model.Node.update_search')
+    def test_side_effects_run_once_for_merged_fields(self, mock_update_search):
+        self.project.is_public = True
+        self.project.save()
+        mock_update_search.reset_mock()
+        received = []
+
+        def receiver(node, saved_fields):
+            received.append(sorted(saved_fields))
+
+        project_signals.node_updated.connect(receiver)
+        try:
+            with unit_of_work.unit_of_work():
+                self.project.title = 'Renamed'
+                self.project.save()
+                self.project.description = 'Described'
+                self.project.save()
+                assert_equal(received, [])
+                assert_false(mock_update_search.called)
+        finally:
+            project_signals.node_updated.disconnect(receiver)
+        assert_equal(len(received), 1)
+        assert_in('title', received[0])
+        assert_in('description', received[0])
+        assert_equal(mock_update_search.call_count, 1)
+
+
+unit_of_work_app = Flask('test_unit_of_work_app')
+unit_of_work_app.logger.setLevel(logging.CRITICAL)
+
+add_handlers(unit_of_work_app, database_handlers.handlers)
+add_handlers(unit_of_work_app, transaction_handlers.handlers)
+add_handlers(unit_of_work_app, unit_of_work.handlers)
+
+
+def failing_side_effect(saves):
+    database['unit_of_work'].insert({'_id': 'side_effect'})
+    raise ValueError
+
+
+@unit_of_work_app.route('/write/with/failing/side/effect/', methods=['POST'])
+def write_with_failing_side_effect():
+    database['unit_of_work'].insert({'_id': 'view'})
+    unit_of_work.defer(mock.Mock(_name='node', _primary_key='abc12'), failing_side_effect)
+    return 'deferred'
+
+test_app = webtest_plus.TestApp(unit_of_work_app)
+
+
+class TestUnitOfWorkRequest(DbTestCase):
+
+    def tearDown(self):
+        database['unit_of_work'].remove()
+        super(TestUnitOfWorkRequest, self).tearDown()
+
+    def test_failing_side_effect_rolls_back_request(self):
+        res = test_app.post('/write/with/failing/side/effect/', expect_errors=True)
+        assert_equal(res.status_code, 500)
+        assert_equal(database['unit_of_work'].find().count(), 0)
+        assert_is_none(unit_of_work.current())
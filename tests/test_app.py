@@ -22,6 +22,8 @@ def test_attach_handlers():
         framework.celery_tasks.handlers.celery_before_request,
         framework.transactions.handlers.transaction_before_request,
         framework.postcommit_tasks.handlers.postcommit_before_request,
+        framework.auth.permission_cache.permission_cache_before_request,
+        framework.mongo.unit_of_work.unit_of_work_before_request,
         framework.sessions.prepare_private_key,
         framework.sessions.before_request,
     }
@@ -30,6 +32,7 @@ def test_attach_handlers():
         framework.postcommit_tasks.handlers.postcommit_after_request,
         framework.celery_tasks.handlers.celery_after_request,
         framework.transactions.handlers.transaction_after_request,
+        framework.mongo.unit_of_work.unit_of_work_after_request,
         framework.sessions.after_request,
     }
 
@@ -37,9 +40,17 @@ def test_attach_handlers():
         framework.mongo.handlers.connection_teardown_request,
         framework.celery_tasks.handlers.celery_teardown_request,
         framework.transactions.handlers.transaction_teardown_request,
+        framework.auth.permission_cache.permission_cache_teardown_request,
+        framework.mongo.unit_of_work.unit_of_work_teardown_request,
     }
 
     # Check that necessary handlers are attached and correctly ordered
     assert_equal(sorted(set(before_funcs)), sorted(assert_before_funcs))
     assert_equal(sorted(set(after_funcs)), sorted(assert_after_funcs))
     assert_equal(sorted(set(teardown_funcs)), sorted(assert_teardown_funcs))
+    # The unit of work is flushed before postcommit tasks run and the
+    # transaction is committed; after_request handlers run in reverse
+    assert_less(
+        after_funcs.index(framework.postcommit_tasks.handlers.postcommit_after_request),
+        after_funcs.index(framework.mongo.unit_of_work.unit_of_work_after_request),
+    )
@@ -439,6 +439,66 @@ class TestCommentModel(OsfTestCase):
         n_unread = Comment.find_n_unread(user=user, node=project, page='node')
         assert_equal(n_unread, 0)
 
+    def test_find_unread_counts_groups_by_page(self):
+        project = ProjectFactory()
+        user = UserFactory()
+        project.add_contributor(user)
+        project.save()
+        test_file = project.get_addon('osfstorage').get_root().append_file('test_file')
+        file_guid = test_file.get_guid(create=True)
+        CommentFactory(node=project, user=project.creator)
+        CommentFactory(node=project, user=project.creator, target=file_guid)
+        CommentFactory(node=project, user=project.creator, target=file_guid)
+        CommentFactory(node=project, user=user, target=file_guid)
+
+        counts = Comment.find_unread_counts(user=user, node=project)
+        assert_equal(counts, {project._id: 1, file_guid._id: 2})
+        assert_equal(Comment.find_n_unread(user=user, node=project, page='files', root_id=file_guid._id), 2)
+
+    def test_find_unread_counts_applies_each_pages_timestamp(self):
+        project = ProjectFactory()
+        user = UserFactory()
+        project.add_contributor(user)
+        project.save()
+        test_file = project.get_addon('osfstorage').get_root().append_file('test_file')
+        file_guid = test_file.get_guid(create=True)
+        CommentFactory(node=project, user=project.creator)
+        CommentFactory(node=project, user=project.creator, target=file_guid)
+        user.comments_viewed_timestamp[file_guid._id] = dt.datetime.utcnow()
+        user.save()
+
+        counts = Comment.find_unread_counts(user=user, node=project)
+        assert_equal(counts, {project._id: 1})
+
+    def test_find_unread_counts_ignores_pages_of_other_nodes(self):
+        project = ProjectFactory()
+        user = UserFactory()
+        project.add_contributor(user)
+        project.save()
+        CommentFactory(node=project, user=project.creator)
+        other = ProjectFactory()
+        CommentFactory(node=other, user=other.creator)
+        user.comments_viewed_timestamp[other._id] = dt.datetime(2000, 1, 1)
+        user.save()
+
+        counts = Comment.find_unread_counts(user=user, node=project)
+        assert_equal(counts, {project._id: 1})
+
+    def test_find_unread_counts_empty_for_non_contributors(self):
+        project = ProjectFactory()
+        CommentFactory(node=project, user=project.creator)
+        assert_equal(Comment.find_unread_counts(user=UserFactory(), node=project), {})
+
+    def test_get_unread_comment_counts_view(self):
+        user = AuthUserFactory()
+        project = ProjectFactory()
+        project.add_contributor(user)
+        project.save()
+        CommentFactory(node=project, user=project.creator)
+        url = project.api_url_for('get_unread_comment_counts')
+        res = self.app.get(url, auth=user.auth)
+        assert_equal(res.json, {'unread': {project._id: 1}})
+
 
 class FileCommentMoveRenameTestMixin(object):
     # TODO: Remove skip decorators when waterbutler returns a consistently formatted payload
@@ -18,7 +18,7 @@ from framework.transactions import commands
 from website import settings
 from website.models import User, Node
 from website.conferences import views
-from website.conferences.model import Conference
+from website.conferences.model import Conference, ConferenceSubmission
 from website.conferences import utils, message
 from website.util import api_url_for, web_url_for
 
@@ -525,6 +525,57 @@ class TestConferenceEmailViews(OsfTestCase):
         assert_equal(res.status_code, 200)
 
 
+class TestConferenceSubmissions(OsfTestCase):
+
+    def setUp(self):
+        super(TestConferenceSubmissions, self).setUp()
+        self.conference = ConferenceFactory()
+        self.node = create_fake_conference_nodes(1, self.conference.endpoint.upper())[0]
+
+    def test_tagged_public_node_is_submission(self):
+        submission = ConferenceSubmission.find_one(Q('node', 'eq', self.node._id))
+        assert_equal(submission.conference, self.conference)
+        assert_equal(submission.data['title'], self.node.title)
+        assert_equal(submission.date_created, self.node.date_created)
+        self.conference.reload()
+        assert_equal(self.conference.num_submissions, 1)
+
+    def test_title_change_refreshes_submission(self):
+        self.node.set_title('New title', auth=Auth(self.node.creator), save=True)
+        submission = ConferenceSubmission.find_one(Q('node', 'eq', self.node._id))
+        assert_equal(submission.data['title'], 'New title')
+
+    def test_private_node_is_removed(self):
+        self.node.set_privacy('private', auth=Auth(self.node.creator))
+        assert_equal(ConferenceSubmission.find(Q('node', 'eq', self.node._id)).count(), 0)
+        self.conference.reload()
+        assert_equal(self.conference.num_submissions, 0)
+
+    def test_untagged_node_is_removed(self):
+        self.node.remove_tag(self.conference.endpoint.upper(), auth=Auth(self.node.creator))
+        assert_equal(ConferenceSubmission.find(Q('node', 'eq', self.node._id)).count(), 0)
+
+    def test_existing_nodes_are_indexed_for_new_conference(self):
+        self.node.add_tag('laterconf', auth=Auth(self.node.creator))
+        conference = ConferenceFactory(endpoint='laterconf')
+        assert_equal(conference.num_submissions, 1)
+        assert_equal(ConferenceSubmission.find(Q('node', 'eq', self.node._id)).count(), 2)
+
+    def test_rebuild(self):
+        ConferenceSubmission.remove()
+        ConferenceSubmission.rebuild(self.conference)
+        assert_equal(ConferenceSubmission.find(Q('conference', 'eq', self.conference.endpoint)).count(), 1)
+
+    def test_conference_submissions_paginated(self):
+        create_fake_conference_nodes(2, self.conference.endpoint)
+        url = api_url_for('conference_submissions')
+        res = self.app.get(url, {'page': 2, 'size': 2})
+        assert_equal(res.json['total'], 3)
+        assert_equal(len(res.json['submissions']), 1)
+        assert_equal(res.json['submissions'][0]['id'], 2)
+        assert_equal(res.json['submissions'][0]['title'], self.node.title)
+
+
 class TestConferenceModel(OsfTestCase):
 
     def test_endpoint_and_name_are_required(self):
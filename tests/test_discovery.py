@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+import mock
+from nose.tools import *  # noqa (PEP8 asserts)
+from pymongo.errors import OperationFailure
+
+from framework.analytics.piwik import CustomVariableValue
+
+from website.discovery import snapshot, tasks
+
+from tests.base import OsfTestCase
+from tests.factories import ProjectFactory, RegistrationFactory
+
+
+def make_values(*node_ids):
+    return [
+        CustomVariableValue(label=node_id, nb_actions=10 - idx, nb_visits=5)
+        for idx, node_id in enumerate(node_ids)
+    ]
+
+
+class TestActivitySnapshot(OsfTestCase):
+
+    def setUp(self):
+        super(TestActivitySnapshot, self).setUp()
+        snapshot._collection().remove()
+        self.project = ProjectFactory(is_public=True)
+        self.private_project = ProjectFactory(is_public=False)
+        self.registration = RegistrationFactory(project=self.project, is_public=True)
+        self.values = make_values(self.private_project._id, self.project._id, self.registration._id, 'missing')
+
+    @mock.patch('website.discovery.snapshot.fetch_popular_values')
+    def test_refresh_snapshot(self, mock_fetch):
+        mock_fetch.return_value = self.values
+        snapshot.refresh_snapshot()
+
+        projects, registrations, hits = snapshot.load_popular(snapshot._collection().find_one())
+        assert_equal(projects, [self.project])
+        assert_equal(registrations, [self.registration])
+        assert_equal(hits, {
+            self.project._id: {'hits': 9, 'visits': 5},
+            self.registration._id: {'hits': 8, 'visits': 5},
+        })
+
+    @mock.patch('website.discovery.snapshot.fetch_popular_values')
+    def test_failed_refresh_keeps_snapshot(self, mock_fetch):
+        mock_fetch.return_value = self.values
+        snapshot.refresh_snapshot()
+        mock_fetch.side_effect = IOError('Piwik is down')
+        assert_is_none(snapshot.refresh_snapshot())
+
+        projects, _, _ = snapshot.load_popular(snapshot._collection().find_one())
+        assert_equal(projects, [self.project])
+
+    def test_load_popular_drops_nodes_made_private(self):
+        stored = {
+            'popular_public_projects': [self.project._id],
+            'popular_public_registrations': [],
+            'hits': {self.project._id: {'hits': 1, 'visits': 1}},
+        }
+        self.project.is_public = False
+        self.project.save()
+        projects, _, _ = snapshot.load_popular(stored)
+        assert_equal(projects, [])
+
+    def test_claim_refresh_once(self):
+        assert_true(snapshot.claim_refresh())
+        assert_false(snapshot.claim_refresh())
+
+    def test_claim_refresh_after_timeout(self):
+        started = datetime.datetime.utcnow() - datetime.timedelta(hours=1)
+        snapshot._collection().insert({'_id': snapshot.SNAPSHOT_ID, 'refresh_started': started})
+        assert_true(snapshot.claim_refresh())
+
+    @mock.patch('website.discovery.snapshot._collection')
+    def test_claim_refresh_write_conflict_is_not_claimed(self, mock_collection):
+        mock_collection.return_value.find_and_modify.side_effect = OperationFailure('lock conflict')
+        assert_false(snapshot.claim_refresh())
+
+    @mock.patch('website.discovery.snapshot.settings.PIWIK_HOST', None)
+    @mock.patch('website.discovery.snapshot.refresh_snapshot')
+    def test_task_skipped_without_piwik(self, mock_refresh):
+        tasks.refresh_activity_snapshot()
+        assert_false(mock_refresh.called)
+        assert_is_none(snapshot._collection().find_one({'_id': snapshot.SNAPSHOT_ID}))
+
+    @mock.patch('website.discovery.snapshot.settings.PIWIK_HOST', 'http://piwik.test')
+    @mock.patch('website.discovery.tasks.refresh_activity_snapshot')
+    def test_get_stale_snapshot_schedules_refresh(self, mock_refresh):
+        refreshed = datetime.datetime.utcnow() - datetime.timedelta(days=1)
+        snapshot._collection().insert({
+            '_id': snapshot.SNAPSHOT_ID,
+            'popular_public_projects': [self.project._id],
+            'popular_public_registrations': [],
+            'hits': {},
+            'date_refreshed': refreshed,
+            'refresh_started': None,
+        })
+        stale = snapshot.get_snapshot()
+        assert_equal(stale['popular_public_projects'], [self.project._id])
+        mock_refresh.assert_called_once_with(claimed=True)
+
+        snapshot.get_snapshot()
+        assert_equal(mock_refresh.call_count, 1)
@@ -32,6 +32,21 @@ class TestGuidStoredObject(OsfTestCase):
         assert_equal(guids[0].referent, fake_guid)
         assert_equal(guids[0]._id, fake_guid._id)
 
+    @mock.patch('framework.guid.model.random.sample')
+    def test_allocate_skips_taken_ids(self, mock_sample):
+        models.BlacklistGuid(_id='aaaaa').save()
+        models.Guid(_id='bbbbb').save()
+        mock_sample.side_effect = [list(guid_id) for guid_id in ('aaaaa', 'bbbbb', 'ccccc', 'ddddd')]
+
+        guid_ids = models.Guid.allocate('nodewikipage', 2)
+        assert_equal(sorted(guid_ids), ['ccccc', 'ddddd'])
+        for guid_id in guid_ids:
+            guid = models.Guid.load(guid_id)
+            assert_equal(guid.to_storage()['referent'], models.Guid(_id=guid_id, referent=(guid_id, 'nodewikipage')).to_storage()['referent'])
+
+    def test_allocate_nothing(self):
+        assert_equal(models.Guid.allocate('nodewikipage', 0), [])
+
 
 class TestResolveGuid(OsfTestCase):
 
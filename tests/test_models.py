@@ -4259,6 +4259,55 @@ class TestNodeLog(OsfTestCase):
         created_log = project.logs[0]
         assert_false(created_log.can_view(unrelated, Auth(user=project.creator)))
 
+    def test_copy_logs(self):
+        project = ProjectFactory()
+        project.add_log('tag_added', params={'node': project._id, 'tag': 'foo'}, auth=Auth(project.creator))
+        target = ProjectFactory()
+        existing = target.logs.count()
+        progress = []
+
+        copied = NodeLog.copy_logs(project._id, target._id, batch_size=1, progress=progress.append)
+
+        assert_equal(copied, project.logs.count())
+        assert_equal(progress, range(1, copied + 1))
+        assert_equal(target.logs.count(), existing + copied)
+        copies = list(target.logs)[existing:]
+        assert_equal([log.action for log in copies], [log.action for log in project.logs])
+        assert_equal([log.original_node for log in copies], [log.original_node for log in project.logs])
+        assert_false(set(log._id for log in copies) & set(log._id for log in project.logs))
+
+    @mock.patch('website.project.model.settings.LOG_COPY_ASYNC_THRESHOLD', 0)
+    def test_fork_copies_logs_in_task(self):
+        project = ProjectFactory()
+        with mock.patch('website.project.tasks.copy_node_logs') as mock_copy:
+            fork = project.fork_node(Auth(project.creator))
+        mock_copy.assert_called_once_with(project._id, fork._id)
+        assert_equal(fork.logs_copy_progress, {'copied': 0, 'total': project.logs.count()})
+
+    def test_copy_node_logs_task_clears_progress(self):
+        from website.project.tasks import copy_node_logs
+        project = ProjectFactory()
+        target = ProjectFactory()
+        target.logs_copy_progress = {'copied': 0, 'total': project.logs.count()}
+        target.save()
+        existing = target.logs.count()
+
+        copy_node_logs(project._id, target._id)
+
+        target.reload()
+        assert_is_none(target.logs_copy_progress)
+        assert_equal(target.logs.count(), existing + project.logs.count())
+
+    def test_copy_node_logs_task_is_safe_to_redeliver(self):
+        from website.project.tasks import copy_node_logs
+        project = ProjectFactory()
+        target = ProjectFactory()
+        existing = target.logs.count()
+
+        copy_node_logs(project._id, target._id)
+        copy_node_logs(project._id, target._id)
+
+        assert_equal(target.logs.count(), existing + project.logs.count())
 
     def test_original_node_and_current_node_for_registration_logs(self):
         user = UserFactory()
@@ -0,0 +1,55 @@
+from nose.tools import *  # noqa PEP8 asserts
+
+from framework.auth import Auth
+
+from website.project.page_data import ProjectPageData
+
+from tests.base import OsfTestCase
+from tests.factories import (
+    CommentFactory, NodeFactory, ProjectFactory, RegistrationFactory, UserFactory
+)
+
+
+class TestProjectPageData(OsfTestCase):
+
+    def setUp(self):
+        super(TestProjectPageData, self).setUp()
+        self.user = UserFactory()
+        self.auth = Auth(user=self.user)
+        self.project = ProjectFactory(creator=self.user, is_public=True)
+
+    def test_related_node_counts(self):
+        RegistrationFactory(project=self.project, creator=self.user)
+        self.project.fork_node(self.auth)
+        deleted_fork = self.project.fork_node(self.auth)
+        deleted_fork.is_deleted = True
+        deleted_fork.save()
+        self.project.use_as_template(self.auth)
+
+        counts = ProjectPageData(self.project).related_node_counts
+        assert_equal(counts['registration_count'], self.project.registrations_all.count())
+        assert_equal(counts['fork_count'], self.project.forks.count())
+        assert_equal(counts['templated_count'], self.project.templated_list.count())
+
+    def test_related_node_counts_empty(self):
+        counts = ProjectPageData(NodeFactory()).related_node_counts
+        assert_equal(counts, {'registration_count': 0, 'fork_count': 0, 'templated_count': 0})
+
+    def test_has_comments(self):
+        page_data = ProjectPageData(self.project)
+        assert_false(page_data.has_comments)
+        CommentFactory(node=self.project)
+        # Memoized for the lifetime of the loader
+        assert_false(page_data.has_comments)
+        assert_true(ProjectPageData(self.project).has_comments)
+
+    def test_date_modified_is_latest_log(self):
+        self.project.add_log('project_created', params={'node': self.project._id}, auth=self.auth)
+        page_data = ProjectPageData(self.project)
+        assert_equal(page_data.date_modified, self.project.logs[-1].date)
+
+    def test_records_timings(self):
+        page_data = ProjectPageData(self.project)
+        page_data.watched_count
+        page_data.timed('parent', lambda: None)
+        assert_equal(list(page_data.timings.keys()), ['watched_count', 'parent'])
@@ -0,0 +1,55 @@
+from nose.tools import *  # noqa PEP8 asserts
+
+from website.project.tree import NodeTree, build_trees
+
+from tests import factories
+from tests.base import OsfTestCase
+
+
+class TestNodeTree(OsfTestCase):
+
+    def setUp(self):
+        super(TestNodeTree, self).setUp()
+        self.user = factories.UserFactory()
+        self.project = factories.ProjectFactory(creator=self.user)
+        self.component = factories.NodeFactory(parent=self.project, creator=self.user)
+        self.subcomponent = factories.NodeFactory(parent=self.component, creator=self.user)
+
+    def test_children_in_creation_order(self):
+        second = factories.NodeFactory(parent=self.project, creator=self.user)
+        tree = NodeTree(self.user, self.project._id)
+        assert_equal(
+            [n._id for n in tree.children(self.project._id)],
+            [self.component._id, second._id]
+        )
+        assert_equal(tree.parent(self.subcomponent._id), self.component)
+
+    def test_excludes_deleted_nodes_and_their_descendants(self):
+        self.component.is_deleted = True
+        self.component.save()
+        tree = NodeTree(self.user, self.project._id)
+        assert_equal(tree.children(self.project._id), [])
+        assert_not_in(self.component._id, tree)
+
+    def test_permissions_match_node_permission_checks(self):
+        other = factories.UserFactory()
+        self.subcomponent.add_contributor(other, permissions=['read'])
+        self.subcomponent.save()
+        tree = NodeTree(other, self.project._id)
+        for node in (self.project, self.component, self.subcomponent):
+            assert_equal(tree.can_read(node._id), node.has_permission(other, 'read'))
+            assert_equal(tree.can_read_subtree(node._id), node.has_permission_on_children(other, 'read'))
+
+    def test_admin_on_ancestor_grants_read(self):
+        admin = factories.UserFactory()
+        self.project.add_contributor(admin, permissions=['read', 'write', 'admin'])
+        self.project.save()
+        tree = NodeTree(admin, self.project._id)
+        assert_true(tree.can_read(self.subcomponent._id))
+        assert_false(tree.is_admin(self.subcomponent._id))
+        assert_equal(tree.kind(self.component._id), 'node')
+        assert_equal(tree.kind(self.project._id), 'folder')
+
+    def test_build_trees_shares_tree_per_root(self):
+        trees = build_trees(self.user, [self.project._id, self.subcomponent._id])
+        assert_is(trees[self.project._id], trees[self.subcomponent._id])
@@ -41,6 +41,8 @@ from website import settings
 from website.util import waterbutler_url_for
 from website.project.model import Node, NodeLog, ensure_schemas, MetaSchema
 from website.addons.base import StorageAddonBase
+from website.addons.base import crawler
+from website.addons.dataverse.model import AddonDataverseNodeSettings
 
 from tests import factories
 from tests.base import OsfTestCase, fake
@@ -387,6 +389,63 @@ class TestStorageAddonBase(ArchiverTestCase):
         for addon in [a for a in settings.ADDONS_ARCHIVABLE if a not in ['wiki', 'forward']]:
             self._test_addon(addon)
 
+class TestFileTreeCrawler(OsfTestCase):
+
+    @httpretty.activate
+    @mock.patch('website.addons.base.crawler.time.sleep')
+    def test_fetch_metadata_retries_throttled_requests(self, mock_sleep):
+        url = 'http://waterbutler.test/data'
+        httpretty.register_uri(httpretty.GET, url, responses=[
+            httpretty.Response(body='{}', status=429),
+            httpretty.Response(body='{}', status=503),
+            httpretty.Response(body=json.dumps({'data': [{'kind': 'file'}]}), status=200),
+        ])
+        limiter = mock.Mock()
+        ret = crawler.fetch_metadata(url, limiter, max_retries=2, backoff=1)
+        assert_equal(ret, [{'kind': 'file'}])
+        assert_equal(limiter.acquire.call_count, 3)
+        assert_equal([c[0][0] for c in mock_sleep.call_args_list], [1, 2])
+
+    @httpretty.activate
+    @mock.patch('website.addons.base.crawler.time.sleep')
+    def test_fetch_metadata_does_not_retry_client_errors(self, mock_sleep):
+        url = 'http://waterbutler.test/data'
+        httpretty.register_uri(httpretty.GET, url, body=json.dumps({'message': 'nope'}), status=403)
+        with assert_raises(HTTPError) as cm:
+            crawler.fetch_metadata(url, mock.Mock())
+        assert_equal(cm.exception.code, 403)
+        assert_false(mock_sleep.called)
+
+    def test_crawl_deep_tree_iteratively(self):
+        depth = 2000
+        addon = mock.Mock()
+        addon.config.short_name = 'mock'
+        addon._get_fileobj_child_metadata_url.side_effect = lambda filenode, *args, **kwargs: filenode['path']
+        def fetch(url, limiter):
+            level = url.count('/')
+            if level >= depth:
+                return []
+            return [{'kind': 'folder', 'path': url.rstrip('/') + '/a/'}]
+        with mock.patch('website.addons.base.crawler.fetch_metadata', side_effect=fetch):
+            tree = crawler.FileTreeCrawler(addon, user=None, workers=2).crawl({'kind': 'folder', 'path': '/'})
+        levels = 0
+        while tree['children']:
+            tree = tree['children'][0]
+            levels += 1
+        assert_equal(levels, depth - 1)
+
+    def test_crawl_lets_addons_handle_errors(self):
+        addon = AddonDataverseNodeSettings()
+        tree = {'kind': 'folder', 'path': '/'}
+        with mock.patch.object(AddonDataverseNodeSettings, '_get_fileobj_child_metadata_url', return_value='url'), \
+                mock.patch('website.addons.base.crawler.fetch_metadata', side_effect=HTTPError(404)):
+            # Datasets without published files have no published children
+            crawler.FileTreeCrawler(addon, user=None, version='latest-published').crawl(tree)
+            assert_equal(tree['children'], [])
+            with assert_raises(HTTPError):
+                crawler.FileTreeCrawler(addon, user=None, version='latest').crawl({'kind': 'folder', 'path': '/'})
+
+
 class TestArchiverTasks(ArchiverTestCase):
 
     @use_fake_addons
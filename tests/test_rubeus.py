@@ -386,3 +386,57 @@ class TestSerializingNodeWithAddon(OsfTestCase):
                 'fetch': None,
             },
         )
+
+
+class TestCollectingAddonsConcurrently(OsfTestCase):
+
+    def setUp(self):
+        super(TestCollectingAddonsConcurrently, self).setUp()
+        self.auth = AuthFactory()
+        self.project = ProjectFactory(creator=self.auth.user)
+
+    def _mock_addon(self, short_name, **kwargs):
+        addon = mock.Mock()
+        addon.owner = self.project
+        addon.config.short_name = short_name
+        addon.config.full_name = short_name.title()
+        addon.config.has_hgrid_files = True
+        addon.config.get_hgrid_data = mock.Mock(**kwargs)
+        return addon
+
+    def test_collect_addons_preserves_order(self):
+        first = self._mock_addon('first', return_value=[{'name': 'First'}])
+        second = self._mock_addon('second', return_value=[{'name': 'Second'}])
+        self.project.get_addons = mock.Mock(return_value=[first, second])
+        collector = rubeus.NodeFileCollector(node=self.project, auth=self.auth)
+        ret = collector._collect_addons(self.project)
+        assert_equal([root['name'] for root in ret], ['First', 'Second'])
+
+    def test_failing_addon_does_not_hide_others(self):
+        broken = self._mock_addon('broken', side_effect=Exception('nope'))
+        working = self._mock_addon('working', return_value=[{'name': 'Working'}])
+        self.project.get_addons = mock.Mock(return_value=[broken, working])
+        collector = rubeus.NodeFileCollector(node=self.project, auth=self.auth)
+        ret = collector._collect_addons(self.project)
+        assert_true(ret[0]['unavailable'])
+        assert_equal(ret[1]['name'], 'Working')
+
+    @mock.patch('website.util.rubeus.settings.ADDON_HGRID_TIMEOUT', 0.01)
+    def test_slow_addon_is_unavailable(self):
+        import gevent
+        slow = self._mock_addon('slow', side_effect=lambda *args, **kwargs: gevent.sleep(1))
+        working = self._mock_addon('working', return_value=[{'name': 'Working'}])
+        self.project.get_addons = mock.Mock(return_value=[slow, working])
+        collector = rubeus.NodeFileCollector(node=self.project, auth=self.auth)
+        ret = collector._collect_addons(self.project)
+        assert_true(ret[0]['unavailable'])
+        assert_equal(ret[1]['name'], 'Working')
+
+    def test_to_hgrid_places_addons_before_components(self):
+        addon = self._mock_addon('mock', return_value=[{'name': 'Mock'}])
+        self.project.get_addons = mock.Mock(return_value=[addon])
+        component = NodeFactory(parent=self.project, creator=self.auth.user)
+        ret = rubeus.NodeFileCollector(node=self.project, auth=self.auth).to_hgrid()
+        children = ret[0]['children']
+        assert_equal(children[0]['name'], 'Mock')
+        assert_equal(children[-1]['nodeID'], component._id)
@@ -835,6 +835,18 @@ class TestProjectViews(OsfTestCase):
         assert_equal(res.status_code, http.OK)
         assert_in('show_wiki_widget', res.json['user'])
 
+    def test_view_project_returns_logs_copy_progress(self):
+        user = AuthUserFactory()
+        project = ProjectFactory(creator=user)
+        fork = project.fork_node(Auth(user))
+        fork.logs_copy_progress = {'copied': 1000, 'total': 6000}
+        fork.save()
+
+        res = self.app.get(fork.api_url_for('view_project'), auth=user.auth)
+        assert_equal(res.json['node']['logs_copy_progress'], {'copied': 1000, 'total': 6000})
+        res = self.app.get(fork.web_url_for('view_project'), auth=user.auth)
+        assert_in('1000 of 6000 logs copied', res.body)
+
     def test_fork_count_does_not_include_deleted_forks(self):
         user = AuthUserFactory()
         project = ProjectFactory(creator=user)
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import datetime
+import unittest
 
 from nose.tools import *  # noqa
 import mock
@@ -654,6 +655,89 @@ class TestFileObj(FilesTestCase):
             'Authorization': 'Bearer bearer'
         })
 
+    def _make_touchable_file(self, mock_requests):
+        file = models.StoredFileNode(
+            path='/afile',
+            name='name',
+            is_file=True,
+            node=self.node,
+            provider='test',
+            materialized_path='/long/path/to/name',
+        ).wrapped()
+
+        mock_response = mock.Mock(status_code=200)
+        mock_response.json.return_value = {
+            'data': {
+                'attributes': {
+                    'name': 'fairly',
+                    'etag': 'abc',
+                    'modified': '2015',
+                    'size': 0xDEADBEEF,
+                    'materialized': 'ephemeral',
+                }
+            }
+        }
+        mock_requests.return_value = mock_response
+        return file
+
+    @mock.patch('website.settings.WATERBUTLER_METADATA_STATS_LOG_INTERVAL', 0)
+    @mock.patch('website.files.models.base.requests.get')
+    def test_touch_latest_within_freshness_window(self, mock_requests):
+        file = self._make_touchable_file(mock_requests)
+        counts = models.base.touch_counts.summary()
+
+        file.touch(None)
+        v = file.touch(None)
+        assert_equal(mock_requests.call_count, 1)
+        assert_equal(v.size, 0xDEADBEEF)
+        assert_equal(v.identifier, None)
+        assert_equal(models.base.touch_counts['cache'], counts['cache'] + 1)
+        assert_equal(models.base.touch_counts['waterbutler'], counts['waterbutler'] + 1)
+
+    @mock.patch('website.files.models.base.requests.get')
+    def test_touch_latest_revalidates_by_etag(self, mock_requests):
+        file = self._make_touchable_file(mock_requests)
+        file.touch(None)
+        file.last_touched -= datetime.timedelta(days=1)
+        mock_requests.return_value = mock.Mock(status_code=304)
+
+        v = file.touch(None)
+        assert_equal(mock_requests.call_count, 2)
+        assert_equal(mock_requests.call_args[1]['headers'], {'If-None-Match': 'abc'})
+        assert_equal(v.size, 0xDEADBEEF)
+        assert_true(datetime.datetime.utcnow() - file.last_touched < datetime.timedelta(minutes=1))
+
+    @mock.patch('website.files.models.base.requests.get')
+    def test_touch_revision_forgets_latest(self, mock_requests):
+        file = self._make_touchable_file(mock_requests)
+        file.touch(None)
+        file.touch(None, revision='foo')
+        file.touch(None)
+        assert_equal(mock_requests.call_count, 3)
+
+    def test_update_caps_history(self):
+        file = models.StoredFileNode(
+            path='/afile',
+            name='name',
+            is_file=True,
+            node=self.node,
+            provider='test',
+            materialized_path='/long/path/to/name',
+        ).wrapped()
+
+        with mock.patch('website.files.models.base.settings.FILE_HISTORY_MAX_ENTRIES', 3):
+            for day in range(1, 6):
+                file.update(None, {
+                    'name': 'name',
+                    'etag': str(day),
+                    'modified': '2015-01-0{}'.format(day),
+                    'materialized': '/long/path/to/name',
+                })
+
+        assert_equal([entry['etag'] for entry in file.history], ['1', '4', '5'])
+        assert_equal([entry['etag'] for entry in file.get_history(limit=2)], ['5', '4'])
+        assert_equal([entry['etag'] for entry in file.get_history(offset=2)], ['1'])
+
     def test_download_url(self):
         pass
 
@@ -664,6 +748,32 @@ class TestFileObj(FilesTestCase):
         pass
 
 
+class TestTouchCounts(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0
+        self.counts = models.base.TouchCounts(clock=lambda: self.now)
+
+    @mock.patch('website.settings.WATERBUTLER_METADATA_STATS_LOG_INTERVAL', 0)
+    def test_summary(self):
+        self.counts.record('cache')
+        self.counts.record('cache')
+        self.counts.record('waterbutler')
+        assert_equal(self.counts.summary(), {'cache': 2, 'not_modified': 0, 'waterbutler': 1})
+
+    @mock.patch('website.files.models.base.logger')
+    def test_log_summary_resets_counts(self, mock_logger):
+        self.counts.record('cache')
+        self.counts.log_summary(300)
+        assert_false(mock_logger.info.called)
+
+        self.now = 300
+        self.counts.log_summary(300)
+        assert_equal(mock_logger.info.call_count, 1)
+        assert_in('1 served from cache (100.0%)', mock_logger.info.call_args[0][0])
+        assert_equal(self.counts['cache'], 0)
+
+
 class TestFolderObj(FilesTestCase):
 
     def setUp(self):
@@ -754,6 +864,12 @@ class TestUtils(FilesTestCase):
             models.FileNode.find().test
         assert_equal(e.exception.message, "'GenWrapper' object has no attribute 'test'")
 
+    def test_trim_history(self):
+        history = range(10)
+        assert_equal(utils.trim_history(history, 4), [0, 7, 8, 9])
+        assert_equal(utils.trim_history(history, 1), [0])
+        assert_is(utils.trim_history(history, 10), history)
+
 
 class TestFileVersion(FilesTestCase):
     pass
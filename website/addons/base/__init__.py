@@ -3,12 +3,10 @@ import glob
 import importlib
 import mimetypes
 import os
-from time import sleep
 
 from bson import ObjectId
 from mako.lookup import TemplateLookup
 import markupsafe
-import requests
 
 from modularodm import fields
 from modularodm import Q
@@ -23,7 +21,8 @@ from framework.mongo import StoredObject
 from framework.routing import process_rules
 
 from website import settings
-from website.addons.base import serializer, logger
+from website.addons.base import crawler, serializer, logger
+from website.project import signals as project_signals
 from website.project.model import Node, User
 from website.util import waterbutler_url_for
 
@@ -546,6 +545,13 @@ class AddonNodeSettingsBase(AddonSettingsBase):
         'abstract': True,
     }
 
+    def save(self, *args, **kwargs):
+        saved_fields = super(AddonNodeSettingsBase, self).save(*args, **kwargs)
+        if saved_fields and self.owner:
+            # Credentials and settings served to WaterButler may have changed
+            project_signals.node_access_changed.send(self.owner)
+        return saved_fields
+
     @property
     def complete(self):
         """Whether or not this addon is properly configured
@@ -756,7 +762,7 @@ class StorageAddonBase(object):
             name = name + ': {folder}'.format(folder=folder_name)
         return name
 
-    def _get_fileobj_child_metadata(self, filenode, user, cookie=None, version=None):
+    def _get_fileobj_child_metadata_url(self, filenode, user, cookie=None, version=None):
         kwargs = dict(
             provider=self.config.short_name,
             path=filenode.get('path', ''),
@@ -768,41 +774,36 @@ class StorageAddonBase(object):
             kwargs['cookie'] = cookie
         if version:
             kwargs['version'] = version
-        metadata_url = waterbutler_url_for(
+        return waterbutler_url_for(
             'metadata',
             **kwargs
         )
-        res = requests.get(metadata_url)
-        if res.status_code != 200:
-            raise HTTPError(res.status_code, data={
-                'error': res.json(),
-            })
-        # TODO: better throttling?
-        sleep(1.0 / 5.0)
-        return res.json().get('data', [])
+
+    def _get_fileobj_child_metadata(self, filenode, user, cookie=None, version=None):
+        metadata_url = self._get_fileobj_child_metadata_url(filenode, user, cookie=cookie, version=version)
+        try:
+            return crawler.fetch_metadata(metadata_url, crawler.get_rate_limiter(self.config.short_name))
+        except HTTPError as error:
+            return self._handle_child_metadata_error(error, filenode, version=version)
+
+    def _handle_child_metadata_error(self, error, filenode, version=None):
+        """Called when fetching the children of ``filenode`` fails with
+        ``error``. Return the children to use instead, or reraise; addons
+        override this for errors that only mean there are no children.
+        """
+        raise error
 
     def _get_file_tree(self, filenode=None, user=None, cookie=None, version=None):
         """
-        Recursively get file metadata
+        Get file metadata for the whole tree below ``filenode``, fetching
+        folders concurrently. See :class:`website.addons.base.crawler.FileTreeCrawler`.
         """
         filenode = filenode or {
             'path': '/',
             'kind': 'folder',
             'name': self.root_node.name,
         }
-        if filenode.get('kind') == 'file':
-            return filenode
-        elif 'size' in filenode:
-            return filenode
-        kwargs = {
-            'version': version,
-            'cookie': cookie,
-        }
-        filenode['children'] = [
-            self._get_file_tree(child, user, cookie=cookie)
-            for child in self._get_fileobj_child_metadata(filenode, user, **kwargs)
-        ]
-        return filenode
+        return crawler.FileTreeCrawler(self, user, cookie=cookie, version=version).crawl(filenode)
 
 class AddonOAuthNodeSettingsBase(AddonNodeSettingsBase):
     _meta = {
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""Short-lived cache of WaterButler auth callback decisions.
+
+WaterButler calls ``get_auth`` once per file operation, so a multi-file upload
+or download repeats the same identity lookup, access check and credential
+serialization many times in a few seconds. Successful decisions are cached
+per (identity, node, provider, action, view-only key) for
+``settings.WATERBUTLER_AUTH_CACHE_TTL`` seconds.
+
+Entries are tagged with their project tree's root, the user they were
+granted to, and the generations of both, which are kept in the database so
+that every process sees them. Changes to contributors, permissions, privacy,
+view-only links or addon settings anywhere in the tree, and refreshes of the
+OAuth tokens its addons use, bump the tree's generation; disabling a user
+bumps the user's. Either invalidates the affected entries in all processes.
+A lookup costs one query for the generations by primary key.
+"""
+import collections
+
+from modularodm import Q
+
+from framework.auth.signals import user_disabled
+from framework.cache import LRUCache
+from framework.mongo import database
+
+from website import settings
+from website.oauth.signals import oauth_key_refreshed
+from website.project import signals as project_signals
+
+
+CachedAuth = collections.namedtuple('CachedAuth', ['root_id', 'user_id', 'generation', 'data'])
+
+# Collection of {_id: root node ID or 'user:' + user ID, generation: int}
+COLLECTION = 'waterbutlerauthgeneration'
+
+_cache = LRUCache(settings.WATERBUTLER_AUTH_CACHE_SIZE, ttl=settings.WATERBUTLER_AUTH_CACHE_TTL)
+
+
+def _root_id(node):
+    return node.to_storage().get('root') or node._id
+
+
+def make_key(identity, node_id, provider, action, private_key=None):
+    return (identity, node_id, provider, action, private_key)
+
+
+def _collection():
+    return database[COLLECTION]
+
+
+def _user_key(user_id):
+    return 'user:{}'.format(user_id)
+
+
+def _get_generation(root_id, user_id=None):
+    """Return the generations of the tree ``root_id`` and of user ``user_id``,
+    if given, as a tuple.
+    """
+    ids = [root_id] if user_id is None else [root_id, _user_key(user_id)]
+    generations = {
+        doc['_id']: doc['generation']
+        for doc in _collection().find({'_id': {'$in': ids}}, {'generation': True})
+    }
+    return tuple(generations.get(_id, 0) for _id in ids)
+
+
+def generation(node, user=None):
+    """Return the current generation of ``node``'s tree and of ``user``. Read
+    it before computing the data to ``store``, so that a change made meanwhile
+    invalidates the stored entry.
+    """
+    if not settings.WATERBUTLER_AUTH_CACHE_TTL:
+        return None
+    return _get_generation(_root_id(node), user._id if user else None)
+
+
+def lookup(key):
+    """Return the cached WaterButler payload data for ``key``, or None."""
+    if not settings.WATERBUTLER_AUTH_CACHE_TTL:
+        return None
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    if entry.generation != _get_generation(entry.root_id, entry.user_id):
+        _cache.delete(key)
+        return None
+    return entry.data
+
+
+def store(key, node, data, generation=None, user=None):
+    """Cache the WaterButler payload ``data`` granted for ``node`` to ``user``.
+
+    :param tuple generation: Generation from :func:`generation`, read before
+        computing ``data``; defaults to the current one
+    """
+    if not settings.WATERBUTLER_AUTH_CACHE_TTL:
+        return
+    root_id = _root_id(node)
+    user_id = user._id if user else None
+    if generation is None:
+        generation = _get_generation(root_id, user_id)
+    _cache.set(key, CachedAuth(root_id, user_id, generation, data))
+
+
+def invalidate(node):
+    """Invalidate cached decisions for every node in ``node``'s tree, in
+    every process.
+    """
+    _collection().update({'_id': _root_id(node)}, {'$inc': {'generation': 1}}, upsert=True)
+
+
+def invalidate_user(user):
+    """Invalidate cached decisions granted to ``user``, in every process."""
+    _collection().update({'_id': _user_key(user._id)}, {'$inc': {'generation': 1}}, upsert=True)
+
+
+def clear():
+    _cache.clear()
+
+
+@project_signals.node_access_changed.connect
+def _on_node_access_changed(node):
+    invalidate(node)
+
+
+@user_disabled.connect
+def _on_user_disabled(user):
+    invalidate_user(user)
+
+
+@oauth_key_refreshed.connect
+def _on_oauth_key_refreshed(provider, account):
+    """Invalidate the trees of the nodes using ``account``, whose cached
+    WaterButler credentials hold the old token.
+    """
+    config = settings.ADDONS_AVAILABLE_DICT.get(provider.short_name)
+    NodeSettings = config.settings_models.get('node') if config else None
+    if NodeSettings is None or 'external_account' not in NodeSettings._fields:
+        return
+    for node_settings in NodeSettings.find(Q('external_account', 'eq', account._id)):
+        if node_settings.owner is not None:
+            invalidate(node_settings.owner)
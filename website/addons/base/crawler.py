@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Concurrent crawler for addon file trees, used by the archiver to collect
+WaterButler metadata for every folder of a provider.
+
+Folders are fetched breadth-first from an explicit frontier by a bounded
+pool of worker threads, so deep trees cannot hit the recursion limit. Each
+provider has a process-wide token bucket capping the rate of metadata
+requests, and throttled (429) or failed (5xx) requests are retried with
+exponential backoff.
+"""
+import logging
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
+import requests
+
+from framework.exceptions import HTTPError
+from framework.ratelimit import TokenBucket
+
+from website import settings
+
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(provider):
+    """Return the shared :class:`TokenBucket` for ``provider``."""
+    with _buckets_lock:
+        if provider not in _buckets:
+            rate = settings.WATERBUTLER_METADATA_RATE_LIMITS.get(
+                provider, settings.WATERBUTLER_METADATA_RATE_LIMIT
+            )
+            _buckets[provider] = TokenBucket(rate)
+        return _buckets[provider]
+
+
+def fetch_metadata(url, limiter, max_retries=None, backoff=None):
+    """GET a WaterButler metadata URL, waiting on ``limiter`` before every
+    attempt and retrying throttled or failed responses.
+
+    :raises: HTTPError if WaterButler responds with a non-retryable error, or
+        retries are exhausted
+    :return: The response's ``data``
+    """
+    max_retries = settings.WATERBUTLER_METADATA_MAX_RETRIES if max_retries is None else max_retries
+    backoff = settings.WATERBUTLER_METADATA_RETRY_BACKOFF if backoff is None else backoff
+    attempt = 0
+    while True:
+        limiter.acquire()
+        res = requests.get(url)
+        if res.status_code == 200:
+            return res.json().get('data', [])
+        if res.status_code not in RETRY_STATUS_CODES or attempt >= max_retries:
+            try:
+                error = res.json()
+            except ValueError:
+                error = res.content
+            raise HTTPError(res.status_code, data={
+                'error': error,
+            })
+        delay = backoff * (2 ** attempt)
+        retry_after = res.headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        logger.info('Retrying WaterButler metadata request in {0}s after {1}: {2}'.format(delay, res.status_code, url))
+        time.sleep(delay)
+        attempt += 1
+
+
+class FileTreeCrawler(object):
+    """Collects the file tree of a storage addon.
+
+    :param StorageAddonBase addon: Node settings of the addon to crawl
+    :param User user: User whose credentials are used for WaterButler
+    :param str cookie: Optional cookie to pass to WaterButler
+    :param str version: Optional version, applied to the starting folder
+    :param int workers: Maximum number of concurrent metadata requests
+    """
+
+    def __init__(self, addon, user, cookie=None, version=None, workers=None):
+        self.addon = addon
+        self.user = user
+        self.cookie = cookie
+        self.version = version
+        self.workers = workers or settings.WATERBUTLER_METADATA_WORKERS
+        self.limiter = get_rate_limiter(addon.config.short_name)
+
+    @staticmethod
+    def _needs_children(filenode):
+        return filenode.get('kind') != 'file' and 'size' not in filenode
+
+    def _fetch_children(self, item):
+        folder, url, version = item
+        try:
+            return fetch_metadata(url, self.limiter)
+        except HTTPError as error:
+            return self.addon._handle_child_metadata_error(error, folder, version=version)
+
+    def crawl(self, filenode):
+        """Fill in ``children`` for ``filenode`` and every folder below it.
+
+        :param dict filenode: Folder (or file) metadata to start from
+        :return: ``filenode``
+        """
+        if not self._needs_children(filenode):
+            return filenode
+
+        # URLs are built here rather than in the workers, since building them
+        # may touch the database (e.g. creating the user's cookie)
+        frontier = [(filenode, self.addon._get_fileobj_child_metadata_url(
+            filenode, self.user, cookie=self.cookie, version=self.version
+        ), self.version)]
+        pool = ThreadPool(self.workers)
+        try:
+            while frontier:
+                results = pool.map(self._fetch_children, frontier)
+                next_frontier = []
+                for (folder, _, _), children in zip(frontier, results):
+                    folder['children'] = children
+                    next_frontier.extend(
+                        (child, self.addon._get_fileobj_child_metadata_url(child, self.user, cookie=self.cookie), None)
+                        for child in children
+                        if self._needs_children(child)
+                    )
+                frontier = next_frontier
+        finally:
+            pool.terminate()
+        return filenode
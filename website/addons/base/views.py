@@ -28,6 +28,7 @@ from framework.transactions.handlers import no_auto_transaction
 from website import mails
 from website import settings
 from website.addons.base import StorageAddonBase
+from website.addons.base import auth_cache
 from website.addons.base import exceptions
 from website.addons.base import signals as file_signals
 from website.files.models import FileNode, StoredFileNode, TrashedFileNode
@@ -220,24 +221,36 @@ def make_auth(user):
     return {}
 
 
+def _get_waterbutler_data(auth, node, provider_name, action, cas_resp):
+    """Check access and serialize the auth, credentials and settings that
+    WaterButler needs for ``action`` on ``provider_name``.
+    """
+    check_access(node, auth, action, cas_resp)
+
+    provider_settings = node.get_addon(provider_name)
+    if not provider_settings:
+        raise HTTPError(httplib.BAD_REQUEST)
+
+    try:
+        credentials = provider_settings.serialize_waterbutler_credentials()
+        waterbutler_settings = provider_settings.serialize_waterbutler_settings()
+    except exceptions.AddonError:
+        log_exception()
+        raise HTTPError(httplib.BAD_REQUEST)
+
+    return {
+        'auth': make_auth(auth.user),  # A waterbutler auth dict not an Auth object
+        'credentials': credentials,
+        'settings': waterbutler_settings,
+        'callback_url': node.api_url_for(
+            ('create_waterbutler_log' if not node.is_registration else 'registration_callbacks'),
+            _absolute=True,
+        ),
+    }
+
+
 @collect_auth
 def get_auth(auth, **kwargs):
-    cas_resp = None
-    if not auth.user:
-        # Central Authentication Server OAuth Bearer Token
-        authorization = request.headers.get('Authorization')
-        if authorization and authorization.startswith('Bearer '):
-            client = cas.get_client()
-            try:
-                access_token = cas.parse_auth_header(authorization)
-                cas_resp = client.profile(access_token)
-            except cas.CasError as err:
-                sentry.log_exception()
-                # NOTE: We assume that the request is an AJAX request
-                return json_renderer(err)
-            if cas_resp.authenticated:
-                auth.user = User.load(cas_resp.user)
-
     try:
         data = jwt.decode(
             jwe.decrypt(request.args.get('payload', '').encode('utf-8'), WATERBUTLER_JWE_KEY),
@@ -248,9 +261,6 @@ def get_auth(auth, **kwargs):
     except (jwt.InvalidTokenError, KeyError):
         raise HTTPError(httplib.FORBIDDEN)
 
-    if not auth.user:
-        auth.user = User.from_cookie(data.get('cookie', ''))
-
     try:
         action = data['action']
         node_id = data['nid']
@@ -258,34 +268,45 @@ def get_auth(auth, **kwargs):
     except KeyError:
         raise HTTPError(httplib.BAD_REQUEST)
 
-    node = Node.load(node_id)
-    if not node:
-        raise HTTPError(httplib.NOT_FOUND)
+    authorization = request.headers.get('Authorization')
+    if auth.user:
+        identity = ('user', auth.user._id)
+    elif authorization and authorization.startswith('Bearer '):
+        identity = ('bearer', authorization)
+    else:
+        identity = ('cookie', data.get('cookie', ''))
+    cache_key = auth_cache.make_key(identity, node_id, provider_name, action, auth.private_key)
+    waterbutler_data = auth_cache.lookup(cache_key)
+
+    if waterbutler_data is None:
+        cas_resp = None
+        if not auth.user and identity[0] == 'bearer':
+            # Central Authentication Server OAuth Bearer Token
+            client = cas.get_client()
+            try:
+                access_token = cas.parse_auth_header(authorization)
+                cas_resp = client.profile(access_token)
+            except cas.CasError as err:
+                sentry.log_exception()
+                # NOTE: We assume that the request is an AJAX request
+                return json_renderer(err)
+            if cas_resp.authenticated:
+                auth.user = User.load(cas_resp.user)
 
-    check_access(node, auth, action, cas_resp)
+        if not auth.user:
+            auth.user = User.from_cookie(data.get('cookie', ''))
 
-    provider_settings = node.get_addon(provider_name)
-    if not provider_settings:
-        raise HTTPError(httplib.BAD_REQUEST)
+        node = Node.load(node_id)
+        if not node:
+            raise HTTPError(httplib.NOT_FOUND)
 
-    try:
-        credentials = provider_settings.serialize_waterbutler_credentials()
-        waterbutler_settings = provider_settings.serialize_waterbutler_settings()
-    except exceptions.AddonError:
-        log_exception()
-        raise HTTPError(httplib.BAD_REQUEST)
+        generation = auth_cache.generation(node, auth.user)
+        waterbutler_data = _get_waterbutler_data(auth, node, provider_name, action, cas_resp)
+        auth_cache.store(cache_key, node, waterbutler_data, generation=generation, user=auth.user)
 
     return {'payload': jwe.encrypt(jwt.encode({
         'exp': datetime.datetime.utcnow() + datetime.timedelta(seconds=settings.WATERBUTLER_JWT_EXPIRATION),
-        'data': {
-            'auth': make_auth(auth.user),  # A waterbutler auth dict not an Auth object
-            'credentials': credentials,
-            'settings': waterbutler_settings,
-            'callback_url': node.api_url_for(
-                ('create_waterbutler_log' if not node.is_registration else 'registration_callbacks'),
-                _absolute=True,
-            ),
-        }
+        'data': waterbutler_data,
     }, settings.WATERBUTLER_JWT_SECRET, algorithm=settings.WATERBUTLER_JWT_ALGORITHM), WATERBUTLER_JWE_KEY)}
 
 
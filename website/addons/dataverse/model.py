@@ -4,7 +4,6 @@ import httplib as http
 from modularodm import fields
 
 from framework.auth.decorators import Auth
-from framework.exceptions import HTTPError
 
 from website.addons.base import (
     AddonOAuthNodeSettingsBase, AddonOAuthUserSettingsBase, exceptions,
@@ -106,14 +105,11 @@ class AddonDataverseNodeSettings(StorageAddonBase, AddonOAuthNodeSettingsBase):
                 auth=auth,
             )
 
-    def _get_fileobj_child_metadata(self, filenode, user, cookie=None, version=None):
-        try:
-            return super(AddonDataverseNodeSettings, self)._get_fileobj_child_metadata(filenode, user, cookie=cookie, version=version)
-        except HTTPError as e:
-            # The Dataverse API returns a 404 if the dataset has no published files
-            if e.code == http.NOT_FOUND and version == 'latest-published':
-                return []
-            raise
+    def _handle_child_metadata_error(self, error, filenode, version=None):
+        # The Dataverse API returns a 404 if the dataset has no published files
+        if error.code == http.NOT_FOUND and version == 'latest-published':
+            return []
+        raise error
 
     def clear_settings(self):
         """Clear selected Dataverse and dataset"""
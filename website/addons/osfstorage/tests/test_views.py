@@ -75,6 +75,22 @@ class TestGetMetadataHook(HookTestCase):
             record.serialize()
         )
 
+    def test_children_metadata_download_counts(self):
+        parent = self.node_settings.get_root().append_folder('parent')
+        files = [parent.append_file('file{}'.format(i)) for i in range(3)]
+        parent.append_folder('folder')
+        self.db['pagecounters'].update(
+            {'_id': 'download:{}:{}'.format(self.project._id, files[1]._id)},
+            {'$inc': {'total': 4, 'unique': 2}}, True, False
+        )
+        res = self.send_hook(
+            'osfstorage_get_children',
+            {'fid': parent._id},
+            {},
+        )
+        downloads = {child['name']: child.get('downloads') for child in res.json}
+        assert_equal(downloads, {'file0': 0, 'file1': 4, 'file2': 0, 'folder': None})
+
     def test_osf_storage_root(self):
         auth = Auth(self.project.creator)
         result = views.osf_storage_root(self.node_settings, auth=auth)
@@ -453,6 +469,15 @@ class TestGetRevisions(StorageTestCase):
         assert_equal(res.json['revisions'][0]['index'], 15)
         assert_equal(res.json['revisions'][-1]['index'], 1)
 
+    def test_get_revisions_download_counts(self):
+        self.db['pagecounters'].update(
+            {'_id': 'download:{}:{}:{}'.format(self.project._id, self.record._id, 0)},
+            {'$inc': {'total': 3, 'unique': 1}}, True, False
+        )
+        res = self.get_revisions()
+        assert_equal(res.json['revisions'][-1]['downloads'], 3)
+        assert_equal(res.json['revisions'][0]['downloads'], 0)
+
     def test_get_revisions_path_not_found(self):
         res = self.get_revisions(fid='missing', expect_errors=True)
         assert_equal(res.status_code, 404)
@@ -27,13 +27,14 @@ def update_analytics(node, file_id, version_idx):
     update_counter(u'download:{0}:{1}:{2}'.format(node._id, file_id, version_idx))
 
 
-def serialize_revision(node, record, version, index, anon=False):
+def serialize_revision(node, record, version, index, anon=False, downloads=None):
     """Serialize revision for use in revisions table.
 
     :param Node node: Root node
     :param FileRecord record: Root file record
     :param FileVersion version: The version to serialize
     :param int index: One-based index of version
+    :param int downloads: Download count of the version, if already known
     """
 
     if anon:
@@ -48,7 +49,7 @@ def serialize_revision(node, record, version, index, anon=False):
         'user': user,
         'index': index + 1,
         'date': version.date_created.isoformat(),
-        'downloads': record.get_download_count(version=index),
+        'downloads': record.get_download_count(version=index) if downloads is None else downloads,
         'md5': version.metadata.get('md5'),
         'sha256': version.metadata.get('sha256'),
     }
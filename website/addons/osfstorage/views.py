@@ -22,6 +22,7 @@ from website.project.model import has_anonymous_link
 
 from website.files import models
 from website.files import exceptions
+from website.files.models.base import get_download_counts
 from website.addons.osfstorage import utils
 from website.addons.osfstorage import decorators
 from website.addons.osfstorage import settings as osf_storage_settings
@@ -78,10 +79,18 @@ def osfstorage_update_metadata(node_addon, payload, **kwargs):
 def osfstorage_get_revisions(file_node, node_addon, payload, **kwargs):
     is_anon = has_anonymous_link(node_addon.owner, Auth(private_key=request.args.get('view_only')))
 
+    num_versions = len(file_node.versions)
+    downloads = file_node.get_download_counts(range(num_versions))
+
     # Return revisions in descending order
     return {
         'revisions': [
-            utils.serialize_revision(node_addon.owner, file_node, version, index=len(file_node.versions) - idx - 1, anon=is_anon)
+            utils.serialize_revision(
+                node_addon.owner, file_node, version,
+                index=num_versions - idx - 1,
+                anon=is_anon,
+                downloads=downloads[num_versions - idx - 1],
+            )
             for idx, version in enumerate(reversed(file_node.versions))
         ]
     }
@@ -130,9 +139,11 @@ def osfstorage_get_metadata(file_node, **kwargs):
 @must_be_signed
 @decorators.autoload_filenode(must_be='folder')
 def osfstorage_get_children(file_node, **kwargs):
+    children = list(file_node.children)
+    downloads = get_download_counts(child for child in children if child.is_file)
     return [
-        child.serialize()
-        for child in file_node.children
+        child.serialize(downloads=downloads[child._id]) if child.is_file else child.serialize()
+        for child in children
     ]
 
 
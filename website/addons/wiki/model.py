@@ -2,6 +2,7 @@
 
 import datetime
 import functools
+import hashlib
 import logging
 import urllib
 
@@ -11,17 +12,18 @@ from website.models import NodeLog
 
 import markdown
 from markdown.extensions import codehilite, fenced_code, wikilinks
-from modularodm import fields
+from modularodm import fields, Q
 
+from framework.cache import LRUCache
 from framework.mongo.utils import to_mongo_key
 from framework.forms.utils import sanitize
-from framework.guid.model import GuidStoredObject
+from framework.guid.model import Guid, GuidStoredObject
 from framework.mongo import utils as mongo_utils
 
 from website import settings
 from website.addons.base import AddonNodeSettingsBase
 from website.addons.wiki import utils as wiki_utils
-from website.addons.wiki.settings import WIKI_CHANGE_DATE
+from website.addons.wiki.settings import WIKI_CHANGE_DATE, WIKI_CLONE_BATCH_SIZE, WIKI_RENDER_CACHE_SIZE
 from website.project.commentable import Commentable
 from website.project.model import Node
 from website.project.signals import write_permissions_revoked
@@ -38,6 +40,13 @@ from .exceptions import (
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever rendering changes the output for the same content, IE new
+# markdown extensions or a different WIKI_WHITELIST
+RENDERER_VERSION = 1
+
+# Rendered HTML and text of wiki versions, which never change once saved
+render_cache = LRUCache(WIKI_RENDER_CACHE_SIZE)
+
 
 class AddonWikiNodeSettings(AddonNodeSettingsBase):
 
@@ -233,8 +242,25 @@ class NodeWikiPage(GuidStoredObject, Commentable):
     def get_absolute_url(self):
         return self.absolute_api_v2_url
 
+    def _render_cache_key(self, node, kind):
+        content = self.content or ''
+        if isinstance(content, unicode):
+            content = content.encode('utf-8')
+        return (self._id, node._id, hashlib.sha1(content).hexdigest(), RENDERER_VERSION, kind)
+
+    def _cached_render(self, node, kind, render):
+        key = self._render_cache_key(node, kind)
+        rendered = render_cache.get(key)
+        if rendered is None:
+            rendered = render()
+            render_cache.set(key, rendered)
+        return rendered
+
     def html(self, node):
         """The cleaned HTML of the page"""
+        return self._cached_render(node, 'html', functools.partial(self._render_html, node))
+
+    def _render_html(self, node):
         sanitized_content = render_content(self.content, node=node)
         try:
             return linkify(
@@ -248,7 +274,10 @@ class NodeWikiPage(GuidStoredObject, Commentable):
     def raw_text(self, node):
         """ The raw text of the page, suitable for using in a test search"""
 
-        return sanitize(self.html(node), tags=[], strip=True)
+        return self._cached_render(
+            node, 'text',
+            lambda: sanitize(self.html(node), tags=[], strip=True)
+        )
 
     def get_draft(self, node):
         """
@@ -319,23 +348,47 @@ class NodeWikiPage(GuidStoredObject, Commentable):
     @classmethod
     def clone_wiki_versions(cls, node, copy, user, save=True):
         """Clone wiki pages for a forked or registered project.
+        All versions are loaded with one query and the clones are inserted
+        in batches of WIKI_CLONE_BATCH_SIZE, with their GUIDs allocated up
+        front.
         :param node: The Node that was forked/registered
         :param copy: The fork/registration
         :param user: The user who forked or registered the node
         :param save: Whether to save the fork/registration
         :return: copy
         """
-        copy.wiki_pages_versions = {}
+        copy.wiki_pages_versions = {key: [] for key in node.wiki_pages_versions}
         copy.wiki_pages_current = {}
 
-        for key in node.wiki_pages_versions:
-            copy.wiki_pages_versions[key] = []
-            for wiki_id in node.wiki_pages_versions[key]:
-                node_wiki = NodeWikiPage.load(wiki_id)
-                cloned_wiki = node_wiki.clone_wiki(copy._id)
-                copy.wiki_pages_versions[key].append(cloned_wiki._id)
-                if node_wiki.is_current:
-                    copy.wiki_pages_current[key] = cloned_wiki._id
+        versions = [
+            (key, wiki_id)
+            for key, wiki_ids in node.wiki_pages_versions.items()
+            for wiki_id in wiki_ids
+        ]
+        if versions:
+            originals = {
+                page._id: page
+                for page in cls.find(Q('_id', 'in', [wiki_id for _, wiki_id in versions]))
+            }
+            clone_ids = Guid.allocate(cls._name, len(versions), min_length=cls.__guid_min_length__)
+
+            clones = []
+            for (key, wiki_id), clone_id in zip(versions, clone_ids):
+                node_wiki = originals[wiki_id]
+                clone = node_wiki.clone()
+                clone._id = clone_id
+                clone.node = copy
+                clone.user = node_wiki.user
+                clones.append(clone.to_storage())
+                copy.wiki_pages_versions[key].append(clone_id)
+                if node.wiki_pages_current.get(key) == wiki_id:
+                    copy.wiki_pages_current[key] = clone_id
+
+            store = cls._storage[0].store
+            for start in range(0, len(clones), WIKI_CLONE_BATCH_SIZE):
+                store.insert(clones[start:start + WIKI_CLONE_BATCH_SIZE])
+            copy.update_search()
+
         if save:
             copy.save()
         return copy
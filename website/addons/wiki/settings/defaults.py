@@ -11,3 +11,9 @@ SHAREJS_DB_URL = 'mongodb://{}:{}/{}'.format(settings.DB_HOST, settings.DB_PORT,
 
 # TODO: Change to release date for wiki change
 WIKI_CHANGE_DATE = datetime.datetime.utcfromtimestamp(1423760098)
+
+# Maximum number of rendered wiki pages kept in memory per process
+WIKI_RENDER_CACHE_SIZE = 1000
+
+# Number of cloned wiki versions inserted per write when forking or registering
+WIKI_CLONE_BATCH_SIZE = 500
@@ -27,6 +27,7 @@ from website.addons.wiki.utils import (
 )
 from website.addons.wiki.tests.config import EXAMPLE_DOCS, EXAMPLE_OPS
 from framework.auth import Auth
+from framework.guid.model import Guid
 from framework.mongo.utils import to_mongo_key
 
 # forward slashes are not allowed, typically they would be replaced with spaces
@@ -71,6 +72,54 @@ class TestNodeWikiPageModel(OsfTestCase):
         # node.wiki_pages_current and node.wiki_pages_versions
         assert_false(ver.is_current)
 
+    def test_clone_wiki_versions(self):
+        project = ProjectFactory()
+        auth = Auth(project.creator)
+        project.update_node_wiki('home', 'first', auth)
+        project.update_node_wiki('home', 'second', auth)
+        project.update_node_wiki('other', 'third', auth)
+        copy = ProjectFactory(creator=project.creator)
+
+        with mock.patch('website.addons.wiki.model.WIKI_CLONE_BATCH_SIZE', 2):
+            NodeWikiPage.clone_wiki_versions(project, copy, project.creator)
+
+        assert_equal(set(copy.wiki_pages_versions), {'home', 'other'})
+        home_versions = [NodeWikiPage.load(wiki_id) for wiki_id in copy.wiki_pages_versions['home']]
+        assert_equal([page.content for page in home_versions], ['first', 'second'])
+        for page in home_versions:
+            assert_equal(page.node, copy)
+            assert_not_in(page._id, project.wiki_pages_versions['home'])
+            assert_is_not_none(Guid.load(page._id))
+        assert_equal(copy.wiki_pages_current['home'], home_versions[-1]._id)
+        assert_equal(NodeWikiPage.load(copy.wiki_pages_current['other']).content, 'third')
+
+    @mock.patch('website.addons.wiki.model.render_content', side_effect=render_content)
+    def test_html_is_cached_per_content(self, mock_render):
+        node = NodeFactory()
+        page = NodeWikiPage(page_name='foo', node=node, content='# Heading\n\n[[bar]]')
+        page.save()
+
+        html = page.html(node)
+        assert_in('<h1>Heading</h1>', html)
+        assert_equal(page.html(node), html)
+        page.raw_text(node)
+        page.raw_text(node)
+        assert_equal(mock_render.call_count, 1)
+
+        page.content = u'*Ünïcode*'
+        assert_in(u'<em>Ünïcode</em>', page.html(node))
+        assert_equal(mock_render.call_count, 2)
+
+    @mock.patch('website.addons.wiki.model.render_content', side_effect=render_content)
+    def test_html_cache_is_keyed_by_node(self, mock_render):
+        node, other_node = NodeFactory(), NodeFactory()
+        page = NodeWikiPage(page_name='foo', node=node, content='[[bar]]')
+        page.save()
+
+        assert_in(node._id, page.html(node))
+        assert_in(other_node._id, page.html(other_node))
+        assert_equal(mock_render.call_count, 2)
+
 class TestWikiViews(OsfTestCase):
 
     def setUp(self):
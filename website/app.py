@@ -19,6 +19,8 @@ from framework.postcommit_tasks import handlers as postcommit_handlers
 from framework.sentry import sentry
 from framework.celery_tasks import handlers as celery_task_handlers
 from framework.transactions import handlers as transaction_handlers
+from framework.auth import permission_cache
+from framework.mongo import unit_of_work
 from modularodm import storage
 from website.addons.base import init_addon
 from website.project.licenses import ensure_licenses
@@ -57,6 +59,10 @@ def attach_handlers(app, settings):
     add_handlers(app, celery_task_handlers.handlers)
     add_handlers(app, transaction_handlers.handlers)
     add_handlers(app, postcommit_handlers.handlers)
+    add_handlers(app, permission_cache.handlers)
+    # Flushed first, so that the side effects of the request's saves run
+    # before its transaction is committed and its postcommit tasks run
+    add_handlers(app, unit_of_work.handlers)
 
     # Attach handler for checking view-only link keys.
     # NOTE: This must be attached AFTER the TokuMX to avoid calling
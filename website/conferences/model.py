@@ -1,11 +1,16 @@
 # -*- coding: utf-8 -*-
 
 import bson
+import pymongo
 from modularodm import fields, Q
 from modularodm.exceptions import ModularOdmException
 
 from framework.mongo import StoredObject
+from framework.mongo.utils import unique_on
+from website.addons.base import signals as file_signals
 from website.conferences.exceptions import ConferenceError
+from website.project import signals as project_signals
+from website.util import web_url_for
 
 DEFAULT_FIELD_NAMES = {
     'submission1': 'poster',
@@ -62,6 +67,167 @@ class Conference(StoredObject):
         except ModularOdmException:
             raise ConferenceError('Endpoint {0} not found'.format(endpoint))
 
+    def save(self, *args, **kwargs):
+        first_save = not self._is_loaded
+        saved_fields = super(Conference, self).save(*args, **kwargs)
+        if first_save or {'name', 'field_names'}.intersection(saved_fields):
+            # Index nodes tagged before the conference was created, or show its
+            # new name and categories on its submissions
+            ConferenceSubmission.rebuild(self)
+        return saved_fields
+
+    def update_num_submissions(self):
+        num_submissions = ConferenceSubmission.find(Q('conference', 'eq', self.endpoint)).count()
+        if num_submissions != self.num_submissions:
+            self.num_submissions = num_submissions
+            self.save()
+
+
+# Node fields that decide whether a node is a submission, or what is shown for it
+SUBMISSION_FIELDS = {
+    'title',
+    'creator',
+    'visible_contributor_ids',
+    'tags',
+    'system_tags',
+    'is_public',
+    'is_deleted',
+}
+
+
+@unique_on(['conference', 'node'])
+class ConferenceSubmission(StoredObject):
+    """A public node tagged with a conference's endpoint, with the data shown
+    for it on the meetings pages. Kept up to date as nodes and their files
+    change; rebuild with ``scripts/rebuild_conference_submissions.py``.
+    """
+
+    __indices__ = [
+        {
+            'unique': False,
+            'key_or_list': [
+                ('conference', pymongo.ASCENDING),
+                ('date_created', pymongo.DESCENDING),
+            ]
+        },
+        {
+            'unique': False,
+            'key_or_list': [
+                ('date_created', pymongo.DESCENDING),
+            ]
+        },
+        {
+            'unique': False,
+            'key_or_list': [
+                ('node', pymongo.ASCENDING),
+            ]
+        },
+    ]
+
+    _id = fields.StringField(primary=True, default=lambda: str(bson.ObjectId()))
+    conference = fields.ForeignField('conference', required=True)
+    node = fields.ForeignField('node', required=True)
+    # Date the node was created, which submissions are listed by
+    date_created = fields.DateTimeField()
+    # Row for the submission grids, apart from its position and download count
+    data = fields.DictionaryField()
+    # Page counter of the file offered for download, if any
+    download_page = fields.StringField(default=None)
+
+    def refresh(self):
+        """Update the data shown for the submission from its node."""
+        # Avoid circular import
+        from website.files.models import StoredFileNode
+
+        node, conf = self.node, self.conference
+        records = list(StoredFileNode.find(
+            Q('node', 'eq', node) &
+            Q('is_file', 'eq', True)
+        ).limit(1))
+        record = records[0].wrapped() if records else None
+        author = node.visible_contributors[0]
+
+        self.date_created = node.date_created
+        self.download_page = record._download_count_page() if record else None
+        self.data = {
+            'title': node.title,
+            'nodeUrl': node.url,
+            'author': author.family_name if author.family_name else author.fullname,
+            'authorUrl': node.creator.url,
+            'category': conf.field_names['submission1'] if conf.field_names['submission1'] in node.system_tags else conf.field_names['submission2'],
+            'downloadUrl': node.web_url_for(
+                'addon_view_or_download_file',
+                path=record.path.strip('/'),
+                provider='osfstorage',
+                action='download',
+                _absolute=True,
+            ) if record else '',
+            'dateCreated': node.date_created.isoformat(),
+            'confName': conf.name,
+            'confUrl': web_url_for('conference_results', meeting=conf.endpoint),
+            'tags': ' '.join(tag._id for tag in node.tags),
+        }
+
+    @classmethod
+    def rebuild(cls, conference):
+        """Recreate the submissions of a conference from scratch."""
+        # Avoid circular import
+        from website.project.model import Node, Tag
+
+        cls.remove(Q('conference', 'eq', conference.endpoint))
+        tags = Tag.find(Q('lower', 'eq', conference.endpoint.lower())).get_keys()
+        nodes = Node.find(
+            Q('tags', 'in', tags) &
+            Q('is_public', 'eq', True) &
+            Q('is_deleted', 'ne', True)
+        )
+        for node in nodes:
+            submission = cls(conference=conference, node=node)
+            submission.refresh()
+            submission.save()
+        conference.update_num_submissions()
+
+    @classmethod
+    def update_node(cls, node):
+        """Add, refresh or remove the submissions of a node to match its
+        tags, privacy and contents.
+        """
+        existing = {
+            submission.to_storage()['conference']: submission
+            for submission in cls.find(Q('node', 'eq', node._id))
+        }
+        endpoints = set()
+        tags = set(tag.lower() for tag in node.to_storage()['tags'])
+        if tags and node.is_public and not node.is_deleted:
+            endpoints = {
+                conf['endpoint']
+                for conf in Conference._storage[0].store.find({}, {'endpoint': True})
+                if conf['endpoint'].lower() in tags
+            }
+
+        changed = set(existing.keys()) ^ endpoints
+        for endpoint in set(existing.keys()) - endpoints:
+            cls.remove_one(existing[endpoint])
+        for endpoint in endpoints:
+            submission = existing.get(endpoint) or cls(conference=Conference.load(endpoint), node=node)
+            submission.refresh()
+            submission.save()
+        for endpoint in changed:
+            Conference.load(endpoint).update_num_submissions()
+
+
+@project_signals.node_updated.connect
+def update_submissions_on_node_updated(node, saved_fields):
+    if SUBMISSION_FIELDS.intersection(saved_fields):
+        ConferenceSubmission.update_node(node)
+
+
+@file_signals.file_updated.connect
+def update_submissions_on_file_updated(self, node, event_type, payload, user=None):
+    for submission in ConferenceSubmission.find(Q('node', 'eq', node._id)):
+        submission.refresh()
+        submission.save()
+
 
 class MailRecord(StoredObject):
     _id = fields.StringField(primary=True, default=lambda: str(bson.ObjectId()))
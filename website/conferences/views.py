@@ -4,9 +4,11 @@ import httplib
 import logging
 from datetime import datetime
 
+from flask import request
 from modularodm import Q
 from modularodm.exceptions import ModularOdmException
 
+from framework.analytics import get_basic_counters_bulk
 from framework.auth import get_or_create_user
 from framework.exceptions import HTTPError
 from framework.flask import redirect
@@ -14,15 +16,13 @@ from framework.transactions.context import TokuTransaction
 from framework.transactions.handlers import no_auto_transaction
 
 from website import settings
-from website.models import Node, Tag
 from website.util import web_url_for
 from website.mails import send_mail
-from website.files.models import StoredFileNode
 from website.mails import CONFERENCE_SUBMITTED, CONFERENCE_INACTIVE, CONFERENCE_FAILED
 
 from website.conferences import utils, signals
 from website.conferences.message import ConferenceMessage, ConferenceError
-from website.conferences.model import Conference
+from website.conferences.model import Conference, ConferenceSubmission
 
 
 logger = logging.getLogger(__name__)
@@ -138,45 +138,36 @@ def add_poster_by_email(conference, message):
         signals.osf4m_user_created.send(user, conference=conference, node=node)
 
 
-def _render_conference_node(node, idx, conf):
-    try:
-        record = next(
-            x for x in
-            StoredFileNode.find(
-                Q('node', 'eq', node) &
-                Q('is_file', 'eq', True)
-            ).limit(1)
-        ).wrapped()
-        download_count = record.get_download_count()
-
-        download_url = node.web_url_for(
-            'addon_view_or_download_file',
-            path=record.path.strip('/'),
-            provider='osfstorage',
-            action='download',
-            _absolute=True,
+def _paginate(query):
+    """Return the submissions of ``query`` on the page requested with the
+    ``page`` and ``size`` query parameters, or all of them if no page is
+    requested.
+    """
+    page = request.args.get('page', type=int)
+    if not page:
+        return 0, list(query)
+    size = request.args.get('size', settings.CONFERENCE_SUBMISSIONS_PAGE_SIZE, type=int)
+    size = max(1, min(size, settings.CONFERENCE_SUBMISSIONS_PAGE_SIZE))
+    offset = (max(page, 1) - 1) * size
+    return offset, list(query.offset(offset).limit(size))
+
+
+def _serialize_submissions(submissions, offset=0):
+    """Serialize submissions for the submission grids, counting the downloads
+    of all of them with one query.
+    """
+    counters = get_basic_counters_bulk([
+        submission.download_page for submission in submissions
+        if submission.download_page
+    ])
+    return [
+        dict(
+            submission.data,
+            id=idx,
+            download=(counters[submission.download_page][1] or 0) if submission.download_page else 0,
         )
-    except StopIteration:
-        download_url = ''
-        download_count = 0
-
-    author = node.visible_contributors[0]
-    tags = [tag._id for tag in node.tags]
-
-    return {
-        'id': idx,
-        'title': node.title,
-        'nodeUrl': node.url,
-        'author': author.family_name if author.family_name else author.fullname,
-        'authorUrl': node.creator.url,
-        'category': conf.field_names['submission1'] if conf.field_names['submission1'] in node.system_tags else conf.field_names['submission2'],
-        'download': download_count,
-        'downloadUrl': download_url,
-        'dateCreated': node.date_created.isoformat(),
-        'confName': conf.name,
-        'confUrl': web_url_for('conference_results', meeting=conf.endpoint),
-        'tags': ' '.join(tags)
-    }
+        for idx, submission in enumerate(submissions, offset)
+    ]
 
 
 def conference_data(meeting):
@@ -185,17 +176,10 @@ def conference_data(meeting):
     except ModularOdmException:
         raise HTTPError(httplib.NOT_FOUND)
 
-    nodes = Node.find(
-        Q('tags', 'iexact', meeting) &
-        Q('is_public', 'eq', True) &
-        Q('is_deleted', 'eq', False)
+    offset, submissions = _paginate(
+        ConferenceSubmission.find(Q('conference', 'eq', conf.endpoint)).sort('-date_created')
     )
-
-    ret = [
-        _render_conference_node(each, idx, conf)
-        for idx, each in enumerate(nodes)
-    ]
-    return ret
+    return _serialize_submissions(submissions, offset)
 
 
 def redirect_to_meetings(**kwargs):
@@ -223,42 +207,17 @@ def conference_results(meeting):
     }
 
 def conference_submissions(**kwargs):
-    """Return data for all OSF4M submissions.
+    """Return data for all OSF4M submissions, newest first."""
+    offset, submissions = _paginate(ConferenceSubmission.find().sort('-date_created'))
+    return {
+        'submissions': _serialize_submissions(submissions, offset),
+        'total': ConferenceSubmission.find().count(),
+    }
 
-    The total number of submissions for each meeting is calculated and cached
-    in the Conference.num_submissions field.
-    """
-    submissions = []
-    #  TODO: Revisit this loop, there has to be a way to optimize it
-    for conf in Conference.find():
-        # For efficiency, we filter by tag first, then node
-        # instead of doing a single Node query
-        projects = set()
-
-        tags = Tag.find(Q('lower', 'eq', conf.endpoint.lower())).get_keys()
-        nodes = Node.find(
-            Q('tags', 'in', tags) &
-            Q('is_public', 'eq', True) &
-            Q('is_deleted', 'ne', True)
-        )
-        projects.update(list(nodes))
-
-        for idx, node in enumerate(projects):
-            submissions.append(_render_conference_node(node, idx, conf))
-        num_submissions = len(projects)
-        # Cache the number of submissions
-        conf.num_submissions = num_submissions
-        conf.save()
-        if num_submissions < settings.CONFERENCE_MIN_COUNT:
-            continue
-    submissions.sort(key=lambda submission: submission['dateCreated'], reverse=True)
-    return {'submissions': submissions}
 
 def conference_view(**kwargs):
     meetings = []
-    for conf in Conference.find():
-        if conf.num_submissions < settings.CONFERENCE_MIN_COUNT:
-            continue
+    for conf in Conference.find(Q('num_submissions', 'gte', settings.CONFERENCE_MIN_COUNT)):
         meetings.append({
             'name': conf.name,
             'location': conf.location,
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""Snapshot of last week's most viewed public projects and registrations.
+
+Asking Piwik for the most viewed nodes is slow, and fails while Piwik is
+down, so the discovery page never asks it directly. A Celery task refreshes
+the snapshot on a schedule and whenever a page finds it older than
+``settings.DISCOVERY_SNAPSHOT_MAX_AGE``; until the refresh finishes, pages
+keep serving the stale snapshot. Only one refresh runs at a time.
+"""
+import datetime
+import logging
+
+from modularodm import Q
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+from framework.analytics.piwik import PiwikClient
+from framework.mongo import database
+
+from website import settings
+from website.project import Node
+
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_ID = 'popular'
+# Number of nodes shown in each popular list
+POPULAR_COUNT = 10
+
+
+def _collection():
+    return database['discoverysnapshot']
+
+
+def fetch_popular_values():
+    """Ask Piwik for last week's most viewed nodes.
+
+    :return: list of CustomVariableValue, most viewed first
+    """
+    target_date = datetime.date.today() - datetime.timedelta(weeks=1)
+    client = PiwikClient(
+        url=settings.PIWIK_HOST,
+        auth_token=settings.PIWIK_ADMIN_TOKEN,
+        site_id=settings.PIWIK_SITE_ID,
+        period='week',
+        date=target_date.strftime('%Y-%m-%d'),
+        timeout=settings.DISCOVERY_SNAPSHOT_PIWIK_TIMEOUT,
+    )
+    return [
+        x for x in client.custom_variables if x.label == 'Project ID'
+    ][0].values
+
+
+def _is_popular_project(node):
+    return node.is_public and not node.is_registration and not node.is_deleted
+
+
+def _is_popular_registration(node):
+    return node.is_public and node.is_registration and not node.is_deleted and not node.is_retracted
+
+
+def claim_refresh():
+    """Mark a refresh as started, unless another one started less than
+    ``settings.DISCOVERY_SNAPSHOT_REFRESH_TIMEOUT`` seconds ago.
+
+    :return: Whether the caller should refresh the snapshot
+    """
+    now = datetime.datetime.utcnow()
+    started_before = now - datetime.timedelta(seconds=settings.DISCOVERY_SNAPSHOT_REFRESH_TIMEOUT)
+    try:
+        _collection().find_and_modify(
+            query={
+                '_id': SNAPSHOT_ID,
+                '$or': [
+                    {'refresh_started': None},
+                    {'refresh_started': {'$lt': started_before}},
+                ],
+            },
+            update={'$set': {'refresh_started': now}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # The snapshot exists, but another refresh is running
+        return False
+    except OperationFailure as error:
+        # Requests claim the refresh inside their transaction, where a
+        # concurrent claim fails as a write conflict
+        logger.info('Not refreshing the discovery snapshot: {}'.format(error))
+        return False
+    return True
+
+
+def refresh_snapshot():
+    """Fetch the most viewed nodes from Piwik and store the public ones.
+
+    A failed refresh leaves the previous snapshot in place; the next one is
+    attempted once the refresh timeout has passed.
+    """
+    try:
+        values = fetch_popular_values()
+    except Exception as error:
+        logger.exception(error)
+        return None
+
+    node_ids = [value.value for value in values]
+    nodes = {node._id: node for node in Node.find(Q('_id', 'in', node_ids))}
+    popular_projects, popular_registrations = [], []
+    for node_id in node_ids:
+        node = nodes.get(node_id)
+        if node is None:
+            continue
+        if _is_popular_project(node):
+            if len(popular_projects) < POPULAR_COUNT:
+                popular_projects.append(node_id)
+        elif _is_popular_registration(node):
+            if len(popular_registrations) < POPULAR_COUNT:
+                popular_registrations.append(node_id)
+        if len(popular_projects) >= POPULAR_COUNT and len(popular_registrations) >= POPULAR_COUNT:
+            break
+
+    shown = set(popular_projects + popular_registrations)
+    snapshot = {
+        'popular_public_projects': popular_projects,
+        'popular_public_registrations': popular_registrations,
+        'hits': {
+            value.value: {
+                'hits': value.actions,
+                'visits': value.visits
+            } for value in values if value.value in shown
+        },
+        'date_refreshed': datetime.datetime.utcnow(),
+        'refresh_started': None,
+    }
+    _collection().update({'_id': SNAPSHOT_ID}, {'$set': snapshot}, upsert=True)
+    return snapshot
+
+
+def get_snapshot():
+    """Return the stored snapshot, or None if there is none yet, and schedule a
+    refresh if it is missing or older than ``settings.DISCOVERY_SNAPSHOT_MAX_AGE``.
+    """
+    snapshot = _collection().find_one({'_id': SNAPSHOT_ID})
+    refreshed = snapshot and snapshot.get('date_refreshed')
+    max_age = datetime.timedelta(seconds=settings.DISCOVERY_SNAPSHOT_MAX_AGE)
+    if settings.PIWIK_HOST and (not refreshed or refreshed < datetime.datetime.utcnow() - max_age):
+        if claim_refresh():
+            # Avoid circular import
+            from website.discovery import tasks
+            tasks.refresh_activity_snapshot(claimed=True)
+    return snapshot if refreshed else None
+
+
+def load_popular(snapshot):
+    """Load the nodes of a snapshot with one query, dropping any that are no
+    longer public.
+
+    :return: tuple of (popular projects, popular registrations, hits)
+    """
+    if not snapshot:
+        return [], [], {}
+    project_ids = snapshot['popular_public_projects']
+    registration_ids = snapshot['popular_public_registrations']
+    nodes = {node._id: node for node in Node.find(Q('_id', 'in', project_ids + registration_ids))}
+    return (
+        [nodes[node_id] for node_id in project_ids if node_id in nodes and _is_popular_project(nodes[node_id])],
+        [nodes[node_id] for node_id in registration_ids if node_id in nodes and _is_popular_registration(nodes[node_id])],
+        snapshot['hits'],
+    )
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from framework.celery_tasks import app as celery_app
+from framework.postcommit_tasks.handlers import run_postcommit
+
+from website import settings
+from website.discovery import snapshot
+
+
+@run_postcommit(once_per_request=True, celery=True)
+@celery_app.task(ignore_result=True)
+def refresh_activity_snapshot(claimed=False):
+    """Refresh the popular projects shown on the discovery page.
+
+    :param bool claimed: Whether the caller already claimed the refresh
+    """
+    if not settings.PIWIK_HOST:
+        return
+    if claimed or snapshot.claim_refresh():
+        snapshot.refresh_snapshot()
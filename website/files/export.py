@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Streaming export of a node's stored file tree.
+
+The tree is walked depth-first through the ``parent`` index of the
+StoredFileNode collection, one folder at a time. Each folder costs three
+queries (its children, their latest versions and their GUIDs) and only the
+children of the current folder and the IDs of folders still to visit are
+kept in memory, so exports of very large trees run in roughly constant
+memory.
+"""
+import json
+
+from framework.guid.model import Guid
+
+from website.files.models import FileVersion, StoredFileNode
+
+
+def _records(folder_id, docs):
+    files = [doc for doc in docs if doc['is_file']]
+    version_ids = [doc['versions'][-1] for doc in files if doc.get('versions')]
+    versions = {
+        version['_id']: version
+        for version in FileVersion._storage[0].store.find(
+            {'_id': {'$in': version_ids}},
+            {'identifier': True, 'size': True, 'metadata.md5': True, 'metadata.sha256': True, 'date_created': True},
+        )
+    } if version_ids else {}
+    guids = {
+        guid['referent'][0]: guid['_id']
+        for guid in Guid._storage[0].store.find(
+            {'referent': {'$in': [[doc['_id'], StoredFileNode._name] for doc in docs]}},
+            {'referent': True},
+        )
+    } if docs else {}
+
+    for doc in docs:
+        record = {
+            'id': doc['_id'],
+            'kind': 'file' if doc['is_file'] else 'folder',
+            'name': doc['name'],
+            'path': doc['materialized_path'],
+            'parent': folder_id,
+            'guid': guids.get(doc['_id']),
+        }
+        if doc['is_file']:
+            version = versions.get(doc['versions'][-1]) if doc.get('versions') else None
+            metadata = (version or {}).get('metadata', {})
+            record.update({
+                'size': version.get('size') if version else None,
+                'version': version['identifier'] if version else None,
+                'modified': version['date_created'].isoformat() if version and version.get('date_created') else None,
+                'hashes': {
+                    'md5': metadata.get('md5'),
+                    'sha256': metadata.get('sha256'),
+                },
+            })
+        yield record
+
+
+def iter_file_tree(root):
+    """Yield a record for every file and folder below ``root``, folders
+    before their contents and siblings ordered by name.
+
+    :param FileNode root: Folder to export, usually a provider's root folder
+    """
+    collection = StoredFileNode._storage[0].store
+    stack = [root._id]
+    while stack:
+        folder_id = stack.pop()
+        docs = list(collection.find(
+            {'parent': folder_id},
+            {'name': True, 'materialized_path': True, 'is_file': True, 'versions': True},
+        ).sort('name', 1))
+        for record in _records(folder_id, docs):
+            yield record
+        # Pushed in reverse, so the first subfolder is visited next
+        stack.extend(doc['_id'] for doc in reversed(docs) if not doc['is_file'])
+
+
+def iter_ndjson(root):
+    """Yield the records of :func:`iter_file_tree` as newline-delimited JSON."""
+    for record in iter_file_tree(root):
+        yield json.dumps(record) + '\n'
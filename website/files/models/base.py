@@ -6,7 +6,10 @@ import logging
 import pymongo
 import datetime
 import requests
+import threading
+import time
 import functools
+import collections
 
 from modularodm import fields, Q
 from modularodm.exceptions import NoResultsFound
@@ -15,8 +18,9 @@ from dateutil.parser import parse as parse_date
 from framework.guid.model import Guid
 from framework.mongo import StoredObject
 from framework.mongo.utils import unique_on
-from framework.analytics import get_basic_counters
+from framework.analytics import get_basic_counters, get_basic_counters_bulk
 
+from website import settings
 from website import util
 from website.files import utils
 from website.files import exceptions
@@ -36,6 +40,66 @@ __all__ = (
 PROVIDER_MAP = {}
 logger = logging.getLogger(__name__)
 
+class TouchCounts(object):
+    """Thread-safe per-process count of how File.touch served requests for
+    the latest version of a file: 'cache' (within the freshness window),
+    'not_modified' (etag revalidated) or 'waterbutler' (full metadata
+    request). A summary is logged and the counts reset every
+    ``settings.WATERBUTLER_METADATA_STATS_LOG_INTERVAL`` seconds.
+    """
+
+    KEYS = ('cache', 'not_modified', 'waterbutler')
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counts = collections.Counter()
+        self._since = clock()
+
+    def __getitem__(self, key):
+        return self._counts[key]
+
+    def record(self, key):
+        with self._lock:
+            self._counts[key] += 1
+        self.log_summary(settings.WATERBUTLER_METADATA_STATS_LOG_INTERVAL)
+
+    def summary(self):
+        """Return a dict of {how: count} since the counts were last reset."""
+        with self._lock:
+            return {key: self._counts[key] for key in self.KEYS}
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+            self._since = self._clock()
+
+    def log_summary(self, interval):
+        """Log and reset the counts if ``interval`` seconds passed since they
+        were last reset; an ``interval`` of 0 disables logging.
+        """
+        now = self._clock()
+        with self._lock:
+            if not interval or now - self._since < interval:
+                return
+            counts = {key: self._counts[key] for key in self.KEYS}
+            elapsed = now - self._since
+            self._counts.clear()
+            self._since = now
+        total = sum(counts.values())
+        logger.info(
+            'File.touch in the last {elapsed:.0f}s: {total} requests, {cache} served from cache ({hit_rate}), '
+            '{not_modified} revalidated, {waterbutler} fetched from WaterButler'.format(
+                elapsed=elapsed,
+                total=total,
+                hit_rate='{:.1f}%'.format(counts['cache'] * 100.0 / total) if total else '-',
+                **counts
+            )
+        )
+
+
+touch_counts = TouchCounts()
+
 
 class TrashedFileNode(StoredObject, Commentable):
     """The graveyard for all deleted FileNodes"""
@@ -183,6 +247,9 @@ class StoredFileNode(StoredObject, Commentable):
     # The raw output of the metadata request deduped by etag
     # Add regardless it can be pinned to a version or not
     history = fields.DictionaryField(list=True)
+    # The etag of the history entry last returned as the latest version,
+    # unset whenever a specific revision is touched afterwards
+    latest_etag = fields.StringField()
     # A concrete version of a FileNode, must have an identifier
     versions = fields.ForeignField('FileVersion', list=True)
 
@@ -617,17 +684,26 @@ class File(FileNode):
 
     def get_version(self, revision, required=False):
         """Find a version with identifier revision
+        Looks the identifier up among the ids of self.versions in one query
+        rather than loading every version.
         :returns: FileVersion or None
         :raises: VersionNotFoundError if required is True
         """
-        for version in reversed(self.versions):
-            if version.identifier == revision:
-                break
-        else:
-            if required:
-                raise exceptions.VersionNotFoundError(revision)
-            return None
-        return version
+        version_ids = self.to_storage()['versions']
+        if version_ids:
+            matches = {
+                version._id: version
+                for version in FileVersion.find(
+                    Q('_id', 'in', version_ids) &
+                    Q('identifier', 'eq', revision)
+                )
+            }
+            for version_id in reversed(version_ids):
+                if version_id in matches:
+                    return matches[version_id]
+        if required:
+            raise exceptions.VersionNotFoundError(revision)
+        return None
 
     def update_version_metadata(self, location, metadata):
         for version in reversed(self.versions):
@@ -636,12 +712,58 @@ class File(FileNode):
                 return
         raise exceptions.VersionNotFoundError(location)
 
+    def update(self, revision, data, user=None):
+        """Using revision and data update all data pretaining to self
+        :param str or None revision: The revision that data points to
+        :param dict data: Metadata recieved from waterbutler
+        :returns: FileVersion
+        """
+        self.name = data['name']
+        self.materialized_path = data['materialized']
+
+        version = FileVersion(identifier=revision)
+        version.update_metadata(data, save=False)
+
+        # Transform here so it can be sortted on later
+        if data['modified'] is not None and data['modified'] != '':
+            data['modified'] = parse_date(
+                data['modified'],
+                ignoretz=True,
+                default=datetime.datetime.utcnow()  # Just incase nothing can be parsed
+            )
+
+        # if revision is none then version is the latest version
+        # Dont save the latest information
+        if revision is not None:
+            version.save()
+            self.versions.append(version)
+
+        for entry in self.history:
+            if entry['etag'] == data['etag']:
+                break
+        else:
+            # Insert into history if there is no matching etag
+            utils.insort(self.history, data, lambda x: x['modified'])
+            self.history = utils.trim_history(self.history, settings.FILE_HISTORY_MAX_ENTRIES)
+
+        # Remember the entry served as the latest version, for touch
+        self.latest_etag = data['etag'] if revision is None else None
+
+        # Finally update last touched
+        self.last_touched = datetime.datetime.utcnow()
+
+        self.save()
+        return version
+
     def touch(self, auth_header, revision=None, **kwargs):
         """The bread and butter of File, collects metadata about self
         and creates versions and updates self when required.
         If revisions is None the created version is NOT and should NOT be saved
         as there is no identifing information to tell if it needs to be updated or not.
         Hits Waterbutler's metadata endpoint and saves the returned data.
+        If the latest version was fetched less than
+        settings.WATERBUTLER_METADATA_FRESHNESS seconds ago it is served from
+        history instead, and after that it is revalidated by etag.
         If a file cannot be rendered IE figshare private files a tuple of the FileVersion and
         renderable HTML will be returned.
             >>>isinstance(file_node.touch(), tuple) # This file cannot be rendered
@@ -656,14 +778,28 @@ class File(FileNode):
         if version is not None:
             return version
 
+        latest = self._get_latest_metadata() if revision is None else None
+        if latest is not None and self._is_fresh():
+            touch_counts.record('cache')
+            return self._build_latest_version(latest)
+
         headers = {}
         if auth_header:
             headers['Authorization'] = auth_header
+        if latest is not None:
+            headers['If-None-Match'] = latest['etag']
 
         resp = requests.get(
             self.generate_waterbutler_url(revision=revision, meta=True, **kwargs),
             headers=headers,
         )
+        if resp.status_code == 304 and latest is not None:
+            touch_counts.record('not_modified')
+            self.last_touched = datetime.datetime.utcnow()
+            self.save()
+            return self._build_latest_version(latest)
+
+        touch_counts.record('waterbutler')
         if resp.status_code != 200:
             logger.warning('Unable to find {} got status code {}'.format(self, resp.status_code))
             return None
@@ -671,59 +807,77 @@ class File(FileNode):
         # TODO Switch back to head requests
         # return self.update(revision, json.loads(resp.headers['x-waterbutler-metadata']))
 
-    def update(self, revision, data, user=None):
-        """Using revision and data update all data pretaining to self
-        :param str or None revision: The revision that data points to
-        :param dict data: Metadata recieved from waterbutler
-        :returns: FileVersion
+    def _is_fresh(self):
+        if not self.last_touched or not settings.WATERBUTLER_METADATA_FRESHNESS:
+            return False
+        age = datetime.datetime.utcnow() - self.last_touched
+        return age < datetime.timedelta(seconds=settings.WATERBUTLER_METADATA_FRESHNESS)
+
+    def _get_latest_metadata(self):
+        """Find the history entry last returned as the latest version.
+        Providers that override update without recording latest_etag
+        (IE dataverse and figshare, whose rendering depends on more than the
+        metadata) always refetch.
+        :returns: dict or None
         """
-        self.name = data['name']
-        self.materialized_path = data['materialized']
+        if not self.latest_etag:
+            return None
+        for entry in reversed(self.history):
+            if entry.get('etag') == self.latest_etag:
+                return entry
+        return None
 
-        version = FileVersion(identifier=revision)
+    def _build_latest_version(self, data):
+        """Build the unsaved FileVersion update would have returned for data"""
+        data = dict(data)
+        if isinstance(data.get('modified'), datetime.datetime):
+            data['modified'] = data['modified'].isoformat()
+        version = FileVersion(identifier=None)
         version.update_metadata(data, save=False)
+        return version
 
-        # Transform here so it can be sortted on later
-        if data['modified'] is not None and data['modified'] != '':
-            data['modified'] = parse_date(
-                data['modified'],
-                ignoretz=True,
-                default=datetime.datetime.utcnow()  # Just incase nothing can be parsed
-            )
-
-        # if revision is none then version is the latest version
-        # Dont save the latest information
-        if revision is not None:
-            version.save()
-            self.versions.append(version)
-
-        for entry in self.history:
-            if entry['etag'] == data['etag']:
-                break
-        else:
-            # Insert into history if there is no matching etag
-            utils.insort(self.history, data, lambda x: x['modified'])
-
-        # Finally update last touched
-        self.last_touched = datetime.datetime.utcnow()
+    def get_history(self, offset=0, limit=None):
+        """A page of self.history, most recently modified first
+        :param int offset: Number of entries to skip
+        :param int or None limit: Maximum number of entries to return
+        :returns: list of metadata dicts
+        """
+        history = self.history[::-1]
+        end = offset + limit if limit is not None else None
+        return history[offset:end]
 
-        self.save()
-        return version
+    def _download_count_page(self, version=None):
+        parts = ['download', self.node._id, self._id]
+        if version is not None:
+            parts.append(version)
+        return ':'.join([format(part) for part in parts])
 
     def get_download_count(self, version=None):
         """Pull the download count from the pagecounter collection
         Limit to version if specified.
         Currently only useful for OsfStorage
         """
-        parts = ['download', self.node._id, self._id]
-        if version is not None:
-            parts.append(version)
-        page = ':'.join([format(part) for part in parts])
-        _, count = get_basic_counters(page)
+        _, count = get_basic_counters(self._download_count_page(version))
 
         return count or 0
 
-    def serialize(self):
+    def get_download_counts(self, versions):
+        """Pull the download counts of several versions with one query
+        :param list versions: Versions as passed to get_download_count
+        :returns: dict of version to download count
+        """
+        pages = {version: self._download_count_page(version) for version in versions}
+        counters = get_basic_counters_bulk(pages.values())
+        return {version: counters[page][1] or 0 for version, page in pages.items()}
+
+    def serialize(self, downloads=None):
+        """
+        :param int downloads: The download count, if already known
+            IE from get_download_counts
+        """
+        if downloads is None:
+            downloads = self.get_download_count()
+
         if not self.versions:
             return dict(
                 super(File, self).serialize(),
@@ -731,7 +885,7 @@ class File(FileNode):
                 version=None,
                 modified=None,
                 contentType=None,
-                downloads=self.get_download_count(),
+                downloads=downloads,
                 checkout=self.checkout._id if self.checkout else None,
             )
 
@@ -739,7 +893,7 @@ class File(FileNode):
         return dict(
             super(File, self).serialize(),
             size=version.size,
-            downloads=self.get_download_count(),
+            downloads=downloads,
             checkout=self.checkout._id if self.checkout else None,
             version=version.identifier if self.versions else None,
             contentType=version.content_type if self.versions else None,
@@ -747,6 +901,16 @@ class File(FileNode):
         )
 
 
+def get_download_counts(files):
+    """Pull the download counts of many files with one query
+    :param iterable files: Files to count the downloads of
+    :returns: dict of file _id to download count
+    """
+    pages = {file_node._id: file_node._download_count_page() for file_node in files}
+    counters = get_basic_counters_bulk(pages.values())
+    return {file_id: counters[page][1] or 0 for file_id, page in pages.items()}
+
+
 class Folder(FileNode):
     is_file = False
 
@@ -175,8 +175,8 @@ class OsfStorageFile(OsfStorageFileNode, File):
     def history(self):
         return [v.metadata for v in self.versions]
 
-    def serialize(self, include_full=None, version=None):
-        ret = super(OsfStorageFile, self).serialize()
+    def serialize(self, include_full=None, version=None, downloads=None):
+        ret = super(OsfStorageFile, self).serialize(downloads=downloads)
         if include_full:
             ret['fullPath'] = self.materialized_path
 
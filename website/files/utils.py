@@ -107,3 +107,18 @@ def insort(col, element, get=lambda x: x):
     col.insert(lo, element)
 
     return col
+
+
+def trim_history(history, max_entries):
+    """Trim a history list sorted by modified date to at most max_entries.
+    The oldest entry is always kept, as it dates the file's creation,
+    along with the most recent max_entries - 1 entries.
+    :param list history: The history to trim
+    :param int max_entries: Maximum number of entries to keep, at least 1
+    :returns: The trimmed list
+    """
+    if len(history) <= max_entries:
+        return history
+    if max_entries <= 1:
+        return history[:1]
+    return history[:1] + history[-(max_entries - 1):]
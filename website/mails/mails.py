@@ -73,27 +73,16 @@ def render_message(tpl_name, **context):
     return tpl.render(**context)
 
 
-def send_mail(to_addr, mail, mimetype='plain', from_addr=None, mailer=None,
-            username=None, password=None, callback=None, **context):
-    """Send an email from the OSF.
-    Example: ::
-
-        from website import mails
-
-        mails.send_email('foo@bar.com', mails.TEST, name="Foo")
+def render_mail(to_addr, mail, mimetype='plain', from_addr=None, username=None, password=None, **context):
+    """Render an email into the keyword arguments of
+    :func:`framework.email.tasks.send_email`.
 
     :param str to_addr: The recipient's email address
     :param Mail mail: The mail object
     :param str mimetype: Either 'plain' or 'html'
-    :param function callback: celery task to execute after send_mail completes
     :param **context: Context vars for the message template
-
-    .. note:
-         Uses celery if available
     """
-
     from_addr = from_addr or settings.FROM_EMAIL
-    mailer = mailer or tasks.send_email
     subject = mail.subject(**context)
     message = mail.text(**context) if mimetype in ('plain', 'txt') else mail.html(**context)
     # Don't use ttls and login in DEBUG_MODE
@@ -101,7 +90,7 @@ def send_mail(to_addr, mail, mimetype='plain', from_addr=None, mailer=None,
     logger.debug('Sending email...')
     logger.debug(u'To: {to_addr}\nFrom: {from_addr}\nSubject: {subject}\nMessage: {message}'.format(**locals()))
 
-    kwargs = dict(
+    return dict(
         from_addr=from_addr,
         to_addr=to_addr,
         subject=subject,
@@ -114,6 +103,30 @@ def send_mail(to_addr, mail, mimetype='plain', from_addr=None, mailer=None,
         categories=mail.categories,
     )
 
+
+def send_mail(to_addr, mail, mimetype='plain', from_addr=None, mailer=None,
+            username=None, password=None, callback=None, **context):
+    """Send an email from the OSF.
+    Example: ::
+
+        from website import mails
+
+        mails.send_email('foo@bar.com', mails.TEST, name="Foo")
+
+    :param str to_addr: The recipient's email address
+    :param Mail mail: The mail object
+    :param str mimetype: Either 'plain' or 'html'
+    :param function callback: celery task to execute after send_mail completes
+    :param **context: Context vars for the message template
+
+    .. note:
+         Uses celery if available
+    """
+
+    mailer = mailer or tasks.send_email
+    kwargs = render_mail(to_addr, mail, mimetype=mimetype, from_addr=from_addr,
+                         username=username, password=password, **context)
+
     if settings.USE_EMAIL:
         if settings.USE_CELERY:
             return mailer.apply_async(kwargs=kwargs, link=callback)
@@ -3,7 +3,7 @@ from datetime import datetime
 
 from modularodm import fields, Q
 from framework.mongo import StoredObject
-from .mails import Mail, send_mail
+from .mails import Mail, render_mail, send_mail
 from website import settings
 from website.mails import presends
 
@@ -35,6 +35,31 @@ class QueuedMail(StoredObject):
             self._id, self.email_type, self.to_addr, self.send_at
         )
 
+    def _mail(self):
+        mail_struct = queue_mail_types[self.email_type]
+        return Mail(
+            mail_struct['template'],
+            subject=mail_struct['subject'],
+            categories=mail_struct.get('categories', None)
+        )
+
+    def should_send(self):
+        """
+        Checks presend and the user's subscription to help mails.
+        :return: boolean based on whether email should be sent.
+        """
+        mail_struct = queue_mail_types[self.email_type]
+        presend = mail_struct['presend'](self)
+        return bool(presend and self.user.is_active and self.user.osf_mailing_lists.get(settings.OSF_HELP_LIST))
+
+    def render(self):
+        """
+        Constructs the mail object from this email's type and renders it with this email's data.
+        :return: keyword arguments for framework.email.tasks.send_email
+        """
+        data = dict(self.data or {}, osf_url=settings.DOMAIN)
+        return render_mail(self.to_addr or self.user.username, self._mail(), mimetype='html', **data)
+
     def send_mail(self):
         """
         Grabs the data from this email, checks for user subscription to help mails,
@@ -43,16 +68,9 @@ class QueuedMail(StoredObject):
         through send_mail()
         :return: boolean based on whether email was sent.
         """
-        mail_struct = queue_mail_types[self.email_type]
-        presend = mail_struct['presend'](self)
-        mail = Mail(
-            mail_struct['template'],
-            subject=mail_struct['subject'],
-            categories=mail_struct.get('categories', None)
-        )
-        self.data['osf_url'] = settings.DOMAIN
-        if presend and self.user.is_active and self.user.osf_mailing_lists.get(settings.OSF_HELP_LIST):
-            send_mail(self.to_addr or self.user.username, mail, mimetype='html', **(self.data or {}))
+        if self.should_send():
+            data = dict(self.data or {}, osf_url=settings.DOMAIN)
+            send_mail(self.to_addr or self.user.username, self._mail(), mimetype='html', **data)
             self.sent_at = datetime.utcnow()
             self.save()
             return True
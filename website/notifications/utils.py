@@ -10,6 +10,7 @@ from website.notifications import model
 from website.notifications.exceptions import InvalidSubscriptionError
 from website.notifications.model import NotificationSubscription
 from website.project import signals
+from website.project.tree import build_trees
 
 from framework.celery_tasks import app
 
@@ -230,62 +231,59 @@ def format_data(user, node_ids):
     :param node_ids: list of parent project ids
     :return: treebeard-formatted data
     """
+    trees = build_trees(user, node_ids)
+    user_subscriptions = list(get_all_user_subscriptions(user))
     items = []
 
     for node_id in node_ids:
-        node = Node.load(node_id)
-        assert node, '{} is not a valid Node.'.format(node_id)
+        item = _format_node_subscriptions(user, trees[node_id], node_id, user_subscriptions)
+        if item:
+            items.append(item)
 
-        can_read = node.has_permission(user, 'read')
-        can_read_children = node.has_permission_on_children(user, 'read')
+    return items
 
-        if not can_read and not can_read_children:
-            continue
 
-        children = []
-        # List project/node if user has at least 'read' permissions (contributor or admin viewer) or if
-        # user is contributor on a component of the project/node
-
-        if can_read:
-            node_sub_available = list(constants.NODE_SUBSCRIPTIONS_AVAILABLE.keys())
-            subscriptions = [subscription for subscription in get_all_node_subscriptions(user, node)
-                             if getattr(subscription, 'event_name') in node_sub_available]
-            for subscription in subscriptions:
-                index = node_sub_available.index(getattr(subscription, 'event_name'))
-                children.append(serialize_event(user, subscription=subscription,
-                                                node=node, event_description=node_sub_available.pop(index)))
-            for node_sub in node_sub_available:
-                    children.append(serialize_event(user, node=node, event_description=node_sub))
-            children.sort(key=lambda s: s['event']['title'])
-
-        children.extend(format_data(
-            user,
-            [
-                n._id
-                for n in node.nodes
-                if n.primary and
-                not n.is_deleted
-            ]
-        ))
-
-        item = {
-            'node': {
-                'id': node_id,
-                'url': node.url if can_read else '',
-                'title': node.title if can_read else 'Private Project',
-            },
-            'children': children,
-            'kind': 'folder' if not node.node__parent or not node.parent_node.has_permission(user, 'read') else 'node',
-            'nodeType': node.project_or_component,
-            'category': node.category,
-            'permissions': {
-                'view': can_read,
-            },
-        }
+def _format_node_subscriptions(user, tree, node_id, user_subscriptions):
+    # List project/node if user has at least 'read' permissions (contributor or admin viewer) or if
+    # user is contributor on a component of the project/node
+    if not tree.can_read_subtree(node_id):
+        return None
 
-        items.append(item)
+    node = tree.get(node_id)
+    can_read = tree.can_read(node_id)
+    children = []
+
+    if can_read:
+        node_sub_available = list(constants.NODE_SUBSCRIPTIONS_AVAILABLE.keys())
+        subscriptions = [subscription for subscription in get_all_node_subscriptions(user, node, user_subscriptions)
+                         if getattr(subscription, 'event_name') in node_sub_available]
+        for subscription in subscriptions:
+            index = node_sub_available.index(getattr(subscription, 'event_name'))
+            children.append(serialize_event(user, subscription=subscription,
+                                            node=node, event_description=node_sub_available.pop(index)))
+        for node_sub in node_sub_available:
+                children.append(serialize_event(user, node=node, event_description=node_sub))
+        children.sort(key=lambda s: s['event']['title'])
+
+    for child in tree.children(node_id):
+        item = _format_node_subscriptions(user, tree, child._id, user_subscriptions)
+        if item:
+            children.append(item)
 
-    return items
+    return {
+        'node': {
+            'id': node_id,
+            'url': node.url if can_read else '',
+            'title': node.title if can_read else 'Private Project',
+        },
+        'children': children,
+        'kind': tree.kind(node_id),
+        'nodeType': node.project_or_component,
+        'category': node.category,
+        'permissions': {
+            'view': can_read,
+        },
+    }
 
 
 def format_user_subscriptions(user):
@@ -26,6 +26,7 @@ from framework.mongo.utils import unique_on
 from framework.mongo.validators import string_required
 from framework.sessions import session
 from website import settings
+from website.oauth.signals import oauth_key_refreshed
 from website.oauth.utils import PROVIDER_LOOKUP
 from website.security import random_string
 from website.util import web_url_for, api_v2_url
@@ -369,7 +370,7 @@ class ExternalProvider(object):
         pass
 
     def refresh_oauth_key(self, force=False, extra={}, resp_auth_token_key='access_token',
-                          resp_refresh_token_key='refresh_token', resp_expiry_fn=None):
+                          resp_refresh_token_key='refresh_token', resp_expiry_fn=None, save=True):
         """Handles the refreshing of an oauth_key for account associated with this provider.
            Not all addons need to use this, as some do not have oauth_keys that expire.
 
@@ -384,6 +385,9 @@ class ExternalProvider(object):
         kwarg `resp_expiry_fn` allows subclasses to specify a function that will return the
         datetime-formatted oauth_key expiry key, given a successful refresh response from
         `auto_refresh_url`. A default using 'expires_at' as a key is provided.
+
+        kwarg `save` set to False leaves saving the new tokens to the caller, e.g. to
+        write many refreshed accounts in batches.
         """
         # Ensure this is an authenticated Provider that uses token refreshing
         if not (self.account and self.auto_refresh_url):
@@ -424,7 +428,9 @@ class ExternalProvider(object):
         self.account.oauth_key = token[resp_auth_token_key]
         self.account.refresh_token = token[resp_refresh_token_key]
         self.account.expires_at = resp_expiry_fn(token)
-        self.account.save()
+        if save:
+            self.account.save()
+            oauth_key_refreshed.send(self, account=self.account)
         return True
 
     def _needs_refresh(self):
@@ -2,3 +2,4 @@ import blinker
 
 oauth_signals = blinker.Namespace()
 oauth_complete = oauth_signals.signal('oauth-complete')
+oauth_key_refreshed = oauth_signals.signal('oauth-key-refreshed')
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import hashlib
 import itertools
 import functools
 import os
@@ -22,15 +23,18 @@ from modularodm.exceptions import ValidationValueError
 
 from framework import status
 from framework.mongo import ObjectId
+from framework.mongo import database
 from framework.mongo import StoredObject
 from framework.mongo import validators
 from framework.addons import AddonModelMixin
 from framework.auth import get_user, User, Auth
+from framework.auth import permission_cache
 from framework.exceptions import PermissionsError
 from framework.guid.model import GuidStoredObject, Guid
 from framework.auth.utils import privacy_info_handle
 from framework.analytics import tasks as piwik_tasks
 from framework.mongo.utils import to_mongo_key, unique_on
+from framework.mongo import unit_of_work
 from framework.analytics import (
     get_basic_counters, increment_user_activity_counters
 )
@@ -301,23 +305,74 @@ class Comment(GuidStoredObject, SpamMixin, Commentable):
 
     @classmethod
     def find_n_unread(cls, user, node, page, root_id=None):
-        if node.is_contributor(user):
-            if page == Comment.OVERVIEW:
-                view_timestamp = user.get_node_comment_timestamps(target_id=node._id)
-                root_target = Guid.load(node._id)
-            elif page == Comment.FILES or page == Comment.WIKI:
-                view_timestamp = user.get_node_comment_timestamps(target_id=root_id)
-                root_target = Guid.load(root_id)
-            else:
-                raise ValueError('Invalid page')
-            return Comment.find(Q('node', 'eq', node) &
-                                Q('user', 'ne', user) &
-                                Q('is_deleted', 'eq', False) &
-                                (Q('date_created', 'gt', view_timestamp) |
-                                Q('date_modified', 'gt', view_timestamp)) &
-                                Q('root_target', 'eq', root_target)).count()
+        if page == Comment.OVERVIEW:
+            root_id = node._id
+        elif page != Comment.FILES and page != Comment.WIKI:
+            raise ValueError('Invalid page')
+        return cls.find_unread_counts(user, node, root_ids=[root_id]).get(root_id, 0)
+
+    @classmethod
+    def find_unread_counts(cls, user, node, root_ids=None):
+        """Count the comments on a node that a contributor has not seen yet,
+        for every page of the node at once. Comments count as unread if they
+        were made or edited by someone else after the user last viewed the
+        comments on their page (see ``User.comments_viewed_timestamp``).
+
+        :param User user: User viewing the node
+        :param Node node: Node the comments belong to
+        :param list root_ids: Only count these root targets (the node's ID for
+            its overview page, or file and wiki page GUIDs)
+        :return: Dict mapping root target IDs to their number of unread comments;
+            pages without unread comments are omitted
+        """
+        if not node.is_contributor(user):
+            return {}
+
+        def unread_since(timestamp):
+            return [{'date_created': {'$gt': timestamp}}, {'date_modified': {'$gt': timestamp}}]
+
+        comments = {
+            'node': node._id,
+            'user': {'$ne': user._id},
+            'is_deleted': False,
+        }
+        if root_ids is None:
+            # Only the pages of this node with comments are considered, rather
+            # than every page in comments_viewed_timestamp, which covers every
+            # node the user has ever viewed
+            root_ids = [
+                group['_id'][0]
+                for group in database['comment'].aggregate([
+                    {'$match': comments},
+                    {'$group': {'_id': '$root_target'}},
+                ])['result']
+                if group['_id']
+            ]
 
-        return 0
+        viewed = user.comments_viewed_timestamp
+        # Apply each page's own timestamp, and the default to pages never viewed
+        clauses = [
+            {'root_target': [root_id, 'guid'], '$or': unread_since(viewed[root_id])}
+            for root_id in root_ids
+            if root_id in viewed
+        ]
+        unviewed = [[root_id, 'guid'] for root_id in root_ids if root_id not in viewed]
+        if unviewed:
+            clauses.append({'root_target': {'$in': unviewed}, '$or': unread_since(user.DEFAULT_COMMENTS_VIEWED_TIMESTAMP)})
+        if not clauses:
+            return {}
+
+        match = dict(comments)
+        match['$or'] = clauses
+        result = database['comment'].aggregate([
+            {'$match': match},
+            {'$group': {'_id': '$root_target', 'count': {'$sum': 1}}},
+        ])['result']
+        return {
+            group['_id'][0]: group['count']
+            for group in result
+            if group['_id']
+        }
 
     @classmethod
     def create(cls, auth, **kwargs):
@@ -583,6 +638,50 @@ class NodeLog(StoredObject):
         log_clone.save()
         return log_clone
 
+    @classmethod
+    def copy_logs(cls, source_id, target_id, batch_size=None, progress=None):
+        """Copy every log of one node to another, IE a fork or registration.
+        Streams the source logs in batches, points the copies at the target
+        node and inserts each batch with one unordered bulk write.
+
+        Each copy's ID is derived from its source log and the target, so
+        copying again, e.g. when the task is redelivered, skips the logs
+        already copied instead of duplicating them.
+
+        :param str source_id: ID of the node to copy logs from
+        :param str target_id: ID of the node to copy logs to
+        :param int batch_size: Number of logs per write, LOG_COPY_BATCH_SIZE by default
+        :param callable progress: Called with the number of logs copied so far after each batch
+        :return: Number of logs copied
+        """
+        batch_size = batch_size or settings.LOG_COPY_BATCH_SIZE
+        store = cls._storage[0].store
+        cursor = store.find({'node': source_id}).batch_size(batch_size)
+        copied = 0
+        while True:
+            batch = list(itertools.islice(cursor, batch_size))
+            if not batch:
+                break
+            for log in batch:
+                log['_id'] = cls.copied_log_id(log['_id'], target_id)
+                log['node'] = target_id
+            try:
+                store.insert(batch, continue_on_error=True)
+            except pymongo.errors.DuplicateKeyError:
+                # The rest of the batch is still inserted
+                pass
+            copied += len(batch)
+            if progress:
+                progress(copied)
+        return copied
+
+    @staticmethod
+    def copied_log_id(log_id, target_id):
+        """Return the ID of the copy of log ``log_id`` on node ``target_id``,
+        24 hex digits like an ObjectId.
+        """
+        return hashlib.md5('{0}:{1}'.format(log_id, target_id)).hexdigest()[:24]
+
     @property
     def tz_date(self):
         '''Return the timezone-aware date.
@@ -832,6 +931,16 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
         '_affiliated_institutions',
     }
 
+    # Fields that affect who may access the node and its descendants
+    ACCESS_FIELDS = {
+        'contributors',
+        'permissions',
+        'is_public',
+        'is_deleted',
+        'parent_node',
+        'nodes',
+    }
+
     # Fields that are writable by Node.update
     WRITABLE_WHITELIST = [
         'title',
@@ -928,6 +1037,10 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
     piwik_site_id = fields.StringField()
     keenio_read_key = fields.StringField()
 
+    # Set while the logs of the node this was forked or registered from are
+    # copied in the background: {'copied': <int>, 'total': <int>}
+    logs_copy_progress = fields.DictionaryField(default=None)
+
     # Dictionary field mapping user id to a list of nodes in node.nodes which the user has subscriptions for
     # {<User.id>: [<Node._id>, <Node2._id>, ...] }
     child_node_subscriptions = fields.DictionaryField(default=dict)
@@ -1178,12 +1291,25 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
             if contrib.is_active and include(contrib):
                 yield contrib
 
+    @property
+    def admin_ancestor_ids(self):
+        """Set of ids of users with admin permission on this node or any of
+        its ancestors. Memoized for the duration of a request.
+        """
+        def compute():
+            admin_ids = {
+                user_id for user_id, perms in self.permissions.iteritems()
+                if 'admin' in perms
+            }
+            if self.parent_node:
+                admin_ids.update(self.parent_node.admin_ancestor_ids)
+            return frozenset(admin_ids)
+        return permission_cache.memoize(('admin_ancestor_ids', self._id), compute)
+
     def is_admin_parent(self, user):
-        if self.has_permission(user, 'admin', check_parent=False):
-            return True
-        if self.parent_node:
-            return self.parent_node.is_admin_parent(user)
-        return False
+        if user is None:
+            return False
+        return user._id in self.admin_ancestor_ids
 
     def can_view(self, auth):
         if auth and getattr(auth.private_link, 'anonymous', False):
@@ -1192,11 +1318,17 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
         if not auth and not self.is_public:
             return False
 
-        return (
-            self.is_public or
-            (auth.user and self.has_permission(auth.user, 'read')) or
-            auth.private_key in self.private_link_keys_active or
-            self.is_admin_parent(auth.user)
+        # Privacy and private links may change within the request before they
+        # are saved, so only the contributor checks are memoized
+        if self.is_public or (auth.private_key and auth.private_key in self.private_link_keys_active):
+            return True
+
+        return permission_cache.memoize(
+            ('can_view', self._id, auth.user._id if auth.user else None),
+            lambda: bool(auth.user) and bool(
+                self.has_permission(auth.user, 'read') or
+                self.is_admin_parent(auth.user)
+            )
         )
 
     def is_derived_from(self, other, attr):
@@ -1229,6 +1361,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
         :param bool save: Save changes
         :raises: ValueError if user already has permission
         """
+        permission_cache.invalidate()
         if user._id not in self.permissions:
             self.permissions[user._id] = [permission]
         else:
@@ -1246,6 +1379,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
         :param bool save: Save changes
         :raises: ValueError if user does not have permission
         """
+        permission_cache.invalidate()
         try:
             self.permissions[user._id].remove(permission)
         except (KeyError, ValueError):
@@ -1260,6 +1394,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
         :param bool save: Save changes
         :raises: ValueError if user not in permissions
         """
+        permission_cache.invalidate()
         try:
             self.permissions.pop(user._id)
         except KeyError:
@@ -1280,6 +1415,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
             ]
             if ADMIN not in reduced_permissions:
                 raise NodeStateError('Must have at least one registered admin contributor')
+        permission_cache.invalidate()
         self.permissions[user._id] = permissions
         if save:
             self.save()
@@ -1619,6 +1755,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
     def save(self, *args, **kwargs):
         update_piwik = kwargs.pop('update_piwik', True)
         self.adjust_permissions()
+        permission_cache.invalidate()
 
         first_save = not self._is_loaded
 
@@ -1675,6 +1812,36 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
 
             project_signals.project_created.send(self)
 
+        # Within a unit of work, signals, search and piwik updates run once
+        # for all saves of this node, when the unit of work is flushed
+        details = {'saved_fields': saved_fields, 'first_save': first_save, 'update_piwik': update_piwik}
+        if not unit_of_work.defer(self, self._on_saved, **details):
+            self._on_saved([details])
+
+        # Return expected value for StoredObject::save
+        return saved_fields
+
+    def _on_saved(self, saves):
+        """Run the side effects of one or more saves of this node.
+
+        :param list saves: Dicts of the ``saved_fields``, ``first_save`` and
+            ``update_piwik`` of each save
+        """
+        saved_fields = []
+        piwik_fields = []
+        for save in saves:
+            for field in save['saved_fields']:
+                if field not in saved_fields:
+                    saved_fields.append(field)
+                if save['update_piwik'] and field not in piwik_fields:
+                    piwik_fields.append(field)
+        first_save = any(save['first_save'] for save in saves)
+
+        if self.ACCESS_FIELDS.intersection(saved_fields):
+            project_signals.node_access_changed.send(self)
+        if saved_fields:
+            project_signals.node_updated.send(self, saved_fields=saved_fields)
+
         # Only update Solr if at least one stored field has changed, and if
         # public or privacy setting has changed
         need_update = bool(self.SOLR_UPDATE_FIELDS.intersection(saved_fields))
@@ -1695,11 +1862,8 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
                 Node.bulk_update_search(children)
 
         # This method checks what has changed.
-        if settings.PIWIK_HOST and update_piwik:
-            piwik_tasks.update_node(self._id, saved_fields)
-
-        # Return expected value for StoredObject::save
-        return saved_fields
+        if settings.PIWIK_HOST and any(save['update_piwik'] for save in saves):
+            piwik_tasks.update_node(self._id, piwik_fields)
 
     ######################################
     # Methods that return a new instance #
@@ -2278,6 +2442,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
         forked.forked_from = original
         forked.creator = user
         forked.piwik_site_id = None
+        forked.logs_copy_progress = None
         forked.node_license = original.license.copy() if original.license else None
         forked.wiki_private_uuids = {}
 
@@ -2322,10 +2487,8 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
             save=False,
         )
 
-        # Clone each log from the original node for this fork.
-        logs = original.logs
-        for log in logs:
-            log.clone_node_log(forked._id)
+        # Copy each log from the original node for this fork.
+        forked._copy_logs_from(original)
 
         forked.reload()
 
@@ -2337,6 +2500,24 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
 
         return forked
 
+    def _copy_logs_from(self, original):
+        """Copy the logs of original, the node this was forked or registered
+        from. Histories longer than LOG_COPY_ASYNC_THRESHOLD are copied by a
+        Celery task after the request, which reports its progress in
+        logs_copy_progress.
+        """
+        threshold = settings.LOG_COPY_ASYNC_THRESHOLD
+        if threshold is not None:
+            total = NodeLog.find(Q('node', 'eq', original._id)).count()
+            if total > threshold:
+                # Avoid a circular import
+                from website.project import tasks
+                self.logs_copy_progress = {'copied': 0, 'total': total}
+                self.save()
+                tasks.copy_node_logs(original._id, self._id)
+                return
+        NodeLog.copy_logs(original._id, self._id)
+
     def register_node(self, schema, auth, data, parent=None):
         """Make a frozen copy of a node.
 
@@ -2381,6 +2562,7 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
         registered.creator = self.creator
         registered.tags = self.tags
         registered.piwik_site_id = None
+        registered.logs_copy_progress = None
         registered._affiliated_institutions = self._affiliated_institutions
         registered.alternative_citations = self.alternative_citations
         registered.node_license = original.license.copy() if original.license else None
@@ -2388,10 +2570,8 @@ class Node(GuidStoredObject, AddonModelMixin, IdentifierMixin, Commentable):
 
         registered.save()
 
-        # Clone each log from the original node for this registration.
-        logs = original.logs
-        for log in logs:
-            log.clone_node_log(registered._id)
+        # Copy each log from the original node for this registration.
+        registered._copy_logs_from(original)
 
         registered.is_public = False
         for node in registered.get_descendants_recursive():
@@ -3875,6 +4055,16 @@ class PrivateLink(StoredObject):
     nodes = fields.ForeignField('node', list=True)
     creator = fields.ForeignField('user')
 
+    def save(self, *args, **kwargs):
+        permission_cache.invalidate()
+        saved_fields = super(PrivateLink, self).save(*args, **kwargs)
+        if 'is_deleted' in saved_fields and self.is_deleted:
+            # The link no longer grants access to its nodes
+            for node in self.nodes:
+                if node is not None:
+                    project_signals.node_access_changed.send(node)
+        return saved_fields
+
     @property
     def node_ids(self):
         node_ids = [node._id for node in self.nodes]
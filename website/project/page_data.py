@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""Data loader for the project overview page.
+
+``_view_project`` needs a handful of counts and lookups that used to be
+issued as separate queries on every page view (and some of them twice).
+:class:`ProjectPageData` fetches each piece at most once, counts related
+nodes with a single aggregation and records how long every section took.
+"""
+import collections
+import logging
+import time
+
+from modularodm import Q
+
+from framework.mongo import database
+
+from website.project.model import Comment, NodeLog, WatchConfig
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProjectPageData(object):
+    """Lazily loads and memoizes the data shown on a node's project page.
+
+    :param Node node: Node being rendered
+    """
+
+    def __init__(self, node):
+        self.node = node
+        self.timings = collections.OrderedDict()
+        self._loaded = {}
+
+    def _load(self, section, compute):
+        if section not in self._loaded:
+            start = time.time()
+            self._loaded[section] = compute()
+            self.timings[section] = self.timings.get(section, 0) + time.time() - start
+        return self._loaded[section]
+
+    def timed(self, section, compute):
+        """Call ``compute`` and record its duration under ``section``, without
+        memoizing the result.
+        """
+        start = time.time()
+        try:
+            return compute()
+        finally:
+            self.timings[section] = self.timings.get(section, 0) + time.time() - start
+
+    @property
+    def related_node_counts(self):
+        """Counts of registrations, forks and nodes templated from this node,
+        computed with one aggregation over the node collection.
+        """
+        def compute():
+            node_id = self.node._id
+            result = database['node'].aggregate([
+                {'$match': {
+                    '$or': [
+                        {'registered_from': node_id},
+                        {'forked_from': node_id},
+                        {'template_node': node_id},
+                    ],
+                    'institution_id': None,
+                }},
+                {'$group': {
+                    '_id': None,
+                    'registration_count': {'$sum': {'$cond': [
+                        {'$eq': ['$registered_from', node_id]}, 1, 0
+                    ]}},
+                    'fork_count': {'$sum': {'$cond': [
+                        {'$and': [
+                            {'$eq': ['$forked_from', node_id]},
+                            {'$eq': ['$is_deleted', False]},
+                            {'$ne': ['$is_registration', True]},
+                        ]}, 1, 0
+                    ]}},
+                    'templated_count': {'$sum': {'$cond': [
+                        {'$and': [
+                            {'$eq': ['$template_node', node_id]},
+                            {'$ne': ['$is_deleted', True]},
+                        ]}, 1, 0
+                    ]}},
+                }},
+            ])['result']
+            counts = {'registration_count': 0, 'fork_count': 0, 'templated_count': 0}
+            if result:
+                counts.update({key: result[0][key] for key in counts})
+            return counts
+        return self._load('related_node_counts', compute)
+
+    @property
+    def watched_count(self):
+        return self._load(
+            'watched_count',
+            lambda: WatchConfig.find(Q('node', 'eq', self.node._id)).count()
+        )
+
+    @property
+    def has_comments(self):
+        return self._load(
+            'has_comments',
+            lambda: Comment.find(Q('node', 'eq', self.node._id)).limit(1).count() > 0
+        )
+
+    @property
+    def points(self):
+        return self._load(
+            'points',
+            lambda: len(self.node.get_points(deleted=False, folders=False))
+        )
+
+    @property
+    def private_links(self):
+        return self._load(
+            'private_links',
+            lambda: [link.to_json() for link in self.node.private_links_active]
+        )
+
+    @property
+    def date_modified(self):
+        """Date of the most recent log, fetched without loading the full log list."""
+        def compute():
+            logs = list(NodeLog.find(Q('node', 'eq', self.node._id)).sort('-date').limit(1))
+            return logs[0].date if logs else None
+        return self._load('date_modified', compute)
+
+    def log_timings(self):
+        logger.debug('Project page data for {0}: {1}'.format(
+            self.node._id,
+            ', '.join('{0}={1:.1f}ms'.format(section, elapsed * 1000) for section, elapsed in self.timings.items())
+        ))
@@ -9,6 +9,10 @@ contributor_removed = signals.signal('contributor-removed')
 unreg_contributor_added = signals.signal('unreg-contributor-added')
 write_permissions_revoked = signals.signal('write-permissions-revoked')
 node_deleted = signals.signal('node-deleted')
+# Sent when contributors, permissions, privacy or addon settings of a node change
+node_access_changed = signals.signal('node-access-changed')
+# Sent after a node is saved, with the names of the fields that changed
+node_updated = signals.signal('node-updated')
 
 after_create_registration = signals.signal('post-create-registration')
 
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""Background tasks for projects."""
+import logging
+
+from framework.celery_tasks import app as celery_app
+from framework.mongo import database
+from framework.postcommit_tasks.handlers import run_postcommit
+
+
+logger = logging.getLogger(__name__)
+
+
+@run_postcommit(once_per_request=False, celery=True)
+@celery_app.task(ignore_result=True)
+def copy_node_logs(source_id, target_id):
+    """Copy the logs of a node to its fork or registration, recording the
+    progress in the target's logs_copy_progress and clearing it when done.
+    """
+    # Avoid a circular import
+    from website.project.model import NodeLog
+
+    # Progress is written directly, as saving the node would also re-index it
+    # and send its save signals once per batch
+    def record_progress(copied):
+        database['node'].update({'_id': target_id}, {'$set': {'logs_copy_progress.copied': copied}})
+
+    copied = NodeLog.copy_logs(source_id, target_id, progress=record_progress)
+    database['node'].update({'_id': target_id}, {'$set': {'logs_copy_progress': None}})
+    logger.info('Copied {0} logs from node {1} to {2}'.format(copied, source_id, target_id))
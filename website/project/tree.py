@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""In-memory index of a project tree, used to build treebeard-formatted
+data (project organizer, notification settings) without re-walking
+``node.nodes`` and re-checking permissions for every level.
+"""
+import collections
+
+from modularodm import Q
+
+from framework.auth import User
+
+from website.project.model import Node
+from website.util.permissions import ADMIN, READ
+
+
+class NodeTree(object):
+    """Loads every non-deleted node sharing ``root`` in a single query and
+    computes, for ``user``, read permission and whether any descendant is
+    readable in one bottom-up pass.
+
+    :param User user: User whose permissions are computed
+    :param str root_id: Primary key of the root node of the tree
+    """
+
+    def __init__(self, user, root_id):
+        self.user = user
+        self.root_id = root_id
+
+        nodes = Node.find(
+            Q('root', 'eq', root_id) &
+            Q('is_deleted', 'eq', False)
+        ).sort('date_created')
+
+        self._nodes = collections.OrderedDict((node._id, node) for node in nodes)
+        self._parents = {}
+        self._children = collections.defaultdict(list)
+        for node_id, node in self._nodes.items():
+            parent_id = node.to_storage()['parent_node']
+            if parent_id in self._nodes:
+                self._parents[node_id] = parent_id
+                self._children[parent_id].append(node_id)
+
+        self._can_read = {}
+        self._readable_subtree = {}
+        self._compute_permissions()
+
+    def __contains__(self, node_id):
+        return node_id in self._nodes
+
+    def _walk(self):
+        """Yield node ids top-down, parents before their children."""
+        stack = [
+            node_id for node_id in reversed(self._nodes.keys())
+            if node_id not in self._parents
+        ]
+        while stack:
+            node_id = stack.pop()
+            yield node_id
+            stack.extend(reversed(self._children[node_id]))
+
+    def _compute_permissions(self):
+        user_id = self.user._id if self.user else None
+        order = list(self._walk())
+
+        # Top-down: read is granted directly or by admin on any ancestor
+        admin_ancestor = {}
+        for node_id in order:
+            parent_id = self._parents.get(node_id)
+            inherited = (
+                parent_id is not None and
+                (admin_ancestor[parent_id] or self._has_direct(parent_id, user_id, ADMIN))
+            )
+            admin_ancestor[node_id] = inherited
+            self._can_read[node_id] = inherited or self._has_direct(node_id, user_id, READ)
+
+        # Bottom-up: a subtree is readable if the node or any descendant is
+        for node_id in reversed(order):
+            self._readable_subtree[node_id] = self._can_read[node_id] or any(
+                self._readable_subtree[child_id] for child_id in self._children[node_id]
+            )
+
+    def _has_direct(self, node_id, user_id, permission):
+        if user_id is None:
+            return False
+        return permission in self._nodes[node_id].permissions.get(user_id, [])
+
+    def get(self, node_id):
+        return self._nodes[node_id]
+
+    def children(self, node_id):
+        """Non-deleted primary children of a node, in creation order."""
+        return [self._nodes[child_id] for child_id in self._children[node_id]]
+
+    def parent(self, node_id):
+        parent_id = self._parents.get(node_id)
+        return self._nodes[parent_id] if parent_id else None
+
+    def can_read(self, node_id):
+        """Equivalent to ``node.has_permission(user, 'read')``."""
+        return self._can_read[node_id]
+
+    def can_read_subtree(self, node_id):
+        """Equivalent to ``node.has_permission_on_children(user, 'read')``."""
+        return self._readable_subtree[node_id]
+
+    def is_admin(self, node_id, user=None):
+        """Equivalent to ``node.has_permission(user, 'admin')``."""
+        user = user or self.user
+        return self._has_direct(node_id, user._id if user else None, ADMIN)
+
+    def kind(self, node_id):
+        """'node' if the parent is readable, otherwise 'folder'."""
+        parent_id = self._parents.get(node_id)
+        if parent_id is None or not self._can_read[parent_id]:
+            return 'folder'
+        return 'node'
+
+    def prefetch_related(self):
+        """Load contributors and affiliated institutions for every node in
+        the tree with one query per collection so that serializing the
+        tree does not trigger a load per node.
+        """
+        user_ids, institution_ids = set(), set()
+        for node in self._nodes.values():
+            storage = node.to_storage()
+            user_ids.update(storage.get('contributors') or [])
+            institution_ids.update(storage.get('_affiliated_institutions') or [])
+        if user_ids:
+            list(User.find(Q('_id', 'in', list(user_ids))))
+        if institution_ids:
+            list(Node.find(Q('_id', 'in', list(institution_ids)), allow_institution=True))
+
+
+def build_trees(user, node_ids):
+    """Return a ``{node_id: NodeTree}`` map for ``node_ids``, sharing one
+    :class:`NodeTree` between ids with the same root.
+    """
+    trees, by_root = {}, {}
+    for node_id in node_ids:
+        node = Node.load(node_id)
+        assert node, '{} is not a valid Node.'.format(node_id)
+        root_id = node.to_storage()['root'] or node._id
+        if root_id not in by_root:
+            by_root[root_id] = NodeTree(user, root_id)
+        trees[node_id] = by_root[root_id]
+    return trees
@@ -6,7 +6,7 @@ import markdown
 import pytz
 from flask import request
 
-from api.caching.tasks import ban_url
+from api.caching.tasks import ban_url, ban_url_async
 from framework.guid.model import Guid
 from framework.postcommit_tasks.handlers import enqueue_postcommit_task
 from modularodm import Q
@@ -175,11 +175,11 @@ def is_reply(target):
 
 def _update_comments_timestamp(auth, node, page=Comment.OVERVIEW, root_id=None):
     if node.is_contributor(auth.user):
-        enqueue_postcommit_task(ban_url, (node, ), {}, celery=False, once_per_request=True)
+        enqueue_postcommit_task(ban_url, (node, ), {}, celery=False, once_per_request=True, overflow=ban_url_async)
         if root_id is not None:
             guid_obj = Guid.load(root_id)
             if guid_obj is not None:
-                enqueue_postcommit_task(ban_url, (guid_obj.referent, ), {}, celery=False, once_per_request=True)
+                enqueue_postcommit_task(ban_url, (guid_obj.referent, ), {}, celery=False, once_per_request=True, overflow=ban_url_async)
 
         # update node timestamp
         if page == Comment.OVERVIEW:
@@ -196,3 +196,13 @@ def update_comments_timestamp(auth, node, **kwargs):
     page = timestamp_info.get('page')
     root_id = timestamp_info.get('rootId')
     return _update_comments_timestamp(auth, node, page, root_id)
+
+
+@must_be_contributor_or_public
+def get_unread_comment_counts(auth, node, **kwargs):
+    """Return the number of unread comments on each page of the node,
+    keyed by the ID of the page's root target.
+    """
+    if auth.user is None:
+        return {'unread': {}}
+    return {'unread': Comment.find_unread_counts(user=auth.user, node=node)}
@@ -32,10 +32,12 @@ from website.project.decorators import (
 from website.tokens import process_token_or_pass
 from website.util.permissions import ADMIN, READ, WRITE, CREATOR_PERMISSIONS
 from website.util.rubeus import collect_addon_js
+from website.project.page_data import ProjectPageData
+from website.project.tree import build_trees
 from website.project.model import has_anonymous_link, get_pointer_parent, NodeUpdateError, validate_title
 from website.project.forms import NewNodeForm
 from website.project.metadata.utils import serialize_meta_schemas
-from website.models import Node, Pointer, WatchConfig, PrivateLink, Comment
+from website.models import Node, Pointer, WatchConfig, PrivateLink
 from website import settings
 from website.views import _render_nodes, find_bookmark_collection, validate_page_num
 from website.profile import utils
@@ -647,8 +649,9 @@ def _view_project(node, auth, primary=False):
     project.view.mako.
     """
     user = auth.user
+    page_data = ProjectPageData(node)
 
-    parent = node.find_readable_antecedent(auth)
+    parent = page_data.timed('parent', lambda: node.find_readable_antecedent(auth))
     if user:
         bookmark_collection = find_bookmark_collection(user)
         bookmark_collection_id = bookmark_collection._id
@@ -658,7 +661,7 @@ def _view_project(node, auth, primary=False):
         bookmark_collection_id = ''
     view_only_link = auth.private_key or request.args.get('view_only', '').strip('/')
     anonymous = has_anonymous_link(node, auth)
-    widgets, configs, js, css = _render_addon(node)
+    widgets, configs, js, css = page_data.timed('addons', lambda: _render_addon(node))
     redirect_url = node.url + '?view_only=None'
 
     disapproval_link = ''
@@ -694,10 +697,11 @@ def _view_project(node, auth, primary=False):
             'is_public': node.is_public,
             'is_archiving': node.archiving,
             'date_created': iso8601format(node.date_created),
-            'date_modified': iso8601format(node.logs[-1].date) if node.logs else '',
+            'date_modified': iso8601format(page_data.date_modified) if page_data.date_modified else '',
             'tags': [tag._primary_key for tag in node.tags],
             'children': bool(node.nodes_active),
             'is_registration': node.is_registration,
+            'logs_copy_progress': node.logs_copy_progress,
             'is_pending_registration': node.is_pending_registration,
             'is_retracted': node.is_retracted,
             'is_pending_retraction': node.is_pending_retraction,
@@ -714,22 +718,22 @@ def _view_project(node, auth, primary=False):
             'root_id': node.root._id if node.root else None,
             'registered_meta': node.registered_meta,
             'registered_schemas': serialize_meta_schemas(node.registered_schema),
-            'registration_count': node.registrations_all.count(),
+            'registration_count': page_data.related_node_counts['registration_count'],
             'is_fork': node.is_fork,
             'forked_from_id': node.forked_from._primary_key if node.is_fork else '',
             'forked_from_display_absolute_url': node.forked_from.display_absolute_url if node.is_fork else '',
             'forked_date': iso8601format(node.forked_date) if node.is_fork else '',
-            'fork_count': node.forks.count(),
-            'templated_count': node.templated_list.count(),
-            'watched_count': node.watches.count(),
-            'private_links': [x.to_json() for x in node.private_links_active],
+            'fork_count': page_data.related_node_counts['fork_count'],
+            'templated_count': page_data.related_node_counts['templated_count'],
+            'watched_count': page_data.watched_count,
+            'private_links': page_data.private_links,
             'link': view_only_link,
             'anonymous': anonymous,
-            'points': len(node.get_points(deleted=False, folders=False)),
+            'points': page_data.points,
             'piwik_site_id': node.piwik_site_id,
             'comment_level': node.comment_level,
-            'has_comments': bool(Comment.find(Q('node', 'eq', node))),
-            'has_children': bool(Comment.find(Q('node', 'eq', node))),
+            'has_comments': page_data.has_comments,
+            'has_children': page_data.has_comments,
             'identifiers': {
                 'doi': node.get_identifier_value('doi'),
                 'ark': node.get_identifier_value('ark'),
@@ -782,6 +786,7 @@ def _view_project(node, auth, primary=False):
             for key, value in settings.NODE_CATEGORY_MAP.iteritems()
         ]
     }
+    page_data.log_timings()
     return data
 
 def get_affiliated_institutions(obj):
@@ -944,67 +949,63 @@ def get_readable_descendants(auth, node, **kwargs):
 def node_child_tree(user, node_ids):
     """ Format data to test for node privacy settings for use in treebeard.
     """
-    items = []
+    trees = build_trees(user, node_ids)
+    for tree in set(trees.values()):
+        tree.prefetch_related()
+    return [
+        item for item in (
+            _serialize_node_tree_item(trees[node_id], node_id)
+            for node_id in node_ids
+        ) if item
+    ]
 
-    for node_id in node_ids:
-        node = Node.load(node_id)
-        assert node, '{} is not a valid Node.'.format(node_id)
 
-        can_read = node.has_permission(user, READ)
-        can_read_children = node.has_permission_on_children(user, 'read')
-        if not can_read and not can_read_children:
-            continue
+def _serialize_node_tree_item(tree, node_id):
+    can_read = tree.can_read(node_id)
+    # List project/node if user has at least 'read' permissions (contributor or admin viewer) or if
+    # user is contributor on a component of the project/node
+    if not tree.can_read_subtree(node_id):
+        return None
 
-        contributors = []
-        for contributor in node.contributors:
-            contributors.append({
-                'id': contributor._id,
-                'is_admin': node.has_permission(contributor, ADMIN),
-                'is_confirmed': contributor.is_confirmed
-            })
+    node = tree.get(node_id)
+    contributors = [{
+        'id': contributor._id,
+        'is_admin': tree.is_admin(node_id, contributor),
+        'is_confirmed': contributor.is_confirmed
+    } for contributor in node.contributors]
 
-        affiliated_institutions = [{
-            'id': affiliated_institution.pk,
-            'name': affiliated_institution.name
-        } for affiliated_institution in node.affiliated_institutions]
-
-        children = []
-        # List project/node if user has at least 'read' permissions (contributor or admin viewer) or if
-        # user is contributor on a component of the project/node
-        children.extend(node_child_tree(
-            user,
-            [
-                n._id
-                for n in node.nodes
-                if n.primary and
-                not n.is_deleted
-            ]
-        ))
-        item = {
-            'node': {
-                'id': node_id,
-                'url': node.url if can_read else '',
-                'title': node.title if can_read else 'Private Project',
-                'is_public': node.is_public,
-                'contributors': contributors,
-                'visible_contributors': node.visible_contributor_ids,
-                'is_admin': node.has_permission(user, ADMIN),
-                'affiliated_institutions': affiliated_institutions
-            },
-            'user_id': user._id,
-            'children': children,
-            'kind': 'folder' if not node.node__parent or not node.parent_node.has_permission(user, 'read') else 'node',
-            'nodeType': node.project_or_component,
-            'category': node.category,
-            'permissions': {
-                'view': can_read,
-                'is_admin': node.has_permission(user, 'read')
-            }
-        }
+    affiliated_institutions = [{
+        'id': affiliated_institution.pk,
+        'name': affiliated_institution.name
+    } for affiliated_institution in node.affiliated_institutions]
 
-        items.append(item)
+    children = []
+    for child in tree.children(node_id):
+        item = _serialize_node_tree_item(tree, child._id)
+        if item:
+            children.append(item)
 
-    return items
+    return {
+        'node': {
+            'id': node_id,
+            'url': node.url if can_read else '',
+            'title': node.title if can_read else 'Private Project',
+            'is_public': node.is_public,
+            'contributors': contributors,
+            'visible_contributors': node.visible_contributor_ids,
+            'is_admin': tree.is_admin(node_id),
+            'affiliated_institutions': affiliated_institutions
+        },
+        'user_id': tree.user._id,
+        'children': children,
+        'kind': tree.kind(node_id),
+        'nodeType': node.project_or_component,
+        'category': node.category,
+        'permissions': {
+            'view': can_read,
+            'is_admin': can_read
+        }
+    }
 
 
 @must_be_logged_in
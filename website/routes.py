@@ -435,6 +435,16 @@ def make_url_map(app):
             json_renderer,
         ),
 
+        Rule(
+            [
+                '/project/<pid>/comments/unread/',
+                '/project/<pid>/node/<nid>/comments/unread/',
+            ],
+            'get',
+            project_views.comment.get_unread_comment_counts,
+            json_renderer,
+        ),
+
         Rule(
             [
                 '/project/<pid>/citation/',
@@ -22,6 +22,7 @@ import six
 
 from framework import sentry
 from framework.celery_tasks import app as celery_app
+from framework.celery_tasks.handlers import coalesce_on
 from framework.mongo.utils import paginated
 
 from website import settings
@@ -289,6 +290,9 @@ def update_node_async(self, node_id, index=None, bulk=False):
     except Exception as exc:
         self.retry(exc=exc)
 
+# Index a node once per request however many times it was saved
+coalesce_on(update_node_async, 'node_id', 'index')
+
 @requires_search
 def update_node(node, index=None, bulk=False):
     index = index or INDEX
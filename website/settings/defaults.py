@@ -61,6 +61,14 @@ API_DOMAIN = PROTOCOL + 'localhost:8000/'
 
 LOG_PATH = os.path.join(APP_PATH, 'logs')
 TEMPLATES_PATH = os.path.join(BASE_PATH, 'templates')
+
+# Compiled Mako modules are written to a subdirectory of this path named after
+# VERSION, so that a new deploy never reads modules compiled for another release.
+# Run `invoke precompile_templates` at build time to populate it.
+MAKO_MODULE_DIR = '/tmp/mako_modules'
+# When True, template lookups trust the precompiled modules and skip checking
+# template source files for changes. Enable in production only.
+MAKO_PRECOMPILED = False
 ANALYTICS_PATH = os.path.join(BASE_PATH, 'analytics')
 
 GNUPG_HOME = os.path.join(BASE_PATH, 'gpg')
@@ -128,6 +136,9 @@ WELCOME_OSF4M_WAIT_TIME = timedelta(weeks=2)
 NO_LOGIN_OSF4M_WAIT_TIME = timedelta(weeks=6)
 NEW_PUBLIC_PROJECT_WAIT_TIME = timedelta(hours=24)
 WELCOME_OSF4M_WAIT_TIME_GRACE = timedelta(days=12)
+# Concurrent connections used to send queued mails, and sent mails marked per update
+QUEUED_MAIL_WORKERS = 4
+QUEUED_MAIL_BATCH_SIZE = 100
 
 # TODO: Override in local.py
 MAILGUN_API_KEY = None
@@ -176,6 +187,8 @@ PROFILE_IMAGE_SMALL = 20
 
 # Conference options
 CONFERENCE_MIN_COUNT = 5
+# Maximum number of conference submissions returned per page
+CONFERENCE_SUBMISSIONS_PAGE_SIZE = 250
 
 WIKI_WHITELIST = {
     'tags': [
@@ -245,6 +258,15 @@ SYSTEM_ADDED_ADDONS = {
     'node': [],
 }
 
+# Seconds to wait for an addon's Rubeus/HGrid root data before showing it as
+# unavailable. Providers not listed use the default.
+ADDON_HGRID_TIMEOUT = 10
+ADDON_HGRID_TIMEOUTS = {
+    'osfstorage': 30,
+}
+# Maximum number of addon roots fetched concurrently for one file tree
+ADDON_HGRID_CONCURRENCY = 8
+
 # Piwik
 
 # TODO: Override in local.py in production
@@ -252,6 +274,13 @@ PIWIK_HOST = None
 PIWIK_ADMIN_TOKEN = None
 PIWIK_SITE_ID = None
 
+# Seconds after which the discovery page's snapshot of popular nodes is refreshed
+DISCOVERY_SNAPSHOT_MAX_AGE = 60 * 60
+# Seconds before a refresh of the snapshot is assumed to have failed and retried
+DISCOVERY_SNAPSHOT_REFRESH_TIMEOUT = 5 * 60
+# Seconds to wait for each Piwik response while refreshing the snapshot
+DISCOVERY_SNAPSHOT_PIWIK_TIMEOUT = 30
+
 KEEN = {
     'public': {
         'project_id': None,
@@ -303,6 +332,39 @@ DEFAULT_HMAC_ALGORITHM = hashlib.sha256
 WATERBUTLER_URL = 'http://localhost:7777'
 WATERBUTLER_ADDRS = ['127.0.0.1']
 
+# File tree crawling (archiver): concurrent metadata requests per crawl, and
+# the maximum metadata requests per second sent to WaterButler per provider
+WATERBUTLER_METADATA_WORKERS = 4
+WATERBUTLER_METADATA_RATE_LIMIT = 5
+WATERBUTLER_METADATA_RATE_LIMITS = {
+    'osfstorage': 20,
+}
+WATERBUTLER_METADATA_MAX_RETRIES = 5
+WATERBUTLER_METADATA_RETRY_BACKOFF = 1  # seconds, doubled after each retry
+# Number of logs copied per bulk write when forking or registering a node
+LOG_COPY_BATCH_SIZE = 1000
+# Nodes with more logs than this have them copied to forks and registrations
+# by a Celery task after the request; None to always copy during the request
+LOG_COPY_ASYNC_THRESHOLD = 5000
+# Nightly OAuth token refresh (scripts/refresh_addon_tokens.py): concurrent
+# refresh requests per provider and the maximum refresh requests sent to each
+# provider, as (<requests>, <seconds>)
+ADDON_TOKEN_REFRESH_WORKERS = 4
+ADDON_TOKEN_REFRESH_RATE_LIMIT = (5, 1)
+ADDON_TOKEN_REFRESH_RATE_LIMITS = {
+    'box': (5, 1),
+    'googledrive': (10, 1),
+    'mendeley': (2, 1),
+}
+# Seconds during which File.touch serves the latest version of a file from its
+# stored metadata instead of asking WaterButler; 0 to always ask
+WATERBUTLER_METADATA_FRESHNESS = 60
+# Seconds between log summaries of how File.touch served requests (cache
+# hits versus WaterButler requests), per process; 0 to disable
+WATERBUTLER_METADATA_STATS_LOG_INTERVAL = 300
+# Maximum number of metadata entries kept in a file's history
+FILE_HISTORY_MAX_ENTRIES = 100
+
 # Test identifier namespaces
 DOI_NAMESPACE = 'doi:10.5072/FK2'
 ARK_NAMESPACE = 'ark:99999/fk4'
@@ -390,6 +452,22 @@ else:
     CELERY_IGNORE_RESULT = True
     CELERY_STORE_ERRORS_EVEN_IF_IGNORED = True
 
+# Postcommit tasks run in a process-wide pool of this many greenlets. Each task
+# is stopped after its budget, and a response waits at most
+# POSTCOMMIT_WAIT_TIMEOUT seconds for its tasks before they carry on in the
+# background. Tasks with a Celery fallback are sent to Celery instead of
+# waiting for a busy pool.
+POSTCOMMIT_POOL_SIZE = 30
+POSTCOMMIT_TASK_TIMEOUT = 5  # seconds
+POSTCOMMIT_WAIT_TIMEOUT = 1  # seconds
+# Upper bounds (seconds) of the buckets of the postcommit time per request histogram
+POSTCOMMIT_HISTOGRAM_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+# Seconds between each worker process's log summary of task wait times,
+# runtimes and retries, and each web process's histogram of postcommit time
+# per request; 0 to disable
+TASK_METRICS_LOG_INTERVAL = 300
+
 # Default RabbitMQ broker
 BROKER_URL = 'amqp://'
 
@@ -406,6 +484,9 @@ CELERY_IMPORTS = (
     'website.notifications.tasks',
     'website.archiver.tasks',
     'website.search.search',
+    'website.project.tasks',
+    'website.discovery.tasks',
+    'api.caching.tasks',
     'scripts.populate_new_and_noteworthy_projects',
     'scripts.refresh_addon_tokens',
     'scripts.retract_registrations',
@@ -484,6 +565,10 @@ else:
             'schedule': crontab(minute=0, hour=2, day_of_week=6),  # Saturday 2:00 a.m.
             'kwargs': {'dry_run': False}
         },
+        'discovery-activity-snapshot': {
+            'task': 'website.discovery.tasks.refresh_activity_snapshot',
+            'schedule': crontab(minute=0),  # Hourly
+        },
     }
 
     # Tasks that need metrics and release requirements
@@ -543,6 +628,11 @@ WATERBUTLER_JWT_SECRET = 'ILiekTrianglesALot'
 WATERBUTLER_JWT_ALGORITHM = 'HS256'
 WATERBUTLER_JWT_EXPIRATION = 15
 
+# Seconds a successful WaterButler auth callback decision is reused for the
+# same user, node, provider and action; 0 disables the cache
+WATERBUTLER_AUTH_CACHE_TTL = 30
+WATERBUTLER_AUTH_CACHE_SIZE = 10000
+
 DRAFT_REGISTRATION_APPROVAL_PERIOD = datetime.timedelta(days=10)
 assert (DRAFT_REGISTRATION_APPROVAL_PERIOD > EMBARGO_END_DATE_MIN), 'The draft registration approval period should be more than the minimum embargo end date.'
 
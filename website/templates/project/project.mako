@@ -387,6 +387,11 @@
                 <h3 class="panel-title">Recent Activity</h3>
             </div>
             <div class="panel-body">
+                % if node['logs_copy_progress']:
+                <div class="alert alert-info">
+                    Copying activity from the original project: ${node['logs_copy_progress']['copied']} of ${node['logs_copy_progress']['total']} logs copied so far.
+                </div>
+                % endif
                 <div id="logFeed">
                     <div class="spinner-loading-wrapper">
                         <div class="logo-spin logo-lg"></div>
@@ -4,11 +4,16 @@ formatted hgrid list/folders.
 """
 import logging
 import datetime
+import threading
 
+import gevent
 import hurry.filesize
+from flask import copy_current_request_context, has_request_context
+from gevent.pool import Pool
 
 from framework import sentry
 from framework.auth.decorators import Auth
+from framework.mongo.handlers import CLIENT_POOL, ClientPool
 
 from website import settings
 from website.util import paths
@@ -148,21 +153,42 @@ def sort_by_name(hgrid_data):
 
 class NodeFileCollector(object):
 
-    """A utility class for creating rubeus formatted node data"""
+    """A utility class for creating rubeus formatted node data
+    """
     def __init__(self, node, auth, **kwargs):
         self.node = node
         self.auth = auth
         self.extra = kwargs
         self.can_view = node.can_view(auth)
         self.can_edit = node.can_edit(auth) and not node.is_registration
+        # (children, addons) pairs whose addon roots are fetched together
+        # once the whole tree has been walked; None outside of to_hgrid
+        self._deferred_addons = None
 
     def to_hgrid(self):
         """Return the Rubeus.JS representation of the node's file data, including
         addons and components
         """
-        root = self._serialize_node(self.node)
+        self._deferred_addons = []
+        try:
+            root = self._serialize_node(self.node)
+            self._resolve_deferred_addons()
+        finally:
+            self._deferred_addons = None
         return [root]
 
+    def _resolve_deferred_addons(self):
+        """Fetch the addon roots of every node in the tree concurrently and
+        prepend them to their node's children.
+        """
+        addons = [addon for _, node_addons in self._deferred_addons for addon in node_addons]
+        results = iter(self._fetch_addons(addons))
+        for children, node_addons in self._deferred_addons:
+            roots = []
+            for _ in node_addons:
+                roots.extend(next(results))
+            children[0:0] = roots
+
     def _collect_components(self, node, visited):
         rv = []
         if not node.can_view(self.auth):
@@ -204,10 +230,13 @@ class NodeFileCollector(object):
         visited = visited or []
         visited.append(node.resolve()._id)
         can_view = node.can_view(auth=self.auth)
-        if can_view:
+        if not can_view:
+            children = []
+        elif self._deferred_addons is None:
             children = self._collect_addons(node) + self._collect_components(node, visited)
         else:
-            children = []
+            children = self._collect_components(node, visited)
+            self._deferred_addons.append((children, self._hgrid_addons(node)))
 
         return {
             # TODO: Remove safe_unescape_html when mako html safe comes in
@@ -229,37 +258,81 @@ class NodeFileCollector(object):
             'nodeID': node.resolve()._id,
         }
 
+    def _hgrid_addons(self, node):
+        return [addon for addon in node.get_addons() if addon.config.has_hgrid_files]
+
     def _collect_addons(self, node):
-        rv = []
-        for addon in node.get_addons():
-            if addon.config.has_hgrid_files:
-                # WARNING: get_hgrid_data can return None if the addon is added but has no credentials.
+        return [
+            root
+            for roots in self._fetch_addons(self._hgrid_addons(node))
+            for root in roots
+        ]
+
+    def _fetch_addons(self, addons):
+        """Return a list of rubeus-formatted roots for each addon in ``addons``.
+
+        Providers are queried concurrently, each bounded by its
+        ``ADDON_HGRID_TIMEOUTS`` budget, so a slow provider is shown as
+        unavailable instead of stalling the whole tree.
+        """
+        if len(addons) <= 1:
+            return [self._fetch_addon(addon) for addon in addons]
+
+        fetch = self._fetch_addon_in_greenlet
+        if has_request_context():
+            fetch = copy_current_request_context(fetch)
+        pool = Pool(settings.ADDON_HGRID_CONCURRENCY)
+        greenlets = [pool.spawn(fetch, addon, threading.current_thread().ident) for addon in addons]
+        pool.join()
+        return [
+            greenlet.value if greenlet.successful() else [self._unavailable_addon_root(addon)]
+            for greenlet, addon in zip(greenlets, addons)
+        ]
+
+    def _fetch_addon_in_greenlet(self, addon, parent_ident):
+        try:
+            with gevent.Timeout(settings.ADDON_HGRID_TIMEOUTS.get(addon.config.short_name, settings.ADDON_HGRID_TIMEOUT)):
+                return self._fetch_addon(addon)
+        except gevent.Timeout:
+            logger.warn('Timed out fetching file contents for {0}.'.format(addon.config.full_name))
+            return [self._unavailable_addon_root(addon)]
+        finally:
+            # Greenlets get their own database client when the server is
+            # monkey-patched; hand it back instead of leaking it
+            if threading.current_thread().ident != parent_ident:
                 try:
-                    temp = addon.config.get_hgrid_data(addon, self.auth, **self.extra)
-                except Exception as e:
-                    logger.warn(
-                        getattr(
-                            e,
-                            'data',
-                            'Unexpected error when fetching file contents for {0}.'.format(addon.config.full_name)
-                        )
-                    )
-                    sentry.log_exception()
-                    rv.append({
-                        KIND: FOLDER,
-                        'unavailable': True,
-                        'iconUrl': addon.config.icon_url,
-                        'provider': addon.config.short_name,
-                        'addonFullname': addon.config.full_name,
-                        'permissions': {'view': False, 'edit': False},
-                        'name': '{} is currently unavailable'.format(addon.config.full_name),
-                    })
-                    continue
-                rv.extend(sort_by_name(temp) or [])
-        return rv
+                    CLIENT_POOL.release()
+                except ClientPool.ExtraneousReleaseError:
+                    pass
+
+    def _fetch_addon(self, addon):
+        # WARNING: get_hgrid_data can return None if the addon is added but has no credentials.
+        try:
+            temp = addon.config.get_hgrid_data(addon, self.auth, **self.extra)
+        except Exception as e:
+            logger.warn(
+                getattr(
+                    e,
+                    'data',
+                    'Unexpected error when fetching file contents for {0}.'.format(addon.config.full_name)
+                )
+            )
+            sentry.log_exception()
+            return [self._unavailable_addon_root(addon)]
+        return sort_by_name(temp) or []
+
+    def _unavailable_addon_root(self, addon):
+        return {
+            KIND: FOLDER,
+            'unavailable': True,
+            'iconUrl': addon.config.icon_url,
+            'provider': addon.config.short_name,
+            'addonFullname': addon.config.full_name,
+            'permissions': {'view': False, 'edit': False},
+            'name': '{} is currently unavailable'.format(addon.config.full_name),
+        }
 
 
-# TODO: these might belong in addons module
 def collect_addon_assets(node):
     """Return a dictionary containing lists of JS and CSS assets for a node's
     addons.